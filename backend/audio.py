@@ -0,0 +1,177 @@
+"""
+Ses kaydı işleme - yüklemeyi parça parça diske yazma, uzun kayıtları örtüşen
+segmentlere bölme, segmentleri paralel transkribe edip sırayla birleştirme.
+
+WAV dosyaları standart kütüphane ile bölünür; diğer formatlar (webm, m4a, mp3)
+için sistemde ffmpeg/ffprobe varsa kullanılır, yoksa kayıt tek parça gönderilir.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import uuid
+import wave
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+
+# Yükleme diske bu boyutta parçalar halinde yazılır
+AUDIO_UPLOAD_CHUNK = int(os.getenv("AUDIO_UPLOAD_CHUNK", str(1024 * 1024)))
+# Segment uzunluğu ve komşu segmentler arası örtüşme (saniye)
+AUDIO_SEGMENT_SECONDS = float(os.getenv("AUDIO_SEGMENT_SECONDS", "300"))
+AUDIO_SEGMENT_OVERLAP = float(os.getenv("AUDIO_SEGMENT_OVERLAP", "2"))
+# Aynı anda transkribe edilecek segment sayısı
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+# Whisper API dosya sınırı (25 MB) altında kalmak için
+WHISPER_MAX_BYTES = 24 * 1024 * 1024
+
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
+
+async def spool_upload(file: UploadFile, workdir: Path) -> Tuple[Path, str]:
+    """Yüklemeyi belleğe almadan benzersiz isimli dosyaya yaz; (yol, içeriğin SHA-256'sı) döndür"""
+    suffix = Path(file.filename or "").suffix.lower() or ".webm"
+    path = workdir / f"kayit_{uuid.uuid4().hex}{suffix}"
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, "wb") as f:
+        while chunk := await file.read(AUDIO_UPLOAD_CHUNK):
+            digest.update(chunk)
+            await f.write(chunk)
+    return path, digest.hexdigest()
+
+
+def _segment_araliklari(sure: float, segment: float, overlap: float) -> List[tuple]:
+    """(başlangıç, uzunluk) listesi - her segment bir öncekinin son `overlap` saniyesini tekrar eder"""
+    if sure <= segment:
+        return [(0.0, sure)]
+    adim = max(segment - overlap, 1.0)
+    araliklar, bas = [], 0.0
+    while bas < sure:
+        araliklar.append((bas, min(segment, sure - bas)))
+        if bas + segment >= sure:
+            break
+        bas += adim
+    return araliklar
+
+
+def _split_wav(path: Path, workdir: Path) -> List[Path]:
+    with wave.open(str(path), "rb") as src:
+        params = src.getparams()
+        kare_orani = src.getframerate()
+        bayt_orani = kare_orani * src.getnchannels() * src.getsampwidth()
+        sure = src.getnframes() / kare_orani
+        segment = min(AUDIO_SEGMENT_SECONDS, WHISPER_MAX_BYTES / bayt_orani)
+        araliklar = _segment_araliklari(sure, segment, AUDIO_SEGMENT_OVERLAP)
+        if len(araliklar) == 1:
+            return [path]
+
+        segmentler = []
+        for i, (bas, uzunluk) in enumerate(araliklar):
+            hedef = workdir / f"{path.stem}_{i:03d}.wav"
+            src.setpos(int(bas * kare_orani))
+            kalan = int(uzunluk * kare_orani)
+            with wave.open(str(hedef), "wb") as dst:
+                dst.setparams(params)
+                # Saniyelik bloklarla kopyala, segment belleğe alınmaz
+                while kalan > 0:
+                    kareler = src.readframes(min(kalan, kare_orani))
+                    if not kareler:
+                        break
+                    dst.writeframes(kareler)
+                    kalan -= len(kareler) // (params.nchannels * params.sampwidth)
+            segmentler.append(hedef)
+        return segmentler
+
+
+async def _run(*args: str) -> bytes:
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"{Path(args[0]).name} hatası: {stderr.decode(errors='ignore')[-300:]}")
+    return stdout
+
+
+async def _sure_ffprobe(path: Path) -> Optional[float]:
+    cikti = await _run(
+        FFPROBE, "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path)
+    )
+    try:
+        return float(cikti.decode().strip())
+    except ValueError:
+        return None
+
+
+async def _split_ffmpeg(path: Path, workdir: Path) -> List[Path]:
+    sure = await _sure_ffprobe(path)
+    if not sure:
+        return [path]
+    araliklar = _segment_araliklari(sure, AUDIO_SEGMENT_SECONDS, AUDIO_SEGMENT_OVERLAP)
+    if len(araliklar) == 1:
+        return [path]
+
+    # Segmentler 16 kHz mono WAV'a çevrilir (konuşma için yeterli, 5 dk ~ 10 MB)
+    semaphore = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+
+    async def kes(i: int, bas: float, uzunluk: float) -> Path:
+        hedef = workdir / f"{path.stem}_{i:03d}.wav"
+        async with semaphore:
+            await _run(
+                FFMPEG, "-v", "error", "-y", "-ss", f"{bas:.3f}", "-t", f"{uzunluk:.3f}",
+                "-i", str(path), "-vn", "-ac", "1", "-ar", "16000", str(hedef)
+            )
+        return hedef
+
+    return list(await asyncio.gather(*(kes(i, bas, uzunluk) for i, (bas, uzunluk) in enumerate(araliklar))))
+
+
+async def split_segments(path: Path, workdir: Path) -> List[Path]:
+    """Kaydı örtüşen segmentlere böl; bölünemiyorsa dosyanın kendisini döndür"""
+    if path.suffix == ".wav":
+        try:
+            return await asyncio.to_thread(_split_wav, path, workdir)
+        except wave.Error:
+            pass  # WAV uzantılı ama PCM değil - ffmpeg denenir
+    if FFMPEG and FFPROBE:
+        return await _split_ffmpeg(path, workdir)
+    return [path]
+
+
+async def transcribe_segments(
+    segments: List[Path],
+    transcribe: Callable[[Path], Awaitable[str]],
+    concurrency: int = TRANSCRIBE_CONCURRENCY,
+) -> List[str]:
+    """Segmentleri sınırlı paralellikle transkribe et, sonuçları segment sırasıyla döndür"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(segment: Path) -> str:
+        async with semaphore:
+            return await transcribe(segment)
+
+    return list(await asyncio.gather(*(one(s) for s in segments)))
+
+
+def _kelime(token: str) -> str:
+    return re.sub(r"\W", "", token.casefold())
+
+
+def stitch(parcalar: List[str], max_ortusme: int = 30) -> str:
+    """Segment metinlerini birleştir; örtüşen bölgede tekrar eden kelimeleri bir kez yaz"""
+    kelimeler: List[str] = []
+    for parca in parcalar:
+        yeni = parca.split()
+        # Önceki metnin sonu ile yeni metnin başının en uzun ortak kısmını bul
+        atla = 0
+        for n in range(min(max_ortusme, len(kelimeler), len(yeni)), 0, -1):
+            if [_kelime(k) for k in kelimeler[-n:]] == [_kelime(k) for k in yeni[:n]]:
+                atla = n
+                break
+        kelimeler.extend(yeni[atla:])
+    return " ".join(kelimeler)
@@ -0,0 +1,104 @@
+"""
+JSON kodlayıcı karşılaştırması - API yanıtlarına benzeyen yükler üzerinde
+stdlib json, FastAPI varsayılanı (jsonable_encoder + JSONResponse), orjson (FastJSONResponse)
+ve kuruluysa msgspec ölçülür.
+
+Kullanım: python bench_json.py [tekrar]
+"""
+import json
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from new_models import CihazTipiEnum, DurumEnum
+from responses import FastJSONResponse, dumps
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+TEKRAR = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def _stdlib_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(type(obj).__name__)
+
+
+def _msgspec_hook(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise NotImplementedError(type(obj).__name__)
+
+
+def yukler() -> dict:
+    """test_kalibrasyon.json'dan rapor detayı ve 100 satırlık liste yükü"""
+    rapor = json.loads((Path(__file__).parent / "test_kalibrasyon.json").read_text(encoding="utf-8"))
+    simdi = datetime(2024, 5, 1, 9, 30)
+    tipler = list(CihazTipiEnum)
+    durumlar = list(DurumEnum)
+
+    liste = {
+        "total": 100,
+        "kalibrasyonlar": [
+            {
+                "id": i,
+                "sertifika_no": f"2205101{i:03d}",
+                "cihaz_tipi": tipler[i % len(tipler)],
+                "durum": durumlar[i % len(durumlar)],
+                "sapma": Decimal("0.012") * i,
+                "belirsizlik": Decimal("0.0058"),
+                "kalibrasyon_tarihi": simdi - timedelta(days=i),
+                "created_at": simdi - timedelta(days=i, hours=3),
+            }
+            for i in range(100)
+        ],
+    }
+    detay = {
+        "rapor": {"id": 1, "sertifika_no": "2205101001", "created_at": simdi, "rapor_data": rapor},
+        "olcumler": [
+            {"olcum_tipi": "dis_cap", "referans_deger": Decimal(str(r)), "olculen_deger": Decimal(str(r)) + Decimal("0.02"),
+             "sapma": Decimal("0.02"), "belirsizlik": Decimal("0.0058")}
+            for r in range(0, 150, 5)
+        ],
+    }
+    return {"rapor_detay": detay, "liste_100": liste}
+
+
+def kodlayicilar() -> dict:
+    sonuc = {
+        "json.dumps": lambda veri: json.dumps(veri, default=_stdlib_default, ensure_ascii=False).encode("utf-8"),
+        "fastapi varsayılan": lambda veri: JSONResponse(content=None).render(jsonable_encoder(veri)),
+        "FastJSONResponse": lambda veri: FastJSONResponse(content=None).render(veri),
+    }
+    if msgspec is not None:
+        encoder = msgspec.json.Encoder(enc_hook=_msgspec_hook)
+        sonuc["msgspec"] = encoder.encode
+    return sonuc
+
+
+def main():
+    for ad, veri in yukler().items():
+        beklenen = json.loads(dumps(veri))
+        print(f"\n{ad} ({len(dumps(veri)) / 1024:.1f} KB, {TEKRAR} tekrar)")
+        taban = None
+        for kodlayici_ad, kodla in kodlayicilar().items():
+            if json.loads(kodla(veri)) != beklenen:
+                print(f"  {kodlayici_ad:<20} ÇIKTI FARKLI!")
+                continue
+            sure = min(timeit.repeat(lambda: kodla(veri), number=TEKRAR, repeat=3)) / TEKRAR * 1e6
+            taban = taban or sure
+            print(f"  {kodlayici_ad:<20} {sure:9.1f} µs   x{taban / sure:.1f}")
+
+
+if __name__ == "__main__":
+    main()
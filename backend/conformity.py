@@ -0,0 +1,146 @@
+"""
+Uygunluk (conformity) karar motoru - ölçüm noktaları şablon parametrelerinin
+toleranslarına göre NumPy ile toplu değerlendirilir.
+
+Karar kuralı (ILAC-G8 koruma bandı): w = UYGUNLUK_GUARD_BAND * U
+    |sapma| + w <= tolerans  -> uygun
+    |sapma| - w >  tolerans  -> uygun_degil
+    aradaki durumlar         -> belirsiz
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Koruma bandı çarpanı (0 = basit kabul, belirsizlik dikkate alınmaz)
+UYGUNLUK_GUARD_BAND = float(os.getenv("UYGUNLUK_GUARD_BAND", "1.0"))
+
+# Nokta kararları (dizide int8 olarak tutulur)
+UYGUN, BELIRSIZ, UYGUN_DEGIL, DEGERLENDIRILEMEDI = 0, 1, 2, 3
+KARARLAR = ["uygun", "belirsiz", "uygun_degil", "degerlendirilemedi"]
+
+
+def _sayi(deger) -> float:
+    try:
+        return float(deger)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _ParametreIndeksi:
+    """Bir şablonun parametrelerini ölçüm noktası eşleştirmesi için endeksler"""
+
+    def __init__(self, parametreler: List[dict]):
+        self.parametreler = parametreler
+        self.by_kod = {p["kod"]: i for i, p in enumerate(parametreler) if p.get("kod")}
+        self.by_nokta: Dict[float, int] = {}
+        for i, p in enumerate(parametreler):
+            for nokta in p.get("test_noktalari") or []:
+                self.by_nokta.setdefault(_sayi(nokta), i)
+
+    def bul(self, olcum: dict) -> Optional[int]:
+        """Ölçümün ait olduğu parametre: önce kod, sonra test noktası, tek parametreli şablonda o parametre"""
+        kod = olcum.get("parametre_kodu") or olcum.get("kod")
+        if kod in self.by_kod:
+            return self.by_kod[kod]
+        i = self.by_nokta.get(_sayi(olcum.get("nominal")))
+        if i is not None:
+            return i
+        return 0 if len(self.parametreler) == 1 else None
+
+
+def evaluate(
+    gruplar: List[List[dict]],
+    parametre_gruplari: List[Optional[List[dict]]],
+    guard_band: float = UYGUNLUK_GUARD_BAND,
+    detay: bool = True,
+) -> List[dict]:
+    """
+    Birden fazla kalibrasyonun ölçümlerini tek seferde değerlendir.
+    gruplar[i] i'nci kalibrasyonun olcum_verileri listesi, parametre_gruplari[i] şablon parametreleri
+    (katalogdaki format). Her grup için özet ve (detay=True ise) nokta kararlarını döndürür.
+    """
+    # Python tarafında sadece düzleştirme ve parametre eşleştirme yapılır
+    grup_idx, nominal, olculen, belirsizlik, tol_deger, tol_yuzde, param_kod = [], [], [], [], [], [], []
+    indeksler: Dict[int, _ParametreIndeksi] = {}
+    for g, (olcumler, parametreler) in enumerate(zip(gruplar, parametre_gruplari)):
+        indeks = None
+        if parametreler:
+            # Aynı şablonu kullanan kalibrasyonlar indeksi paylaşır
+            indeks = indeksler.get(id(parametreler))
+            if indeks is None:
+                indeks = indeksler[id(parametreler)] = _ParametreIndeksi(parametreler)
+        for olcum in olcumler or []:
+            if not isinstance(olcum, dict):
+                continue
+            i = indeks.bul(olcum) if indeks else None
+            p = indeks.parametreler[i] if i is not None else {}
+            grup_idx.append(g)
+            nominal.append(_sayi(olcum.get("nominal")))
+            olculen.append(_sayi(olcum.get("olculen")))
+            belirsizlik.append(_sayi(olcum.get("belirsizlik")))
+            tol_deger.append(_sayi(p.get("tolerans_degeri")))
+            tol_yuzde.append(p.get("tolerans_tipi") == "percentage")
+            param_kod.append(p.get("kod"))
+
+    grup_idx = np.asarray(grup_idx, dtype=np.intp)
+    nominal = np.asarray(nominal, dtype=float)
+    olculen = np.asarray(olculen, dtype=float)
+    belirsizlik = np.nan_to_num(np.asarray(belirsizlik, dtype=float), nan=0.0)
+    tol_deger = np.asarray(tol_deger, dtype=float)
+    tol_yuzde = np.asarray(tol_yuzde, dtype=bool)
+
+    # Vektörel hesap
+    sapma = olculen - nominal
+    tolerans = np.where(tol_yuzde, np.abs(nominal) * tol_deger / 100.0, tol_deger)
+    w = guard_band * np.abs(belirsizlik)
+    mutlak = np.abs(sapma)
+
+    karar = np.full(sapma.shape, BELIRSIZ, dtype=np.int8)
+    karar[mutlak + w <= tolerans] = UYGUN
+    karar[mutlak - w > tolerans] = UYGUN_DEGIL
+    karar[np.isnan(sapma) | np.isnan(tolerans)] = DEGERLENDIRILEMEDI
+
+    # Grup bazında sayımlar: (grup, karar) çiftleri tek bincount ile
+    n_grup = len(gruplar)
+    sayimlar = np.bincount(
+        grup_idx * len(KARARLAR) + karar, minlength=n_grup * len(KARARLAR)
+    ).reshape(n_grup, len(KARARLAR))
+
+    sonuclar = []
+    sinirlar = np.searchsorted(grup_idx, np.arange(n_grup + 1))
+    for g in range(n_grup):
+        uygun, belirsiz, uygun_degil, bos = (int(x) for x in sayimlar[g])
+        if uygun_degil:
+            genel = "uygun_degil"
+        elif belirsiz:
+            genel = "belirsiz"
+        elif uygun:
+            genel = "uygun"
+        else:
+            genel = "degerlendirilemedi"
+
+        sonuc = {
+            "karar": genel,
+            "uygunluk": {"uygun": True, "uygun_degil": False}.get(genel),
+            "ozet": {"uygun": uygun, "belirsiz": belirsiz, "uygun_degil": uygun_degil, "degerlendirilemedi": bos},
+        }
+        if detay:
+            sonuc["noktalar"] = [
+                {
+                    "parametre_kodu": param_kod[j],
+                    "nominal": _json_sayi(nominal[j]),
+                    "olculen": _json_sayi(olculen[j]),
+                    "sapma": _json_sayi(sapma[j]),
+                    "tolerans": _json_sayi(tolerans[j]),
+                    "belirsizlik": float(belirsizlik[j]),
+                    "karar": KARARLAR[karar[j]],
+                }
+                for j in range(sinirlar[g], sinirlar[g + 1])
+            ]
+        sonuclar.append(sonuc)
+    return sonuclar
+
+
+def _json_sayi(deger) -> Optional[float]:
+    return None if np.isnan(deger) else float(deger)
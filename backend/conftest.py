@@ -0,0 +1,12 @@
+"""
+pytest ayarları - test_*.py ile başlayan eski script'ler çalışan sunucuya/veritabanına
+istek atar ve import anında çalışır; bunlar pytest tarafından toplanmaz, elle çalıştırılır.
+"""
+collect_ignore = [
+    "test_api_db.py",
+    "test_db_connection.py",
+    "test_new_api.py",
+    "test_pdf.py",
+    "test_simple_pdf.py",
+    "test_standards.py",
+]
@@ -0,0 +1,127 @@
+"""
+PDF font kayıt defteri - Türkçe karakter destekli fontlar açılışta bir kez bulunur,
+parse edilir ve bellekte tutulur. Her yeni FPDF dokümanına diske dokunmadan eklenir.
+"""
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fontTools import ttLib
+from fpdf import FPDF, FPDF_VERSION
+from fpdf.fonts import SubsetMap, TTFFont
+
+# Font arama dizinleri - PDF_FONT_DIRS ile başa ek dizin verilebilir (os.pathsep ile ayrılmış)
+DEFAULT_FONT_DIRS = [
+    "C:/Windows/Fonts",
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/share/fonts/truetype/msttcorefonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+]
+FONT_DIRS = [d for d in os.getenv("PDF_FONT_DIRS", "").split(os.pathsep) if d] + DEFAULT_FONT_DIRS
+
+# Tercih sırasına göre font aileleri: (aile adı, {stil: dosya adı})
+FONT_CANDIDATES = [
+    ("DejaVu", {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf"}),
+    ("Arial", {"": "arial.ttf", "B": "arialbd.ttf"}),
+]
+
+# _clone, TTFFont/SubsetMap iç yapısına dayanır; sadece doğrulanmış fpdf2 sürümlerinde kullanılır.
+# Diğer sürümlerde fontlar her dokümana add_font ile eklenir (daha yavaş ama güvenli).
+CLONE_FPDF_VERSIONS = {"2.8.2"}
+
+
+class FontRegistry:
+    """Parse edilmiş fontları process boyunca saklar"""
+
+    def __init__(self, font_dirs: List[str]):
+        self.font_dirs = font_dirs
+        self.family: Optional[str] = None
+        # stil -> (font dosyasının byte'ları, parse edilmiş şablon TTFFont)
+        self._fonts: Dict[str, Tuple[bytes, TTFFont]] = {}
+        # stil -> font dosyası (add_font yedeği için)
+        self._paths: Dict[str, Path] = {}
+        self.clone = FPDF_VERSION in CLONE_FPDF_VERSIONS
+
+    def _find_file(self, filename: str) -> Optional[Path]:
+        for directory in self.font_dirs:
+            folder = Path(directory)
+            if not folder.is_dir():
+                continue
+            for candidate in (folder / filename, folder / filename.lower()):
+                if candidate.is_file():
+                    return candidate
+        return None
+
+    def load(self) -> Optional[str]:
+        """İlk bulunan font ailesini parse et (tekrar çağrılırsa bir şey yapmaz)"""
+        if self.family:
+            return self.family
+
+        for family, files in FONT_CANDIDATES:
+            paths = {style: self._find_file(filename) for style, filename in files.items()}
+            if not all(paths.values()):
+                continue
+
+            self._paths = paths
+            if self.clone:
+                # TTFFont'un pahalı kısmı (cmap, genişlik tablosu) burada bir kez yapılır
+                scratch = FPDF()
+                for style, path in paths.items():
+                    data = path.read_bytes()
+                    fontkey = f"{family.lower()}{style}"
+                    self._fonts[style] = (data, TTFFont(scratch, path, fontkey, style))
+            else:
+                print(f"UYARI: fpdf2 {FPDF_VERSION} için font kopyalama doğrulanmadı, add_font kullanılacak")
+            self.family = family
+            print(f"PDF fontu yüklendi: {family} ({paths[''].parent})")
+            return family
+
+        print(f"UYARI: Türkçe destekli PDF fontu bulunamadı. Aranan dizinler: {self.font_dirs}")
+        return None
+
+    def attach(self, pdf: FPDF) -> str:
+        """Önbellekteki fontları dokümana ekle, set_font için aile adını döndür"""
+        family = self.load()
+        if not family:
+            raise RuntimeError("Türkçe destekli font bulunamadı (PDF_FONT_DIRS ayarını kontrol edin)")
+
+        if not self.clone:
+            for style, path in self._paths.items():
+                if f"{family.lower()}{style}" not in pdf.fonts:
+                    pdf.add_font(family, style, str(path))
+            return family
+
+        for style, (data, template) in self._fonts.items():
+            fontkey = template.fontkey
+            if fontkey not in pdf.fonts:
+                pdf.fonts[fontkey] = self._clone(template, data, pdf)
+        return family
+
+    @staticmethod
+    def _clone(template: TTFFont, data: bytes, pdf: FPDF) -> TTFFont:
+        """
+        Şablon fonttan doküman başına kopya oluştur.
+        Metrikler (cw, cmap, glyph_ids, desc) paylaşılır; subset haritası ve
+        fontTools nesnesi dokümana özeldir çünkü output() sırasında subset'lenirler.
+        """
+        font = TTFFont.__new__(TTFFont)
+        for slot in TTFFont.__slots__:
+            if slot != "hbfont" and hasattr(template, slot):
+                setattr(font, slot, getattr(template, slot))
+
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = ttLib.TTFont(BytesIO(data), recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.missing_glyphs = []
+
+        identities = "\x00 \r\n"
+        if pdf.str_alias_nb_pages:
+            identities += "0123456789" + pdf.str_alias_nb_pages
+        font.subset = SubsetMap(font, [ord(char) for char in identities])
+        return font
+
+
+registry = FontRegistry(FONT_DIRS)
@@ -0,0 +1,163 @@
+"""
+Görsel ön işleme - telefon fotoğrafı vision modeline gönderilmeden önce EXIF yönüne
+göre döndürülür, uzun kenarı sınırlanır ve ayarlı kalitede yeniden kodlanır.
+Orijinal içerik hash'iyle bir kez saklanır, istemciye sadece küçük resim adresi döner.
+
+Pillow işlemleri CPU'ya bağlı olduğundan event loop dışında (thread) çalışır.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Vision modeline gönderilecek görselin uzun kenarı (piksel) ve kodlama ayarları
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "1568"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()  # JPEG veya WEBP
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+# Küçük resim (önizleme) ayarları
+IMAGE_THUMB_EDGE = int(os.getenv("IMAGE_THUMB_EDGE", "320"))
+IMAGE_THUMB_QUALITY = int(os.getenv("IMAGE_THUMB_QUALITY", "70"))
+# Yükleme diske bu boyutta parçalar halinde yazılır
+IMAGE_UPLOAD_CHUNK = int(os.getenv("IMAGE_UPLOAD_CHUNK", str(1024 * 1024)))
+
+_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+# Saklanan orijinalin uzantısı istemcinin dosya adından değil, Pillow'un tanıdığı formattan gelir
+_UZANTI = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif", "BMP": ".bmp", "TIFF": ".tif", "MPO": ".jpg"}
+
+
+@dataclass
+class HazirGorsel:
+    """Vision modeline gidecek küçültülmüş görsel ve saklanan dosyalar"""
+    data: bytes
+    mime: str
+    genislik: int
+    yukseklik: int
+    orijinal: str  # upload dizinindeki dosya adı
+    kucuk_resim: str
+
+
+async def store_upload(file: UploadFile, upload_dir: Path) -> Tuple[Path, str]:
+    """
+    Yüklemeyi parça parça geçici dosyaya yaz ve içeriğin SHA-256'sını hesapla.
+    Kalıcı ad (image_<hash>.<format>) görsel çözüldükten sonra prepare'de verilir.
+    (geçici yol, hash) döndürür.
+    """
+    tmp_path = upload_dir / f"image_{uuid.uuid4().hex}.tmp"
+    digest = hashlib.sha256()
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(IMAGE_UPLOAD_CHUNK):
+                digest.update(chunk)
+                await f.write(chunk)
+        return tmp_path, digest.hexdigest()
+    except BaseException:
+        await asyncio.to_thread(tmp_path.unlink, True)
+        raise
+
+
+def _sakla(tmp_path: Path, sha: str, fmt: str) -> Path:
+    """Geçici yüklemeyi içerik adresli kalıcı adına taşı; aynı fotoğraf bir kez saklanır"""
+    path = tmp_path.parent / f"image_{sha[:24]}{_UZANTI[fmt]}"
+    if path.exists():
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, path)
+    return path
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _prepare(tmp_path: Path, sha: str) -> HazirGorsel:
+    with Image.open(tmp_path) as img:
+        fmt = img.format
+        if fmt not in _UZANTI:
+            raise UnidentifiedImageError(f"Desteklenmeyen görsel formatı: {fmt}")
+        # JPEG'de DCT ölçekleme ile doğrudan küçük boyutta çöz (tam çözünürlük belleğe alınmaz)
+        img.draft("RGB", (IMAGE_MAX_EDGE, IMAGE_MAX_EDGE))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE), Image.LANCZOS)
+        data = _encode(img, IMAGE_FORMAT, IMAGE_QUALITY)
+
+        # Küçük resim küçültülmüş görselden üretilir, aynı fotoğraf için bir kez yazılır
+        kucuk_resim = f"thumb_{sha[:24]}.jpg"
+        thumb_path = tmp_path.parent / kucuk_resim
+        if not thumb_path.exists():
+            thumb = img.copy()
+            thumb.thumbnail((IMAGE_THUMB_EDGE, IMAGE_THUMB_EDGE), Image.LANCZOS)
+            thumb_tmp = tmp_path.parent / f"{kucuk_resim}.{uuid.uuid4().hex}.tmp"
+            thumb_tmp.write_bytes(_encode(thumb, "JPEG", IMAGE_THUMB_QUALITY))
+            os.replace(thumb_tmp, thumb_path)
+
+    path = _sakla(tmp_path, sha, fmt)
+    return HazirGorsel(
+        data=data,
+        mime=_MIME.get(IMAGE_FORMAT, "image/jpeg"),
+        genislik=img.width,
+        yukseklik=img.height,
+        orijinal=path.name,
+        kucuk_resim=kucuk_resim,
+    )
+
+
+async def prepare(tmp_path: Path, sha: str) -> HazirGorsel:
+    """Görseli çöz, döndür, küçült, yeniden kodla, küçük resmini üret ve orijinali sakla (thread'de)"""
+    return await asyncio.to_thread(_prepare, tmp_path, sha)
+
+
+def _anahtar(metin) -> str:
+    """Tekilleştirme anahtarı - büyük/küçük harf (Türkçe İ/I dahil), noktalama ve boşluk farkları yok sayılır"""
+    kucuk = str(metin).replace("İ", "i").replace("I", "ı").casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", kucuk).split())
+
+
+def _tekil(degerler: list) -> list:
+    gorulen, sonuc = set(), []
+    for deger in degerler:
+        anahtar = _anahtar(deger)
+        if anahtar and anahtar not in gorulen:
+            gorulen.add(anahtar)
+            sonuc.append(deger)
+    return sonuc
+
+
+def merge_analyses(analizler: List[dict]) -> dict:
+    """
+    Aynı cihazın farklı fotoğraflarına ait analizleri tek analizde birleştir:
+    cihaz türü çoğunluk oyuyla, anomaliler/öneriler tekilleştirilerek (ilk görülme sırasıyla).
+    """
+    def liste(analiz: dict, alan: str) -> list:
+        deger = analiz.get(alan) or []
+        return deger if isinstance(deger, list) else [deger]
+
+    turler = Counter(_anahtar(a.get("cihaz_turu")) for a in analizler if a.get("cihaz_turu"))
+    cihaz_turu = next(
+        (a["cihaz_turu"] for a in analizler
+         if turler and a.get("cihaz_turu") and _anahtar(a["cihaz_turu"]) == turler.most_common(1)[0][0]),
+        None,
+    )
+    durumlar = _tekil([a.get("gorsel_durum") for a in analizler if a.get("gorsel_durum")])
+    gostergeler = _tekil([a.get("gosterge_deger") for a in analizler if a.get("gosterge_deger")])
+
+    return {
+        "cihaz_turu": cihaz_turu,
+        "gorsel_durum": "; ".join(map(str, durumlar)) or None,
+        "gosterge_deger": gostergeler[0] if len(gostergeler) == 1 else (gostergeler or None),
+        "anomaliler": _tekil([x for a in analizler for x in liste(a, "anomaliler")]),
+        "oneriler": _tekil([x for a in analizler for x in liste(a, "oneriler")]),
+    }
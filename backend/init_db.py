@@ -3,15 +3,23 @@ Veritabanı tablolarını oluşturma script'i
 """
 import asyncio
 import logging
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 from database import Base, DATABASE_URL
-from models import KalibrasyonRaporu, OlcumSonucu, RaporDosya, Kullanici
+from models import ARAMA_VEKTORU_SQL, KalibrasyonRaporu, OlcumSonucu, RaporDosya, Kullanici, RaporIsi, TranskripsiyonOnbellegi
 from new_models import Organizasyon, CihazTanim, Kalibrasyon, FormSablonu
 from standards_models import CalibrasyonStandardi, StandardSablon, SablonParametre
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# İç alanlarına göre sorgulanan, JSONB + GIN indeksli kolonlar
+JSONB_KOLONLARI = [
+    ("kalibrasyon_raporlari", "rapor_data"),
+    ("kalibrasyonlar", "olcum_verileri"),
+    ("cihaz_tanimlari", "kalibrasyon_noktalari"),
+]
+
 
 async def init_db():
     """Veritabanı tablolarını oluştur"""
@@ -21,9 +29,35 @@ async def init_db():
     engine = create_async_engine(DATABASE_URL, echo=True)
     
     async with engine.begin() as conn:
+        # Seri/sertifika no bulanık araması için trigram indeksleri bu eklentiye ihtiyaç duyar
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        
         # Tüm tabloları oluştur
         logger.info("Tablolar oluşturuluyor...")
         await conn.run_sync(Base.metadata.create_all)
+        
+        # Daha önce oluşturulmuş veritabanlarında arama kolonunu ve indekslerini ekle
+        # (mevcut satırlar için vektör, kolon eklenirken Postgres tarafından hesaplanır)
+        await conn.execute(text(
+            "ALTER TABLE kalibrasyon_raporlari ADD COLUMN IF NOT EXISTS arama_vektoru tsvector "
+            f"GENERATED ALWAYS AS ({ARAMA_VEKTORU_SQL}) STORED"
+        ))
+        
+        # Eski JSON kolonlarını JSONB'ye çevir (GIN indeksleri JSONB ister)
+        for tablo, kolon in JSONB_KOLONLARI:
+            tip = (await conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = :tablo AND column_name = :kolon"
+            ), {"tablo": tablo, "kolon": kolon})).scalar_one_or_none()
+            if tip == "json":
+                logger.info(f"{tablo}.{kolon} JSONB'ye çevriliyor...")
+                await conn.execute(text(
+                    f"ALTER TABLE {tablo} ALTER COLUMN {kolon} TYPE jsonb USING {kolon}::jsonb"
+                ))
+        
+        for model in (KalibrasyonRaporu, Kalibrasyon, CihazTanim):
+            for index in model.__table__.indexes:
+                await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
         logger.info("Tablolar başarıyla oluşturuldu!")
     
     await engine.dispose()
@@ -0,0 +1,201 @@
+"""
+Arka plan iş kuyruğu - rapor kaydetme ve PDF üretimini HTTP isteğinden ayırır.
+İşler veritabanında (rapor_isleri) tutulur, süreç çökse bile açılışta kaldığı yerden devam eder.
+Bir iş çalıştırılmadan önce veritabanında atomik olarak sahiplenilir; aynı iş birden fazla
+kuyrukta (ya da birden fazla uvicorn worker'ında) olsa bile yalnızca bir kez çalışır.
+"""
+import asyncio
+import os
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import RaporIsi
+
+# Aynı anda çalışacak iş sayısı ve kuyrukta bekleyebilecek en fazla iş
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "200"))
+# Hata durumunda toplam deneme sayısı ve denemeler arası bekleme (saniye, her denemede artar)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "2"))
+# 'calisiyor' durumundaki iş bu süreden (saniye) uzun süredir güncellenmediyse sahibi çökmüş sayılır
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+
+class JobQueueFull(Exception):
+    """Kuyruk dolu - yeni iş kabul edilmiyor"""
+
+
+class JobPermanentError(Exception):
+    """Tekrar denemenin anlamı olmayan hata (ör. geçersiz veri) - iş doğrudan hataya düşer"""
+
+
+class JobQueue:
+    """Sınırlı worker havuzlu, veritabanı destekli iş kuyruğu"""
+
+    def __init__(self, workers: int, max_size: int):
+        self.workers = workers
+        self.max_size = max_size
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    def handler(self, tur: str):
+        """İş tipi için handler kaydet (dekoratör). Handler kendi DB oturumunu açar."""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[tur] = func
+            return func
+        return register
+
+    async def start(self):
+        """Yarım kalan işleri kuyruğa al, ardından worker'ları başlat"""
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    def full(self) -> bool:
+        return self._queue is None or self._queue.full()
+
+    async def enqueue(self, tur: str, payload: dict, db: Optional[AsyncSession] = None) -> int:
+        """
+        İşi kaydet ve kuyruğa ekle, iş id'sini döndür.
+        db verilirse iş o oturumdaki değişikliklerle aynı transaction'da commit edilir
+        (ör. kayıt + PDF işi birlikte yazılır ya da hiçbiri yazılmaz).
+        """
+        if tur not in self._handlers:
+            raise ValueError(f"Bilinmeyen iş tipi: {tur}")
+        if self.full():
+            raise JobQueueFull("İş kuyruğu dolu, lütfen daha sonra tekrar deneyin")
+
+        job = RaporIsi(tur=tur, durum="bekliyor", payload=payload, deneme=0)
+        if db is not None:
+            db.add(job)
+            await db.commit()
+        else:
+            async with AsyncSessionLocal() as db:
+                db.add(job)
+                await db.commit()
+        job_id = job.id
+
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            # Kayıt sırasında kuyruk dolduysa iş kaybolmasın, yer açılınca eklensin
+            self._schedule(job_id, 0)
+        return job_id
+
+    def _schedule(self, job_id: int, delay: float):
+        task = asyncio.create_task(self._retry_later(job_id, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _recover(self):
+        """
+        Bekleyen işleri ve sahibi çökmüş (kira süresi dolmuş) çalışan işleri kuyruğa al.
+        Başka bir process'in hâlâ çalıştırdığı işlere dokunulmaz.
+        """
+        sinir = datetime.now(timezone.utc) - timedelta(seconds=JOB_LEASE_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(RaporIsi)
+                    .where(
+                        RaporIsi.durum == "calisiyor",
+                        func.coalesce(RaporIsi.updated_at, RaporIsi.created_at) < sinir,
+                    )
+                    .values(durum="bekliyor")
+                )
+                result = await db.execute(
+                    select(RaporIsi.id).where(RaporIsi.durum == "bekliyor").order_by(RaporIsi.id)
+                )
+                job_ids = result.scalars().all()
+                await db.commit()
+        except Exception as e:
+            print(f"İş kuyruğu kurtarma hatası: {str(e)}")
+            return
+
+        for job_id in job_ids:
+            try:
+                self._queue.put_nowait(job_id)
+            except asyncio.QueueFull:
+                # Worker'lar henüz başlamadı; kalanlar yer açıldıkça eklenir
+                self._schedule(job_id, 0)
+        if job_ids:
+            print(f"{len(job_ids)} yarım kalmış iş tekrar kuyruğa alındı")
+
+    async def _retry_later(self, job_id: int, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Durum güncellenemediyse (ör. DB bağlantısı koptu) iş bir sonraki açılışta kurtarılır
+                print(f"İş #{job_id} çalıştırma hatası: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int):
+        # İşi atomik olarak sahiplen - başka bir worker/process aldıysa satır dönmez
+        async with AsyncSessionLocal() as db:
+            job = (await db.execute(
+                update(RaporIsi)
+                .where(RaporIsi.id == job_id, RaporIsi.durum == "bekliyor")
+                .values(
+                    durum="calisiyor",
+                    deneme=func.coalesce(RaporIsi.deneme, 0) + 1,
+                    updated_at=func.now(),
+                )
+                .returning(RaporIsi.tur, RaporIsi.payload, RaporIsi.deneme)
+            )).first()
+            await db.commit()
+        if job is None:
+            return
+        tur, payload, deneme = job
+
+        try:
+            sonuc = await self._handlers[tur](payload)
+        except Exception as e:
+            print(f"İş #{job_id} ({tur}) hata, deneme {deneme}/{JOB_MAX_ATTEMPTS}: {str(e)}")
+            print(traceback.format_exc())
+            tekrar = deneme < JOB_MAX_ATTEMPTS and not isinstance(e, JobPermanentError)
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(RaporIsi).where(RaporIsi.id == job_id, RaporIsi.durum == "calisiyor").values(
+                        durum="bekliyor" if tekrar else "hata",
+                        hata=str(e),
+                    )
+                )
+                await db.commit()
+            if tekrar:
+                self._schedule(job_id, JOB_RETRY_DELAY * deneme)
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(RaporIsi).where(RaporIsi.id == job_id, RaporIsi.durum == "calisiyor").values(
+                    durum="tamamlandi", sonuc=sonuc, hata=None
+                )
+            )
+            await db.commit()
+
+
+job_queue = JobQueue(JOB_WORKERS, JOB_QUEUE_MAX)
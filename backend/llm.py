@@ -0,0 +1,130 @@
+"""
+OpenAI erişim katmanı - uygulama boyunca tek bir AsyncOpenAI istemcisi ve
+paylaşılan httpx bağlantı havuzu kullanılır. Her endpoint tipinin kendi eşzamanlılık
+sınırı vardır; geçici hatalar jitter'lı üstel bekleme ile tekrar denenir.
+"""
+import asyncio
+import os
+import random
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+import openai
+
+# Zaman aşımları (saniye)
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+# Paylaşılan bağlantı havuzu
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+# Tekrar deneme: toplam deneme sayısı ve bekleme sınırları
+OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", "3"))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8"))
+
+# Endpoint tipi başına aynı anda yapılabilecek çağrı sayısı
+CONCURRENCY_LIMITS = {
+    "transcribe": int(os.getenv("OPENAI_CONCURRENCY_TRANSCRIBE", "4")),
+    "vision": int(os.getenv("OPENAI_CONCURRENCY_VISION", "4")),
+    "report": int(os.getenv("OPENAI_CONCURRENCY_REPORT", "4")),
+}
+
+T = TypeVar("T")
+
+
+def _tekrar_denenebilir(e: Exception) -> bool:
+    if isinstance(e, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return False
+
+
+def _bekleme(deneme: int, e: Exception) -> float:
+    """Full jitter üstel bekleme; sunucu Retry-After verdiyse ona uy"""
+    if isinstance(e, openai.APIStatusError):
+        retry_after = e.response.headers.get("retry-after")
+        try:
+            return min(float(retry_after), OPENAI_RETRY_MAX_DELAY)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(OPENAI_RETRY_MAX_DELAY, OPENAI_RETRY_BASE_DELAY * 2 ** deneme))
+
+
+class OpenAIGateway:
+    """Uygulama ömrü boyunca yaşayan OpenAI istemcisi"""
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self):
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            ),
+        )
+        self._limits = {tur: asyncio.Semaphore(n) for tur, n in CONCURRENCY_LIMITS.items()}
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            print("UYARI: OPENAI_API_KEY tanımlı değil, yapay zeka endpoint'leri çalışmayacak")
+            return
+        # Tekrar denemeyi kendimiz yapıyoruz (jitter + endpoint sınırı içinde)
+        self._client = openai.AsyncOpenAI(api_key=api_key, http_client=self._http, max_retries=0)
+
+    async def stop(self):
+        if self._http:
+            await self._http.aclose()
+        self._http = None
+        self._client = None
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        if self._client is None:
+            raise RuntimeError("OpenAI istemcisi hazır değil (OPENAI_API_KEY tanımlı mı?)")
+        return self._client
+
+    async def _with_retry(self, tur: str, request: Callable[[openai.AsyncOpenAI], Awaitable[T]]) -> T:
+        client = self.client
+        for deneme in range(OPENAI_MAX_ATTEMPTS):
+            try:
+                return await request(client)
+            except Exception as e:
+                if deneme + 1 >= OPENAI_MAX_ATTEMPTS or not _tekrar_denenebilir(e):
+                    raise
+                bekleme = _bekleme(deneme, e)
+                print(f"OpenAI {tur} hatası, {bekleme:.1f} sn sonra tekrar denenecek: {str(e)}")
+                await asyncio.sleep(bekleme)
+
+    async def call(self, tur: str, request: Callable[[openai.AsyncOpenAI], Awaitable[T]]) -> T:
+        """İsteği endpoint sınırı içinde çalıştır, geçici hatalarda tekrar dene"""
+        async with self._limits[tur]:
+            return await self._with_retry(tur, request)
+
+    async def transcribe(self, path: Path, model: str, language: str) -> str:
+        response = await self.call("transcribe", lambda c: c.audio.transcriptions.create(
+            model=model, file=path, language=language
+        ))
+        return response.text
+
+    async def chat(self, tur: str, **kwargs):
+        return await self.call(tur, lambda c: c.chat.completions.create(**kwargs))
+
+    async def chat_stream(self, tur: str, **kwargs) -> AsyncIterator[str]:
+        """Yanıtı token token ver. Sadece bağlantı kurulurken tekrar denenir; akış başladıktan sonra hata yukarı iletilir."""
+        async with self._limits[tur]:
+            stream = await self._with_retry(tur, lambda c: c.chat.completions.create(stream=True, **kwargs))
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
+
+gateway = OpenAIGateway()
@@ -1,25 +1,46 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from pydantic import BaseModel
-import openai
 import os
 from pathlib import Path
 import json
+import mimetypes
 from datetime import datetime
 from dotenv import load_dotenv
 import base64
+import io
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
 from fpdf import FPDF
+from PIL import Image, UnidentifiedImageError
 import aiofiles
-from concurrent.futures import ThreadPoolExecutor
 import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from database import get_db
-from models import KalibrasyonRaporu, OlcumSonucu, RaporDosya
+from sqlalchemy import select, desc, update, insert, func, tuple_, or_, literal_column
+from database import get_db, AsyncSessionLocal, engine
+from models import KalibrasyonRaporu, OlcumSonucu, RaporDosya, RaporIsi
 from new_models import Organizasyon, CihazTanim, Kalibrasyon, DurumEnum, CihazTipiEnum
-from standards_models import CalibrasyonStandardi, StandardSablon, SablonParametre
+from standards_catalog import catalog
+import conformity
+import uncertainty
+import audio
+import images
+import llm
+import pipeline
+import projections
+from responses import FastJSONResponse
+from report_drafts import draft_cache, draft_key, SectionParser
+from transcription_cache import transcription_cache
+import fonts
+import pdf_engine
+import pdf_cache
+from jobs import job_queue, JobQueueFull, JobPermanentError
 
 # production.env dosyasını yükle
 env_file = Path(__file__).parent / "production.env"
@@ -28,7 +49,26 @@ if env_file.exists():
 else:
     load_dotenv()  # .env dosyasını dene
 
-app = FastAPI(title="VIDCO AI Co-Pilot Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fontları worker'lar fork edilmeden önce yükle, böylece hepsi hazır devralır
+    await asyncio.to_thread(fonts.registry.load)
+    # PDF render worker'larını açılışta başlat (ilk sertifika beklemesin)
+    await asyncio.to_thread(pdf_engine.start_pool)
+    # Rapor kaydetme işlerinin worker'ları (yarım kalan işler de kuyruğa alınır)
+    await job_queue.start()
+    # Tek, paylaşılan OpenAI istemcisi ve bağlantı havuzu
+    await llm.gateway.start()
+    yield
+    await llm.gateway.stop()
+    await job_queue.stop()
+    pdf_engine.shutdown_pool()
+    await engine.dispose()
+
+
+# Yanıtlar varsayılan olarak orjson ile kodlanır (bkz. responses.py)
+app = FastAPI(title="VIDCO AI Co-Pilot Backend", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # CORS ayarları - Development için wildcard, production için spesifik originler
 app.add_middleware(
@@ -41,15 +81,22 @@ app.add_middleware(
     max_age=600,
 )
 
-# OpenAI API Key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 # Dosya kaydetme dizini
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# Thread pool for CPU-intensive tasks
-executor = ThreadPoolExecutor(max_workers=4)
+# Toplu sertifika ZIP'leri indirilmek üzere bu süre (saniye) saklanır, sonra silinir
+CERTIFICATE_ZIP_TTL_SECONDS = float(os.getenv("CERTIFICATE_ZIP_TTL_SECONDS", "3600"))
+
+# /api/analyze-images isteğinde kabul edilen en fazla görsel
+ANALYZE_IMAGES_MAX_FILES = int(os.getenv("ANALYZE_IMAGES_MAX_FILES", "20"))
+
+# Transkripsiyon modeli ve dili (önbellek anahtarının parçası)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-1")
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "tr")
+
+# Önizleme PDF'leri bu boyutta parçalar halinde stream edilir
+PDF_STREAM_CHUNK = 64 * 1024
 
 
 class TranscriptionRequest(BaseModel):
@@ -94,6 +141,7 @@ class OlcumItem(BaseModel):
     olculenDeger: float
     sapma: float
     belirsizlik: float
+    okumalar: Optional[List[float]] = None  # Tekrarlı okumalar (A tipi belirsizlik için)
 
 class OlcumSonuclari(BaseModel):
     disCapOlcumleri: list[OlcumItem]
@@ -105,6 +153,7 @@ class OlcumSonuclari(BaseModel):
 class UygunlukDegerlendirmesi(BaseModel):
     sonuc: bool
     aciklama: str
+    olcumBelirsizligiAciklama: Optional[str] = None  # Hesaplanan bütçeden (k değeri)
 
 class Personel(BaseModel):
     adSoyad: str
@@ -132,72 +181,108 @@ class ImageAnalysisRequest(BaseModel):
     image_base64: str
 
 
+class RaporSorgusu(BaseModel):
+    filtre: dict  # rapor_data'nın içermesi gereken parça (JSONB @>)
+    alanlar: List[str] = []  # dönecek rapor_data alt yolları, örn. "genelBilgiler.musteriAdi"
+    limit: int = 20
+    offset: int = 0
+
+
+class BelirsizlikNoktasi(BaseModel):
+    nominal: float
+    okumalar: Optional[List[float]] = None  # A tipi için tekrarlı okumalar
+
+class BelirsizlikRequest(BaseModel):
+    noktalar: List[BelirsizlikNoktasi]
+    cozunurluk: float  # mm
+    sicaklik: Optional[str] = None  # "20 ± 1°C" gibi
+    referans_sabit: float = uncertainty.BELIRSIZLIK_REFERANS_SABIT_MM
+    referans_oransal: float = uncertainty.BELIRSIZLIK_REFERANS_ORANSAL
+    referans_k: float = uncertainty.BELIRSIZLIK_REFERANS_K
+
+
 @app.get("/")
 async def root():
     return {"message": "VIDCO AI Co-Pilot Backend API", "status": "running"}
 
 
-@app.post("/api/speech-to-text")
-async def speech_to_text(file: UploadFile = File(...)):
-    """
-    Ses dosyasını metne çevirir (OpenAI Whisper kullanarak)
-    """
+async def _transcribe_upload(file: UploadFile) -> dict:
+    """Ses yüklemesini transkribe et: {"text", "onbellek"} veya {"text", "segment_sayisi"}"""
+    # Her istek kendi geçici dizininde çalışır, aynı isimli yüklemeler çakışmaz
+    workdir = Path(await asyncio.to_thread(tempfile.mkdtemp, prefix="ses_"))
     try:
-        # Dosyayı asenkron kaydet
-        file_path = UPLOAD_DIR / file.filename
-        content = await file.read()
+        # Yüklemeyi parça parça diske yaz
+        file_path, ses_hash = await audio.spool_upload(file, workdir)
         
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
+        # Aynı kayıt daha önce transkribe edildiyse Whisper'a gitme
+        metin = await transcription_cache.get(ses_hash, WHISPER_MODEL, WHISPER_LANGUAGE)
+        if metin is not None:
+            return {"text": metin, "onbellek": True}
         
-        # OpenAI Whisper çağrısını thread pool'da çalıştır (blocking I/O)
-        def transcribe_audio():
-            with open(file_path, "rb") as audio_file:
-                return openai.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="tr"
-                )
+        # Uzun kayıtları segmentlere böl
+        segmentler = await audio.split_segments(file_path, workdir)
         
-        loop = asyncio.get_event_loop()
-        transcript = await loop.run_in_executor(executor, transcribe_audio)
+        async def transcribe_segment(segment: Path) -> str:
+            return await llm.gateway.transcribe(segment, WHISPER_MODEL, WHISPER_LANGUAGE)
         
-        # Dosyayı asenkron sil
-        await asyncio.to_thread(file_path.unlink)
+        parcalar = await audio.transcribe_segments(segmentler, transcribe_segment)
+        metin = audio.stitch(parcalar)
+        await transcription_cache.put(ses_hash, WHISPER_MODEL, WHISPER_LANGUAGE, metin)
         
-        return {"text": transcript.text, "status": "success"}
+        return {"text": metin, "segment_sayisi": len(segmentler)}
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Transkripsiyon hatası: {str(e)}")
+    finally:
+        await asyncio.to_thread(shutil.rmtree, workdir, True)
 
 
-@app.post("/api/analyze-image")
-async def analyze_image(file: UploadFile = File(...)):
+@app.post("/api/speech-to-text")
+async def speech_to_text(file: UploadFile = File(...)):
     """
-    Görsel analizi yapar (OpenAI GPT-4 Vision kullanarak)
+    Ses dosyasını metne çevirir (OpenAI Whisper kullanarak)
     """
     try:
-        # Dosyayı oku ve base64'e çevir
-        content = await file.read()
-        base64_image = base64.b64encode(content).decode('utf-8')
-        
-        # OpenAI Vision API çağrısını thread pool'da çalıştır
-        def analyze_with_vision():
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
-            return client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Sen bir muayene ve kalibrasyon uzmanısın. Cihaz fotoğraflarını analiz edip detaylı raporlar oluşturursun."
-                    },
+        return {**await _transcribe_upload(file), "status": "success"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Transkripsiyon hatası: {str(e)}")
+
+
+@app.get("/api/speech-to-text/cache")
+async def transcription_cache_stats():
+    """Transkripsiyon önbelleği isabet/ıska sayıları"""
+    return await transcription_cache.stats()
+
+
+async def _prepare_image(file: UploadFile) -> images.HazirGorsel:
+    """Orijinali bir kez sakla, modele gidecek küçültülmüş kopyayı hazırla"""
+    tmp_path, image_hash = await images.store_upload(file, UPLOAD_DIR)
+    try:
+        return await images.prepare(tmp_path, image_hash)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise HTTPException(status_code=400, detail=f"Görsel okunamadı: {str(e)}")
+    finally:
+        # Başarılı olursa geçici dosya kalıcı adına taşınmıştır
+        await asyncio.to_thread(tmp_path.unlink, True)
+
+
+async def _vision_analyze(gorsel: images.HazirGorsel) -> dict:
+    """Hazırlanmış görseli vision modeline gönder, analiz JSON'unu döndür"""
+    base64_image = base64.b64encode(gorsel.data).decode('utf-8')
+    
+    # OpenAI Vision API çağrısı - paylaşılan async istemci, thread pool kullanılmaz
+    response = await llm.gateway.chat(
+        "vision",
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "system",
+                "content": "Sen bir muayene ve kalibrasyon uzmanısın. Cihaz fotoğraflarını analiz edip detaylı raporlar oluşturursun."
+            },
+            {
+                "role": "user",
+                "content": [
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": """Bu cihazı analiz et ve şu bilgileri JSON formatında ver:
+                        "type": "text",
+                        "text": """Bu cihazı analiz et ve şu bilgileri JSON formatında ver:
 {
     "cihaz_turu": "Cihaz türü (basınç ölçer, termometre, vb.)",
     "gorsel_durum": "Cihazın görsel durumu (hasar, aşınma, temizlik)",
@@ -207,48 +292,52 @@ async def analyze_image(file: UploadFile = File(...)):
 }
 
 Sadece geçerli JSON döndür."""
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
-                            }
-                        ]
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{gorsel.mime};base64,{base64_image}"
+                        }
                     }
-                ],
-                max_tokens=500,
-                temperature=0.3
-            )
-        
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(executor, analyze_with_vision)
-        
-        # JSON parse et
-        analysis_text = response.choices[0].message.content
-        
-        # JSON ayıklama (bazen markdown code block içinde geliyor)
-        if "```json" in analysis_text:
-            analysis_text = analysis_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in analysis_text:
-            analysis_text = analysis_text.split("```")[1].split("```")[0].strip()
-        
-        analysis_json = json.loads(analysis_text)
-        
-        # Görseli asenkron kaydet
-        image_filename = f"image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        image_path = UPLOAD_DIR / image_filename
-        
-        async with aiofiles.open(image_path, "wb") as f:
-            await f.write(content)
+                ]
+            }
+        ],
+        max_tokens=500,
+        temperature=0.3
+    )
+    
+    # JSON parse et
+    analysis_text = response.choices[0].message.content
+    
+    # JSON ayıklama (bazen markdown code block içinde geliyor)
+    if "```json" in analysis_text:
+        analysis_text = analysis_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in analysis_text:
+        analysis_text = analysis_text.split("```")[1].split("```")[0].strip()
+    
+    analysis_json = json.loads(analysis_text)
+    
+    return analysis_json
+
+
+@app.post("/api/analyze-image")
+async def analyze_image(file: UploadFile = File(...)):
+    """
+    Görsel analizi yapar (OpenAI GPT-4 Vision kullanarak)
+    """
+    try:
+        gorsel = await _prepare_image(file)
+        analysis_json = await _vision_analyze(gorsel)
         
         return {
             "analysis": analysis_json,
-            "image_filename": image_filename,
-            "image_base64": base64_image,
+            "image_filename": gorsel.orijinal,
+            "thumbnail_url": f"/api/images/{gorsel.kucuk_resim}",
             "status": "success"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"GORSEL ANALIZ HATA: {str(e)}")
@@ -256,16 +345,86 @@ Sadece geçerli JSON döndür."""
         raise HTTPException(status_code=500, detail=f"Görsel analiz hatası: {str(e)}")
 
 
-@app.post("/api/generate-report")
-async def generate_report(request: TranscriptionRequest):
+async def _analyze_upload(file: UploadFile) -> dict:
+    """Tek fotoğrafı hazırla ve analiz et; hata yukarı atılmaz, sonuçta status='error' döner"""
+    try:
+        gorsel = await _prepare_image(file)
+        analysis_json = await _vision_analyze(gorsel)
+    except Exception as e:
+        hata = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"GORSEL ANALIZ HATA ({file.filename}): {hata}")
+        return {"dosya": file.filename, "status": "error", "error": hata}
+    return {
+        "dosya": file.filename,
+        "analysis": analysis_json,
+        "image_filename": gorsel.orijinal,
+        "thumbnail_url": f"/api/images/{gorsel.kucuk_resim}",
+        "status": "success"
+    }
+
+
+@app.post("/api/analyze-images")
+async def analyze_images(files: List[UploadFile] = File(...)):
     """
-    Metinden rapor verisi oluşturur (GPT-4o kullanarak)
+    Bir cihazın birden fazla fotoğrafını birlikte analiz eder.
+    Görseller paralel hazırlanır ve analiz edilir (eşzamanlılık llm.gateway'in vision sınırıyla),
+    anomaliler/öneriler tekilleştirilerek birleştirilir. Bazı görseller başarısız olursa
+    kalanların sonucu döner.
     """
-    try:
-        prompt = f"""
+    if len(files) > ANALYZE_IMAGES_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"En fazla {ANALYZE_IMAGES_MAX_FILES} görsel gönderilebilir"
+        )
+    
+    sonuclar = await asyncio.gather(*(_analyze_upload(f) for f in files))
+    basarili = [s for s in sonuclar if s["status"] == "success"]
+    if not basarili:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Görsel analiz hatası: {sonuclar[0]['error'] if sonuclar else 'görsel yok'}"
+        )
+    
+    return {
+        "analysis": images.merge_analyses([s["analysis"] for s in basarili]),
+        "images": sonuclar,
+        "basarili": len(basarili),
+        "basarisiz": len(sonuclar) - len(basarili),
+        "status": "success" if len(basarili) == len(sonuclar) else "partial"
+    }
+
+
+@app.get("/api/images/{filename}")
+async def get_image(filename: str):
+    """Saklanan görseli veya küçük resmini döndür"""
+    image_path = UPLOAD_DIR / filename
+    if (
+        Path(filename).name != filename
+        or not filename.startswith(("image_", "thumb_"))
+        or filename.endswith(".tmp")
+        or not await asyncio.to_thread(image_path.is_file)
+    ):
+        raise HTTPException(status_code=404, detail="Görsel bulunamadı")
+    
+    # Uzantı saklanırken Pillow'un tanıdığı formattan verildi; tarayıcı içeriği başka türe yorumlamasın
+    media_type = mimetypes.guess_type(filename)[0]
+    if not media_type or not media_type.startswith("image/"):
+        raise HTTPException(status_code=404, detail="Görsel bulunamadı")
+    
+    # İçerik hash'iyle adlandırıldığı için dosya değişmez, uzun süre önbelleklenebilir
+    return FileResponse(
+        path=str(image_path),
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "X-Content-Type-Options": "nosniff"}
+    )
+
+
+def _report_prompt(text: str) -> str:
+    """generate_report prompt'u (değiştirildiğinde REPORT_PROMPT_VERSION artırılmalı)"""
+    return f"""
 Aşağıdaki ses kaydı metninden detaylı bir kalibrasyon sertifikası oluştur.
 
-Metin: {request.text}
+Metin: {text}
 
 Tam bu JSON formatında döndür:
 {{
@@ -389,102 +548,221 @@ Tam bu JSON formatında döndür:
 ÖNEMLI: Ses kaydından çıkarabileceğin bilgileri kullan, yoksa yukarıdaki varsayılan değerleri kullan.
 Sadece geçerli JSON döndür, başka açıklama ekleme.
 """
-        
-        # OpenAI API çağrısını thread pool'da çalıştır
-        def generate_with_gpt():
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
-            return client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Sen bir muayene raporu analisti asistanısın. Verilen metinden yapılandırılmış JSON verisi çıkarırsın. Sadece geçerli JSON döndür."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-        
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(executor, generate_with_gpt)
-        
-        report_json = json.loads(response.choices[0].message.content)
-        
-        return report_json
+
+
+def _report_request(text: str) -> dict:
+    """Rapor taslağı için chat completion parametreleri (normal ve akış modunda aynı)"""
+    return dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "Sen bir muayene raporu analisti asistanısın. Verilen metinden yapılandırılmış JSON verisi çıkarırsın. Sadece geçerli JSON döndür."},
+            {"role": "user", "content": _report_prompt(text)}
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+
+
+async def _generate_report_draft(text: str) -> dict:
+    """Transkripsiyon metninden GPT ile sertifika taslağı üret"""
+    # OpenAI API çağrısı - paylaşılan async istemci, thread pool kullanılmaz
+    response = await llm.gateway.chat("report", **_report_request(text))
     
-    except Exception as e:
-        # Hata durumunda fallback olarak kalibrasyon sertifikası formatında demo data döndür
-        print(f"GPT HATA: {str(e)}")
-        return {
-            "kalibrasyon_sertifikasi": {
-                "sertifika_bilgileri": {
-                    "firma": "AS KALİBRASYON İÇ VE DIŞ TİCARET SAN. PAZ. LTD.ŞTİ.",
-                    "adres": "Meriç Mahallesi 5747/10 Sokak No:12/2 Bornova / İZMİR",
-                    "telefon": "232 247 07 44",
-                    "faks": "232 431 07 44",
-                    "email": "satis@askalibrasyon.com",
-                    "website": "www.askalibrasyon.com",
-                    "akreditasyon_no": "AB-0068-K",
-                    "sertifika_no": f"KAL-DEMO-{datetime.now().strftime('%Y%m%d-%H%M')}",
-                    "tarih": datetime.now().strftime('%d.%m.%Y')
-                },
-                "musteri_bilgileri": {
-                    "sahibi": "TEST MÜŞTERİSİ",
-                    "adres": "Demo adres - GPT hatası",
-                    "istek_numarasi": f"İ-DEMO-{datetime.now().strftime('%y-%m%d')} / 1"
-                },
-                "cihaz_bilgileri": {
-                    "makine_cihaz": "KUMPAS (Demo)",
-                    "imalatci": "-",
-                    "tip": "VERNİYERLİ",
-                    "seri_numarasi": "DEMO-001",
-                    "kalibrasyon_tarihi": datetime.now().strftime('%d.%m.%Y'),
-                    "sayfa_sayisi": 2,
-                    "olcme_araligi": "0-150 mm",
-                    "cozunurluk": "0.01 mm"
-                },
-                "kalibrasyon_detaylari": {
-                    "laboratuvara_kabul_tarihi": datetime.now().strftime('%d.%m.%Y'),
-                    "yontem_prosedur": "DEMO - GPT hatası nedeniyle varsayılan veri",
-                    "cevre_sartlari": {
-                        "sicaklik": "20 ± 1°C",
-                        "bagil_nem": "%45 ± 25 %rh",
-                        "aciklama": f"Orijinal ses kaydı: {request.text[:100]}..."
-                    }
-                },
-                "referans_cihazlar": [],
-                "fonksiyonellik_kontrolu": {
-                    "olcme_ceneleri": "Demo",
-                    "tespitleme_vidasi": "Demo",
-                    "gosterge": "Demo",
-                    "tambur_yatak_boslugu": "-",
-                    "ic_cap_olcme_ceneleri": "-",
-                    "derinlik_olcme_ceneleri": "-"
-                },
-                "olcum_sonuclari": {
-                    "dis_cap_olcumleri": [],
-                    "ic_cap_olcumleri": [],
-                    "derinlik_olcumleri": [],
-                    "kademe_olcumleri": []
-                },
-                "uygunluk_degerlendirmesi": {
-                    "karar_kurali": "DEMO VERİ - GPT hatası",
-                    "aciklamalar": [f"GPT Hatası: {str(e)}"],
-                    "olcum_belirsizligi_aciklama": "Demo veri"
+    return json.loads(response.choices[0].message.content)
+
+
+def _fallback_report(text: str, e: Exception) -> dict:
+    """GPT'ye ulaşılamazsa dönen demo sertifika verisi"""
+    return {
+        "kalibrasyon_sertifikasi": {
+            "sertifika_bilgileri": {
+                "firma": "AS KALİBRASYON İÇ VE DIŞ TİCARET SAN. PAZ. LTD.ŞTİ.",
+                "adres": "Meriç Mahallesi 5747/10 Sokak No:12/2 Bornova / İZMİR",
+                "telefon": "232 247 07 44",
+                "faks": "232 431 07 44",
+                "email": "satis@askalibrasyon.com",
+                "website": "www.askalibrasyon.com",
+                "akreditasyon_no": "AB-0068-K",
+                "sertifika_no": f"KAL-DEMO-{datetime.now().strftime('%Y%m%d-%H%M')}",
+                "tarih": datetime.now().strftime('%d.%m.%Y')
+            },
+            "musteri_bilgileri": {
+                "sahibi": "TEST MÜŞTERİSİ",
+                "adres": "Demo adres - GPT hatası",
+                "istek_numarasi": f"İ-DEMO-{datetime.now().strftime('%y-%m%d')} / 1"
+            },
+            "cihaz_bilgileri": {
+                "makine_cihaz": "KUMPAS (Demo)",
+                "imalatci": "-",
+                "tip": "VERNİYERLİ",
+                "seri_numarasi": "DEMO-001",
+                "kalibrasyon_tarihi": datetime.now().strftime('%d.%m.%Y'),
+                "sayfa_sayisi": 2,
+                "olcme_araligi": "0-150 mm",
+                "cozunurluk": "0.01 mm"
+            },
+            "kalibrasyon_detaylari": {
+                "laboratuvara_kabul_tarihi": datetime.now().strftime('%d.%m.%Y'),
+                "yontem_prosedur": "DEMO - GPT hatası nedeniyle varsayılan veri",
+                "cevre_sartlari": {
+                    "sicaklik": "20 ± 1°C",
+                    "bagil_nem": "%45 ± 25 %rh",
+                    "aciklama": f"Orijinal ses kaydı: {text[:100]}..."
+                }
+            },
+            "referans_cihazlar": [],
+            "fonksiyonellik_kontrolu": {
+                "olcme_ceneleri": "Demo",
+                "tespitleme_vidasi": "Demo",
+                "gosterge": "Demo",
+                "tambur_yatak_boslugu": "-",
+                "ic_cap_olcme_ceneleri": "-",
+                "derinlik_olcme_ceneleri": "-"
+            },
+            "olcum_sonuclari": {
+                "dis_cap_olcumleri": [],
+                "ic_cap_olcumleri": [],
+                "derinlik_olcumleri": [],
+                "kademe_olcumleri": []
+            },
+            "uygunluk_degerlendirmesi": {
+                "karar_kurali": "DEMO VERİ - GPT hatası",
+                "aciklamalar": [f"GPT Hatası: {str(e)}"],
+                "olcum_belirsizligi_aciklama": "Demo veri"
+            },
+            "onay_bilgileri": {
+                "yayim_tarihi": datetime.now().strftime('%d.%m.%Y'),
+                "kalibrasyonu_yapan": {
+                    "isim": "Demo Personel",
+                    "unvan": "Kalibrasyon Personeli"
                 },
-                "onay_bilgileri": {
-                    "yayim_tarihi": datetime.now().strftime('%d.%m.%Y'),
-                    "kalibrasyonu_yapan": {
-                        "isim": "Demo Personel",
-                        "unvan": "Kalibrasyon Personeli"
-                    },
-                    "onaylayan": {
-                        "isim": "Demo Müdür",
-                        "unvan": "Teknik Müdür",
-                        "tarih": datetime.now().strftime('%d.%m.%Y')
-                    }
+                "onaylayan": {
+                    "isim": "Demo Müdür",
+                    "unvan": "Teknik Müdür",
+                    "tarih": datetime.now().strftime('%d.%m.%Y')
                 }
             }
         }
+    }
+
+
+@app.post("/api/generate-report")
+async def generate_report(request: TranscriptionRequest):
+    """
+    Metinden rapor verisi oluşturur (GPT-4o kullanarak)
+    """
+    try:
+        # Aynı metin daha önce işlendiyse ya da şu an işleniyorsa GPT'ye tekrar gitme
+        return await draft_cache.get_or_create(
+            draft_key(request.text),
+            lambda: _generate_report_draft(request.text)
+        )
+    
+    except Exception as e:
+        # Hata durumunda fallback olarak kalibrasyon sertifikası formatında demo data döndür
+        print(f"GPT HATA: {str(e)}")
+        return _fallback_report(request.text, e)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/generate-report/stream")
+async def generate_report_stream(request: TranscriptionRequest):
+    """
+    generate_report'un akış (SSE) versiyonu.
+    Olaylar: token (model çıktısı), section (tamamlanan bölüm), done (generate_report ile aynı son veri)
+    Aynı metin için süren üretim (akışlı ya da normal) tekrar başlatılmaz: sonradan gelen istek
+    onun bitmesini bekler, bölümleri ve son veriyi hazır taslaktan gönderir.
+    """
+    key = draft_key(request.text)
+    
+    async def events():
+        kuyruk: asyncio.Queue = asyncio.Queue()
+        
+        async def uret() -> dict:
+            # Yalnızca üretimi başlatan istekte çalışır; parçalar bu isteğin kuyruğuna akar
+            parcalar = []
+            try:
+                async for delta in llm.gateway.chat_stream("report", **_report_request(request.text)):
+                    parcalar.append(delta)
+                    kuyruk.put_nowait(delta)
+            finally:
+                kuyruk.put_nowait(None)
+            return json.loads("".join(parcalar))
+        
+        parser = SectionParser(depth=2)
+        gonderilen = set()
+        
+        def isle(delta: str) -> List[str]:
+            olaylar = [_sse("token", {"delta": delta})]
+            for ad, veri in parser.feed(delta):
+                gonderilen.add(ad)
+                olaylar.append(_sse("section", {"ad": ad, "veri": veri}))
+            return olaylar
+        
+        # Üretim isteğe bağlı değil; bağlantı koparsa da biter ve önbelleğe yazılır
+        taslak = asyncio.ensure_future(draft_cache.get_or_create(key, uret))
+        try:
+            while True:
+                sonraki = asyncio.ensure_future(kuyruk.get())
+                await asyncio.wait({sonraki, taslak}, return_when=asyncio.FIRST_COMPLETED)
+                if not sonraki.done():
+                    sonraki.cancel()
+                    break
+                delta = sonraki.result()
+                if delta is None:
+                    break
+                for olay in isle(delta):
+                    yield olay
+            # Üretim bitti - kuyrukta kalan parçalar
+            while not kuyruk.empty() and (delta := kuyruk.get_nowait()) is not None:
+                for olay in isle(delta):
+                    yield olay
+            
+            report_json = await taslak
+        except Exception as e:
+            print(f"GPT HATA: {str(e)}")
+            yield _sse("done", _fallback_report(request.text, e))
+            return
+        finally:
+            taslak.cancel()
+        
+        # Önbellekten ya da başka istekten gelen taslağın bölümleri burada gönderilir
+        for ad, veri in (report_json.get("kalibrasyon_sertifikasi") or {}).items():
+            if ad not in gonderilen:
+                yield _sse("section", {"ad": ad, "veri": veri})
+        yield _sse("done", report_json)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/generate-report/cache")
+async def report_draft_cache_stats():
+    """Rapor taslağı önbelleği isabet/birleştirme sayıları"""
+    return draft_cache.stats()
+
+
+def _bytes_stream_response(content: bytes, filename: str, media_type: str = 'application/pdf') -> StreamingResponse:
+    """Bellekteki dosyayı parça parça gönder (Content-Length ile, disk turu olmadan)"""
+    async def chunks():
+        view = memoryview(content)
+        for start in range(0, len(view), PDF_STREAM_CHUNK):
+            yield view[start:start + PDF_STREAM_CHUNK]
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={
+            "Content-Length": str(len(content)),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+    )
 
 
 @app.post("/api/create-pdf")
@@ -496,38 +774,25 @@ async def create_pdf(report: ReportData):
         # Rapor numarası oluştur
         rapor_no = f"RPT-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
         
-        # PDF dosya adı
+        # PDF dosya adı (sadece indirme adı, diske yazılmıyor)
         filename = f"rapor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = UPLOAD_DIR / filename
         
         # PDF oluştur
         pdf = FPDF()
         pdf.add_page()
         
-        # Türkçe font ekle (DejaVu Sans yoksa atlayacak)
-        try:
-            pdf.add_font('DejaVu', '', 'C:/Windows/Fonts/DejaVuSans.ttf')
-            pdf.add_font('DejaVu', 'B', 'C:/Windows/Fonts/DejaVuSans-Bold.ttf')
-            pdf.set_font('DejaVu', '', 10)
-            print("DejaVu Sans fontu yüklendi")
-        except:
-            # DejaVu yoksa Arial kullan
-            pdf.add_font('Arial', '', 'C:/Windows/Fonts/arial.ttf')
-            pdf.add_font('Arial', 'B', 'C:/Windows/Fonts/arialbd.ttf')
-            pdf.set_font('Arial', '', 10)
-            print("Arial fontu kullanılıyor")
+        # Türkçe font ekle (açılışta yüklenen font önbelleğinden)
+        font_name = fonts.registry.attach(pdf)
         
         # Başlık
-        pdf.set_font('DejaVu', 'B', 18) if 'DejaVu' in pdf.fonts else pdf.set_font('Arial', 'B', 18)
+        pdf.set_font(font_name, 'B', 18)
         pdf.set_text_color(30, 58, 138)
         pdf.cell(0, 10, 'MUAYENE RAPORU', ln=True, align='C')
-        pdf.set_font('DejaVu', '', 11) if 'DejaVu' in pdf.fonts else pdf.set_font('Arial', '', 11)
+        pdf.set_font(font_name, '', 11)
         pdf.set_text_color(127, 140, 141)
         pdf.cell(0, 8, 'ISO/IEC 17020 Uyumlu Kalibrasyon Raporu', ln=True, align='C')
         pdf.ln(2)
         
-        font_name = 'DejaVu' if 'DejaVu' in pdf.fonts else 'Arial'
-        
         # GENEL BİLGİLER
         pdf.set_font(font_name, 'B', 12)
         pdf.set_text_color(44, 62, 80)
@@ -664,14 +929,8 @@ async def create_pdf(report: ReportData):
         pdf.cell(0, 5, 'Bu belge elektronik olarak oluşturulmuştur.', ln=True, align='C')
         pdf.cell(0, 5, f'Rapor No: {rapor_no} | Oluşturulma Tarihi: {report.tarih}', ln=True, align='C')
         
-        # PDF'i kaydet
-        pdf.output(str(pdf_path))
-        
-        return FileResponse(
-            path=str(pdf_path),
-            media_type='application/pdf',
-            filename=filename
-        )
+        # PDF'i bellekte üret ve diske yazmadan gönder
+        return _bytes_stream_response(bytes(pdf.output()), filename)
     
     except Exception as e:
         import traceback
@@ -680,329 +939,48 @@ async def create_pdf(report: ReportData):
         raise HTTPException(status_code=500, detail=f"PDF oluşturma hatası: {str(e)}")
 
 
+def _pdf_verisi(data) -> dict:
+    """
+    Sertifikanın render edilecek hali: belirsizlikler hesaplanan bütçeden gelir,
+    KalibrasyonSertifikasiData (camelCase) render'ın okuduğu snake_case formatına çevrilir.
+    """
+    cert = data.model_dump() if hasattr(data, 'model_dump') else data
+    cert = uncertainty.sertifikaya_uygula(cert)
+    if "olcumSonuclari" in cert:
+        cert = pipeline.sertifikadan_pdf_verisi(cert)
+    return cert
+
+
+def _kalibrasyon_pdf_yolu(cert: dict):
+    """Belirsizliği uygulanmış sertifikanın (anahtar, PDF yolu) - render etmeden bilinir"""
+    key = pdf_engine.certificate_key(cert)
+    return key, UPLOAD_DIR / f"kalibrasyon_sertifikasi_{key[:16]}.pdf"
+
+
 async def _generate_kalibrasyon_pdf(data) -> str:
     """
     Kalibrasyon sertifikası PDF'i oluşturur (ISO 17020 formatında)
+    Render işi process pool'da yapılır, event loop bloklanmaz.
     """
     try:
-        # Model'i dictionary'ye çevir
-        if hasattr(data, 'model_dump'):
-            cert = data.model_dump()
-        else:
-            cert = data
-        
-        # PDF dosya adı
-        filename = f"kalibrasyon_sertifikasi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = UPLOAD_DIR / filename
-        
-        # PDF oluştur - Yatay sayfa (landscape) kullan, marjinleri minimize et
-        pdf = FPDF(orientation='L', unit='mm', format='A4')  # 'L' = Landscape
-        pdf.set_auto_page_break(auto=True, margin=8)  # Daha az marjin
-        pdf.set_left_margin(8)
-        pdf.set_right_margin(8)
-        pdf.set_top_margin(8)
-        pdf.add_page()
-        
-        # Türkçe font ekle
-        try:
-            pdf.add_font('DejaVu', '', 'C:/Windows/Fonts/DejaVuSans.ttf')
-            pdf.add_font('DejaVu', 'B', 'C:/Windows/Fonts/DejaVuSans-Bold.ttf')
-            font_name = 'DejaVu'
-        except:
-            pdf.add_font('Arial', '', 'C:/Windows/Fonts/arial.ttf')
-            pdf.add_font('Arial', 'B', 'C:/Windows/Fonts/arialbd.ttf')
-            font_name = 'Arial'
-        
-        # BAŞLIK - ŞİRKET BİLGİLERİ
-        sert_bilgi = cert.get('sertifika_bilgileri', {})
-        
-        pdf.set_font(font_name, 'B', 14)
-        pdf.set_text_color(30, 58, 138)
-        pdf.multi_cell(0, 5, sert_bilgi.get('firma', ''), align='C')
-        
-        pdf.set_font(font_name, '', 8)
-        pdf.set_text_color(0, 0, 0)
-        pdf.cell(0, 4, sert_bilgi.get('adres', ''), ln=True, align='C')
-        pdf.cell(0, 4, f"Tel: {sert_bilgi.get('telefon', '')} Faks: {sert_bilgi.get('faks', '')}", ln=True, align='C')
-        pdf.cell(0, 4, f"E-posta: {sert_bilgi.get('email', '')} Web: {sert_bilgi.get('website', '')}", ln=True, align='C')
-        pdf.ln(2)
-        
-        # Akreditasyon bilgisi
-        pdf.set_font(font_name, 'B', 9)
-        pdf.cell(0, 5, f"Akreditasyon No: {sert_bilgi.get('akreditasyon_no', '')}", ln=True, align='C')
-        pdf.ln(2)
-        
-        # KALİBRASYON SERTİFİKASI başlığı
-        pdf.set_font(font_name, 'B', 16)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, 'KALİBRASYON SERTİFİKASI', ln=True, align='C')
-        pdf.ln(2)
-        
-        # Sertifika No ve Tarih
-        pdf.set_font(font_name, 'B', 10)
-        pdf.set_text_color(0, 0, 0)
-        pdf.cell(0, 6, f"Sertifika No: {sert_bilgi.get('sertifika_no', '')}       Tarih: {sert_bilgi.get('tarih', '')}", ln=True, align='C')
-        pdf.ln(2)
+        # Belirsizlik değerleri elle girilen/LLM'in ürettiği değil, hesaplanan bütçeden gelir
+        cert = _pdf_verisi(data)
         
-        # MÜŞTERİ BİLGİLERİ
-        musteri = cert.get('musteri_bilgileri', {})
+        # PDF dosya adı - içerik adresli, aynı veri aynı dosyaya düşer
+        key, pdf_path = _kalibrasyon_pdf_yolu(cert)
         
-        # Yeterli yer var mı kontrol et
-        if pdf.get_y() > 170:
-            pdf.add_page()
+        # Aynı sertifika daha önce üretildiyse tekrar render etme
+        if await asyncio.to_thread(pdf_path.exists):
+            return str(pdf_path)
         
-        pdf.set_font(font_name, 'B', 10)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(0, 7, 'MÜŞTERİ BİLGİLERİ', ln=True, fill=True, border=1)
-        pdf.set_font(font_name, '', 9)
-        
-        pdf.cell(45, 6, 'Sahibi:', border=1)
-        pdf.cell(0, 6, musteri.get('sahibi', ''), border=1, ln=True)
-        pdf.cell(45, 6, 'Adres:', border=1)
-        pdf.cell(0, 6, musteri.get('adres', ''), border=1, ln=True)
-        pdf.cell(45, 6, 'İstek Numarası:', border=1)
-        pdf.cell(0, 6, musteri.get('istek_numarasi', ''), border=1, ln=True)
-        pdf.ln(1)
-        
-        # CİHAZ BİLGİLERİ
-        cihaz = cert.get('cihaz_bilgileri', {})
-        pdf.set_font(font_name, 'B', 10)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(0, 7, 'CİHAZ BİLGİLERİ', ln=True, fill=True, border=1)
-        pdf.set_font(font_name, '', 9)
-        
-        cihaz_fields = [
-            ('Makine/Cihaz:', cihaz.get('makine_cihaz', '')),
-            ('İmalatçı:', cihaz.get('imalatci', '')),
-            ('Tip:', cihaz.get('tip', '')),
-            ('Seri Numarası:', cihaz.get('seri_numarasi', '')),
-            ('Kalibrasyon Tarihi:', cihaz.get('kalibrasyon_tarihi', '')),
-            ('Ölçme Aralığı:', cihaz.get('olcme_araligi', '')),
-            ('Çözünürlük:', cihaz.get('cozunurluk', '')),
-        ]
-        
-        for label, value in cihaz_fields:
-            pdf.cell(50, 6, label, border=1)
-            pdf.cell(0, 6, str(value), border=1, ln=True)
-        pdf.ln(1)
-        
-        # ÇEVRE ŞARTLARI
-        kal_detay = cert.get('kalibrasyon_detaylari', {})
-        cevre = kal_detay.get('cevre_sartlari', {})
-        
-        pdf.set_font(font_name, 'B', 10)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(0, 7, 'ÇEVRE ŞARTLARI', ln=True, fill=True, border=1)
-        pdf.set_font(font_name, '', 9)
-        
-        pdf.cell(50, 6, 'Sıcaklık:', border=1)
-        pdf.cell(0, 6, cevre.get('sicaklik', ''), border=1, ln=True)
-        pdf.cell(50, 6, 'Bağıl Nem:', border=1)
-        pdf.cell(0, 6, cevre.get('bagil_nem', ''), border=1, ln=True)
-        pdf.ln(1)
-        
-        # FONKSİYONELLİK KONTROLÜ
-        fonk = cert.get('fonksiyonellik_kontrolu', {})
-        if fonk:
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'FONKSİYONELLİK KONTROLÜ', ln=True, fill=True, border=1)
-            pdf.set_font(font_name, '', 9)
-            
-            for kontrol, durum in fonk.items():
-                pdf.cell(95, 6, kontrol.replace('_', ' ').title() + ':', border=1)
-                pdf.cell(0, 6, str(durum), border=1, ln=True)
-            pdf.ln(1)
-        
-        # ÖLÇÜM SONUÇLARI - Yeterli yer varsa aynı sayfada devam et
-        if pdf.get_y() > 160:  # Sayfa sonuna yaklaşıldıysa
-            pdf.add_page()
-        else:
-            pdf.ln(3)  # Biraz boşluk
-        
-        pdf.set_font(font_name, 'B', 12)
-        pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 8, 'ÖLÇÜM SONUÇLARI', ln=True, align='C')
-        pdf.set_text_color(0, 0, 0)
-        pdf.ln(1)
-        
-        olcum = cert.get('olcum_sonuclari', {})
-        
-        # DIŞ ÇAP ÖLÇÜMLERİ
-        if 'dis_cap_olcumleri' in olcum:
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'DIŞ ÇAP ÖLÇÜMLERİ', ln=True, fill=True, border=1)
-            
-            # Tablo başlıkları - sütun genişliklerini küçülttük
-            pdf.set_font(font_name, 'B', 7)
-            pdf.set_fill_color(200, 200, 200)
-            pdf.cell(24, 8, 'Referans', border=1, fill=True, align='C')
-            pdf.cell(24, 8, 'İç', border=1, fill=True, align='C')
-            pdf.cell(24, 8, 'Orta', border=1, fill=True, align='C')
-            pdf.cell(24, 8, 'Dış', border=1, fill=True, align='C')
-            pdf.cell(26, 8, 'Sapma İç', border=1, fill=True, align='C')
-            pdf.cell(26, 8, 'Sapma Orta', border=1, fill=True, align='C')
-            pdf.cell(22, 8, 'Belirsizlik', border=1, fill=True, align='C', ln=True)
-            
-            # Veriler
-            pdf.set_font(font_name, '', 7)
-            for olc in olcum['dis_cap_olcumleri']:
-                ref = olc.get('referans_deger_mm', '')
-                oc = olc.get('olculen_deger', {})
-                sap = olc.get('sapma', {})
-                bel = olc.get('olcum_belirsizligi_mm', '')
-                
-                pdf.cell(24, 7, str(ref) if ref else '-', border=1, align='C')
-                pdf.cell(24, 7, str(oc.get('ic_mm')) if oc.get('ic_mm') is not None else '-', border=1, align='C')
-                pdf.cell(24, 7, str(oc.get('orta_mm')) if oc.get('orta_mm') is not None else '-', border=1, align='C')
-                pdf.cell(24, 7, str(oc.get('dis_mm')) if oc.get('dis_mm') is not None else '-', border=1, align='C')
-                pdf.cell(26, 7, str(sap.get('ic_mm')) if sap.get('ic_mm') is not None else '-', border=1, align='C')
-                pdf.cell(26, 7, str(sap.get('orta_mm')) if sap.get('orta_mm') is not None else '-', border=1, align='C')
-                pdf.cell(22, 7, str(bel) if bel else '-', border=1, align='C', ln=True)
-            pdf.ln(1)
-        
-        # İÇ ÇAP ÖLÇÜMLERİ
-        if 'ic_cap_olcumleri' in olcum:
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'İÇ ÇAP ÖLÇÜMLERİ', ln=True, fill=True, border=1)
-            
-            pdf.set_font(font_name, 'B', 8)
-            pdf.set_fill_color(200, 200, 200)
-            pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
-            
-            pdf.set_font(font_name, '', 8)
-            for olc in olcum['ic_cap_olcumleri']:
-                pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
-            pdf.ln(1)
-        
-        # DERİNLİK ÖLÇÜMLERİ
-        if 'derinlik_olcumleri' in olcum:
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'DERİNLİK ÖLÇÜMLERİ', ln=True, fill=True, border=1)
-            
-            pdf.set_font(font_name, 'B', 8)
-            pdf.set_fill_color(200, 200, 200)
-            pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
-            
-            pdf.set_font(font_name, '', 8)
-            for olc in olcum['derinlik_olcumleri']:
-                pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
-            pdf.ln(1)
-        
-        # KADEME ÖLÇÜMLERİ
-        if 'kademe_olcumleri' in olcum:
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'KADEME ÖLÇÜMLERİ', ln=True, fill=True, border=1)
-            
-            pdf.set_font(font_name, 'B', 8)
-            pdf.set_fill_color(200, 200, 200)
-            pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
-            pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
-            
-            pdf.set_font(font_name, '', 8)
-            for olc in olcum['kademe_olcumleri']:
-                pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
-                pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
-            pdf.ln(2)
-        
-        # UYGUNLUK DEĞERLENDİRMESİ
-        uygunluk = cert.get('uygunluk_degerlendirmesi', {})
-        if uygunluk:
-            # Landscape A4: height=210mm, margin=10mm, usable=190mm
-            # 175mm'den sonra yer kalmıyor, yeni sayfa aç
-            if pdf.get_y() > 175:
-                pdf.add_page()
-            
-            pdf.set_font(font_name, 'B', 10)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 7, 'UYGUNLUK DEĞERLENDİRMESİ', ln=True, fill=True, border=1)
-            pdf.set_font(font_name, '', 7)
-            
-            try:
-                pdf.multi_cell(0, 5, uygunluk.get('karar_kurali', ''), border=1)
-            except:
-                pdf.add_page()
-                pdf.multi_cell(0, 5, uygunluk.get('karar_kurali', ''), border=1)
-            pdf.ln(2)
-            
-            if 'aciklamalar' in uygunluk:
-                for aciklama in uygunluk['aciklamalar']:
-                    if pdf.get_y() > 175:
-                        pdf.add_page()
-                    try:
-                        pdf.multi_cell(0, 4, '- ' + aciklama, border=0)
-                    except:
-                        pdf.add_page()
-                        pdf.multi_cell(0, 4, '- ' + aciklama, border=0)
-            pdf.ln(2)
-            
-            if 'olcum_belirsizligi_aciklama' in uygunluk:
-                if pdf.get_y() > 175:
-                    pdf.add_page()
-                try:
-                    pdf.multi_cell(0, 4, uygunluk['olcum_belirsizligi_aciklama'], border=0)
-                except:
-                    pdf.add_page()
-                    pdf.multi_cell(0, 4, uygunluk['olcum_belirsizligi_aciklama'], border=0)
-            pdf.ln(1)
-        
-        # ONAY BİLGİLERİ
-        onay = cert.get('onay_bilgileri', {})
-        if onay:
-            pdf.ln(1)
-            pdf.set_font(font_name, 'B', 9)
-            
-            # İki sütun için
-            col_width = pdf.w / 2 - 20
-            
-            pdf.cell(col_width, 6, 'Kalibrasyonu Yapan:', border=0)
-            pdf.cell(col_width, 6, 'Onaylayan:', border=0, ln=True)
-            pdf.ln(1)
-            
-            pdf.set_font(font_name, '', 9)
-            yapan = onay.get('kalibrasyonu_yapan', {})
-            onaylayan = onay.get('onaylayan', {})
-            
-            pdf.cell(col_width, 6, yapan.get('isim', ''), border='T', align='C')
-            pdf.cell(col_width, 6, onaylayan.get('isim', ''), border='T', align='C', ln=True)
-            
-            pdf.cell(col_width, 5, yapan.get('unvan', ''), border=0, align='C')
-            pdf.cell(col_width, 5, onaylayan.get('unvan', ''), border=0, align='C', ln=True)
-            
-            if 'tarih' in onaylayan:
-                pdf.cell(col_width, 5, '', border=0)
-                pdf.cell(col_width, 5, f"Tarih: {onaylayan.get('tarih', '')}", border=0, align='C', ln=True)
-        
-        # Footer
-        pdf.ln(2)
-        pdf.set_font(font_name, '', 7)
-        pdf.set_text_color(100, 100, 100)
-        standartlar = cert.get('standartlar', {})
-        if standartlar:
-            pdf.multi_cell(0, 3, f"Bu sertifika {standartlar.get('akreditasyon_standardi', '')} standardına göre düzenlenmiştir.", align='C')
+        pdf_bytes = await pdf_engine.render_kalibrasyon_pdf_async(cert, key)
         
-        # PDF'i kaydet
-        pdf.output(str(pdf_path))
+        # PDF'i asenkron kaydet - önce geçici dosyaya yaz, yarım dosya görünmesin
+        tmp_path = UPLOAD_DIR / f"{pdf_path.name}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(pdf_bytes)
+        await asyncio.to_thread(os.replace, tmp_path, pdf_path)
+        _disk_temizligi_planla()
         
         # Sadece filename döndür (database için)
         return str(pdf_path)
@@ -1016,177 +994,631 @@ async def _generate_kalibrasyon_pdf(data) -> str:
 
 @app.post("/api/create-kalibrasyon-pdf")
 async def create_kalibrasyon_pdf_endpoint(data: KalibrasyonSertifikasiData):
-    """API endpoint - PDF oluştur ve FileResponse döndür"""
-    pdf_path = await _generate_kalibrasyon_pdf(data)
-    filename = os.path.basename(pdf_path)
+    """API endpoint - Önizleme PDF'ini bellekte oluştur ve diske yazmadan stream et"""
+    try:
+        cert = _pdf_verisi(data)
+        key = pdf_engine.certificate_key(cert)
+        pdf_bytes = await pdf_engine.render_kalibrasyon_pdf_async(cert, key)
+    except Exception as e:
+        import traceback
+        print(f"KALİBRASYON PDF HATA: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Kalibrasyon PDF oluşturma hatası: {str(e)}")
     
-    return FileResponse(
-        path=pdf_path,
-        media_type='application/pdf',
-        filename=filename
-    )
+    return _bytes_stream_response(pdf_bytes, f"kalibrasyon_sertifikasi_{key[:16]}.pdf")
+
+
+@app.get("/api/pdf/cache")
+async def pdf_cache_stats():
+    """Bellekteki render önbelleği ve diskteki sertifika dosyalarının durumu"""
+    return {
+        "bellek": pdf_cache.render_cache.stats(),
+        "disk": await asyncio.to_thread(pdf_cache.disk_stats, UPLOAD_DIR),
+    }
+
+
+async def _pdf_referanslari(db: AsyncSession) -> List[str]:
+    """Raporlara ve kalibrasyonlara bağlı PDF yolları - bunlar disk temizliğinde silinmez"""
+    referanslar = list((await db.execute(
+        select(KalibrasyonRaporu.pdf_path).where(KalibrasyonRaporu.pdf_path.isnot(None))
+    )).scalars())
+    for ekler in (await db.execute(select(Kalibrasyon.ekler).where(Kalibrasyon.ekler.isnot(None)))).scalars():
+        referanslar.extend(e for e in ekler or [] if isinstance(e, str))
+    return referanslar
+
+
+_disk_temizligi: Optional[asyncio.Task] = None
+_son_disk_kontrolu = 0.0
+
+
+def _disk_temizligi_planla():
+    """
+    Yeni PDF yazıldıktan sonra çağrılır - disk bütçesi arka planda kontrol edilir.
+    Kontrol en fazla PDF_DISK_PRUNE_INTERVAL saniyede bir ve aynı anda tek sefer çalışır.
+    """
+    global _disk_temizligi, _son_disk_kontrolu
+    if _disk_temizligi is not None and not _disk_temizligi.done():
+        return
+    if time.monotonic() - _son_disk_kontrolu < pdf_cache.PDF_DISK_PRUNE_INTERVAL:
+        return
+    _son_disk_kontrolu = time.monotonic()
+    _disk_temizligi = asyncio.create_task(_diski_temizle())
+
+
+async def _diski_temizle() -> Optional[dict]:
+    """Bütçe aşıldıysa kayıtlara bağlı olmayan eski sertifika PDF'lerini sil"""
+    try:
+        disk = await asyncio.to_thread(pdf_cache.disk_stats, UPLOAD_DIR)
+        if disk["bytes"] <= disk["max_bytes"]:
+            return None
+        async with AsyncSessionLocal() as db:
+            referanslar = await _pdf_referanslari(db)
+        sonuc = await asyncio.to_thread(pdf_cache.prune_disk, UPLOAD_DIR, referanslar, disk["max_bytes"])
+        print(f"PDF disk temizliği: {sonuc['removed']} dosya silindi, {sonuc['bytes']} bayt kaldı")
+        return sonuc
+    except Exception as e:
+        print(f"PDF disk temizliği hatası: {str(e)}")
+        return None
+
+
+@app.post("/api/admin/pdf-cache/prune")
+async def prune_pdf_cache(db: AsyncSession = Depends(get_db)):
+    """Disk bütçesi aşıldıysa hiçbir rapora/kalibrasyona bağlı olmayan sertifika PDF'lerini sil"""
+    referanslar = await _pdf_referanslari(db)
+    return await asyncio.to_thread(pdf_cache.prune_disk, UPLOAD_DIR, referanslar)
 
 
 # Database endpoints
-@app.post("/api/save-report")
-async def save_report(
-    rapor_data: KalibrasyonSertifikasiData,
-    db: AsyncSession = Depends(get_db)
-):
+async def _enqueue_job(tur: str, payload: dict, db: Optional[AsyncSession] = None) -> dict:
+    """İşi kuyruğa al (db verilirse oturumdaki değişikliklerle aynı transaction'da); kuyruk doluysa 503 ile geri çevir"""
+    try:
+        job_id = await job_queue.enqueue(tur, payload, db=db)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"İş kuyruğa alma hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"job_id": job_id, "durum": "bekliyor", "durum_url": f"/api/jobs/{job_id}"}
+
+
+@app.post("/api/save-report", status_code=202)
+async def save_report(rapor_data: KalibrasyonSertifikasiData):
+    """Kalibrasyon raporunu kaydetme işini kuyruğa al (DB kaydı ve PDF arka planda yapılır)"""
+    job = await _enqueue_job("save_report", rapor_data.model_dump())
+    return {"success": True, "sertifika_no": rapor_data.sertifikaNo, **job}
+
+
+# Sertifikadaki ölçüm listesi -> OlcumSonucu.olcum_tipi
+OLCUM_AILELERI = {
+    "disCapOlcumleri": "dis_cap",
+    "icCapOlcumleri": "ic_cap",
+    "derinlikOlcumleri": "derinlik",
+    "kademeOlcumleri": "kademe",
+    "paralellikOlcumleri": "paralellik",
+}
+# Tek INSERT'te gönderilecek en fazla satır (PostgreSQL parametre sınırının altında kalmak için)
+OLCUM_INSERT_BATCH = 1000
+
+
+def _sayi(deger) -> Optional[float]:
+    try:
+        return float(deger) if deger is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _olcumleri_toplu_ekle(db: AsyncSession, rapor_id: int, olcum_sonuclari: dict) -> int:
+    """Raporun tüm ölçüm ailelerini INSERT ... VALUES ile toplu yaz, yazılan satır sayısını döndür"""
+    satirlar = [
+        {
+            "rapor_id": rapor_id,
+            "olcum_tipi": olcum_tipi,
+            "referans_deger": _sayi(olcum.get("referansDeger")),
+            "olculen_deger": _sayi(olcum.get("olculenDeger")),
+            "sapma": _sayi(olcum.get("sapma")),
+            "belirsizlik": _sayi(olcum.get("belirsizlik")),
+            "alt_tip": olcum.get("tip")
+        }
+        for alan, olcum_tipi in OLCUM_AILELERI.items()
+        for olcum in olcum_sonuclari.get(alan) or []
+        if isinstance(olcum, dict)
+    ]
+    
+    for i in range(0, len(satirlar), OLCUM_INSERT_BATCH):
+        await db.execute(insert(OlcumSonucu).values(satirlar[i:i + OLCUM_INSERT_BATCH]))
+    
+    return len(satirlar)
+
+
+@job_queue.handler("save_report")
+async def _save_report_job(payload: dict) -> dict:
     """Kalibrasyon raporunu veritabanına kaydet"""
     try:
-        
-        # Yeni rapor oluştur
-        yeni_rapor = KalibrasyonRaporu(
-            sertifika_no=rapor_data.sertifikaNo,
-            musteri_adi=rapor_data.genelBilgiler.musteriAdi,
-            musteri_adres=rapor_data.genelBilgiler.musteriAdres,
-            istek_no=rapor_data.genelBilgiler.istekNo or "",
-            cihaz_tipi=rapor_data.cihazBilgileri.cihazAdi,
-            cihaz_marka=rapor_data.cihazBilgileri.marka,
-            cihaz_model=rapor_data.cihazBilgileri.model,
-            seri_no=rapor_data.cihazBilgileri.seriNo,
-            olcme_araligi=rapor_data.cihazBilgileri.olcmeAraligi,
-            cozunurluk=rapor_data.cihazBilgileri.cozunurluk,
-            kalibrasyon_tarihi=datetime.strptime(rapor_data.kalibrasyonBilgileri.kalibrasyonTarihi, "%d.%m.%Y"),
-            sicaklik=rapor_data.kalibrasyonBilgileri.ortamKosullari.sicaklik,
-            nem=rapor_data.kalibrasyonBilgileri.ortamKosullari.nem,
-            ses_kaydi_path=None,
-            gorsel_path=None,
-            uygunluk=rapor_data.uygunlukDegerlendirmesi.sonuc,
-            rapor_data=rapor_data.model_dump(),
-            created_by="sistem"  # İleride kullanıcı sisteminden alınacak
+        # Veritabanına da PDF'teki hesaplanmış belirsizlikler yazılsın
+        payload = uncertainty.sertifikaya_uygula(payload)
+        rapor_data = KalibrasyonSertifikasiData(**payload)
+        _kalibrasyon_tarihi(rapor_data.kalibrasyonBilgileri.kalibrasyonTarihi)
+    except ValueError as e:
+        # Geçersiz veri tekrar denemeyle düzelmez
+        raise JobPermanentError(f"Geçersiz rapor verisi: {str(e)}") from e
+    
+    # PDF önce oluşturulur, render sırasında DB oturumu açık tutulmaz
+    pdf_filename = await _generate_kalibrasyon_pdf(rapor_data)
+    
+    return await _raporu_kaydet(rapor_data, payload, pdf_filename)
+
+
+def _kalibrasyon_tarihi(metin: str) -> datetime:
+    """Sertifikadaki 'gg.aa.yyyy' tarihini oku"""
+    try:
+        return datetime.strptime(metin, "%d.%m.%Y")
+    except ValueError as e:
+        raise JobPermanentError(f"Geçersiz kalibrasyon tarihi: {metin!r}") from e
+
+
+async def _raporu_kaydet(
+    rapor_data: KalibrasyonSertifikasiData,
+    payload: dict,
+    pdf_filename: str,
+    gorsel_path: Optional[str] = None
+) -> dict:
+    """Raporu ve ölçümlerini kaydet; aynı sertifika no aynı veriyle zaten kayıtlıysa mevcut kaydı döndür"""
+    async with AsyncSessionLocal() as db:
+        # Tekrar denemede rapor zaten kaydedilmişse aynı sonucu döndür
+        result = await db.execute(
+            select(KalibrasyonRaporu)
+            .where(KalibrasyonRaporu.sertifika_no == rapor_data.sertifikaNo)
         )
+        mevcut = result.scalar_one_or_none()
+        if mevcut:
+            if mevcut.rapor_data != payload:
+                raise JobPermanentError(f"Sertifika no zaten kayıtlı: {rapor_data.sertifikaNo}")
+            return {"rapor_id": mevcut.id, "sertifika_no": mevcut.sertifika_no, "pdf_path": mevcut.pdf_path, "mevcut": True}
         
-        db.add(yeni_rapor)
-        await db.flush()
-        
-        # Ölçüm sonuçlarını ekle
-        for olcum in rapor_data.olcumSonuclari.disCapOlcumleri:
-            db.add(OlcumSonucu(
-                rapor_id=yeni_rapor.id,
-                olcum_tipi="dis_cap",
-                referans_deger=olcum.referansDeger,
-                olculen_deger=olcum.olculenDeger,
-                sapma=olcum.sapma,
-                belirsizlik=olcum.belirsizlik,
-                alt_tip=olcum.tip
-            ))
-        
-        for olcum in rapor_data.olcumSonuclari.icCapOlcumleri:
-            db.add(OlcumSonucu(
-                rapor_id=yeni_rapor.id,
-                olcum_tipi="ic_cap",
-                referans_deger=olcum.referansDeger,
-                olculen_deger=olcum.olculenDeger,
-                sapma=olcum.sapma,
-                belirsizlik=olcum.belirsizlik,
-                alt_tip=olcum.tip
-            ))
-        
-        # PDF oluştur ve dosya bilgisini kaydet
-        pdf_filename = await _generate_kalibrasyon_pdf(rapor_data)
-        yeni_rapor.pdf_path = pdf_filename
+        try:
+            # Yeni rapor oluştur
+            yeni_rapor = KalibrasyonRaporu(
+                sertifika_no=rapor_data.sertifikaNo,
+                musteri_adi=rapor_data.genelBilgiler.musteriAdi,
+                musteri_adres=rapor_data.genelBilgiler.musteriAdres,
+                istek_no=rapor_data.genelBilgiler.istekNo or "",
+                cihaz_tipi=rapor_data.cihazBilgileri.cihazAdi,
+                cihaz_marka=rapor_data.cihazBilgileri.marka,
+                cihaz_model=rapor_data.cihazBilgileri.model,
+                seri_no=rapor_data.cihazBilgileri.seriNo,
+                olcme_araligi=rapor_data.cihazBilgileri.olcmeAraligi,
+                cozunurluk=rapor_data.cihazBilgileri.cozunurluk,
+                kalibrasyon_tarihi=_kalibrasyon_tarihi(rapor_data.kalibrasyonBilgileri.kalibrasyonTarihi),
+                sicaklik=rapor_data.kalibrasyonBilgileri.ortamKosullari.sicaklik,
+                nem=rapor_data.kalibrasyonBilgileri.ortamKosullari.nem,
+                ses_kaydi_path=None,
+                gorsel_path=gorsel_path,
+                uygunluk=rapor_data.uygunlukDegerlendirmesi.sonuc,
+                rapor_data=payload,
+                pdf_path=pdf_filename,
+                created_by="sistem"  # İleride kullanıcı sisteminden alınacak
+            )
+            
+            db.add(yeni_rapor)
+            await db.flush()
+            
+            # Ölçüm sonuçlarını ekle (tüm aileler tek seferde)
+            olcum_sayisi = await _olcumleri_toplu_ekle(db, yeni_rapor.id, payload['olcumSonuclari'])
+            
+            await db.commit()
         
-        await db.commit()
+        except Exception as e:
+            await db.rollback()
+            print(f"Rapor kaydetme hatası: {str(e)}")
+            raise
         
         return {
-            "success": True,
             "rapor_id": yeni_rapor.id,
             "sertifika_no": yeni_rapor.sertifika_no,
-            "pdf_path": pdf_filename
+            "pdf_path": pdf_filename,
+            "olcum_sayisi": olcum_sayisi,
+            "mevcut": False
         }
-        
+
+
+async def _raporu_geri_al(rapor_id: int):
+    """Bu istekte oluşturulan raporu (ölçümleriyle birlikte) sil - PDF'i üretilemediğinde"""
+    try:
+        async with AsyncSessionLocal() as db:
+            rapor = await db.get(KalibrasyonRaporu, rapor_id)
+            if rapor:
+                await db.delete(rapor)
+                await db.commit()
     except Exception as e:
-        await db.rollback()
-        print(f"Rapor kaydetme hatası: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"Rapor geri alma hatası (#{rapor_id}): {str(e)}")
+
+
+@app.post("/api/pipeline/voice-certificate")
+async def voice_certificate_pipeline(
+    file: UploadFile = File(...),
+    fotograflar: Optional[List[UploadFile]] = File(None)
+):
+    """
+    Ses kaydından (ve isteğe bağlı fotoğraflardan) tek istekte kayıtlı sertifika üretir.
+    Aşamalar: transkripsiyon -> taslak || görsel analiz -> uygunluk -> kayıt || PDF
+    Her aşamanın süresi yanıtta (asamalar) ve Server-Timing başlığında döner.
+    """
+    fotograflar = fotograflar or []
+    if len(fotograflar) > ANALYZE_IMAGES_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"En fazla {ANALYZE_IMAGES_MAX_FILES} görsel gönderilebilir"
+        )
+    
+    zaman = pipeline.StageTimer()
+    
+    def hata(status_code: int, mesaj: str) -> HTTPException:
+        return HTTPException(status_code=status_code, detail={"mesaj": mesaj, "asamalar": zaman.asamalar})
+    
+    async def transkripsiyon_ve_taslak():
+        async with zaman.asama("transkripsiyon") as kayit:
+            transkript = await _transcribe_upload(file)
+            kayit["onbellek"] = transkript.get("onbellek", False)
+        metin = transkript["text"]
+        if not metin.strip():
+            raise hata(422, "Ses kaydından metin çıkarılamadı")
+        async with zaman.asama("taslak"):
+            taslak = await draft_cache.get_or_create(draft_key(metin), lambda: _generate_report_draft(metin))
+        return metin, taslak
+    
+    async def gorsel_analiz():
+        if not fotograflar:
+            zaman.atla("gorsel_analiz")
+            return []
+        async with zaman.asama("gorsel_analiz"):
+            return await asyncio.gather(*(_analyze_upload(f) for f in fotograflar))
+    
+    # Ses ve fotoğraflar birbirinden bağımsız - eşzamanlı işlenir
+    ses_sonucu, gorseller = await asyncio.gather(
+        transkripsiyon_ve_taslak(), gorsel_analiz(), return_exceptions=True
+    )
+    if isinstance(ses_sonucu, HTTPException):
+        raise ses_sonucu
+    if isinstance(ses_sonucu, Exception):
+        print(f"PIPELINE HATA (transkripsiyon/taslak): {str(ses_sonucu)}")
+        raise hata(500, f"Transkripsiyon/taslak hatası: {str(ses_sonucu)}")
+    metin, taslak = ses_sonucu
+    
+    basarili = [g for g in gorseller if g["status"] == "success"]
+    birlesik_analiz = images.merge_analyses([g["analysis"] for g in basarili]) if basarili else None
+    
+    try:
+        async with zaman.asama("uygunluk") as kayit:
+            # Kayıt ve PDF aynı KalibrasyonSertifikasiData verisinden üretilir
+            notlar = [f"Görsel analiz: {a}" for a in (birlesik_analiz or {}).get("anomaliler", [])]
+            rapor = uncertainty.sertifikaya_uygula(pipeline.taslaktan_sertifika(
+                taslak.get("kalibrasyon_sertifikasi") or taslak, notlar=notlar
+            ))
+            
+            await catalog.ensure_loaded()
+            cihaz_tipi = pipeline.cihaz_tipi_bul(rapor["cihazBilgileri"]["cihazAdi"])
+            sablon_id, parametreler = _sablon_parametreleri(None, cihaz_tipi)
+            uygunluk = None
+            if parametreler:
+                uygunluk = {
+                    "sablon_id": sablon_id,
+                    **conformity.evaluate([pipeline.uygunluk_noktalari(rapor)], [parametreler])[0]
+                }
+                if uygunluk["uygunluk"] is not None:
+                    rapor["uygunlukDegerlendirmesi"]["sonuc"] = uygunluk["uygunluk"]
+            kayit["sablon_id"] = sablon_id
+            rapor_data = KalibrasyonSertifikasiData(**rapor)
+            _kalibrasyon_tarihi(rapor_data.kalibrasyonBilgileri.kalibrasyonTarihi)
+    except JobPermanentError as e:
+        raise hata(422, str(e))
+    except Exception as e:
+        print(f"PIPELINE HATA (uygunluk): {str(e)}")
+        raise hata(500, f"Sertifika verisi oluşturulamadı: {str(e)}")
+    
+    # PDF yolu içerik adresli olduğundan render bitmeden bilinir - kayıt ve PDF eşzamanlı
+    _, pdf_path = _kalibrasyon_pdf_yolu(_pdf_verisi(rapor_data))
+    pdf_vardi = await asyncio.to_thread(pdf_path.exists)
+    gorsel_path = str(UPLOAD_DIR / basarili[0]["image_filename"]) if basarili else None
+    
+    async def pdf_asamasi():
+        async with zaman.asama("pdf"):
+            return await _generate_kalibrasyon_pdf(rapor_data)
+    
+    async def kayit_asamasi():
+        async with zaman.asama("kayit"):
+            return await _raporu_kaydet(rapor_data, rapor, str(pdf_path), gorsel_path=gorsel_path)
+    
+    pdf_sonucu, kayit_sonucu = await asyncio.gather(pdf_asamasi(), kayit_asamasi(), return_exceptions=True)
+    
+    # Bir taraf başarısız olduysa diğerinin bu istekte oluşturduğu yarısı geri alınır:
+    # kayıtsız PDF ya da olmayan PDF'i gösteren kayıt kalmaz
+    if isinstance(kayit_sonucu, BaseException) and not isinstance(pdf_sonucu, BaseException) and not pdf_vardi:
+        await asyncio.to_thread(pdf_path.unlink, True)
+    if isinstance(pdf_sonucu, BaseException) and not isinstance(kayit_sonucu, BaseException) and not kayit_sonucu["mevcut"]:
+        await _raporu_geri_al(kayit_sonucu["rapor_id"])
+    
+    if isinstance(kayit_sonucu, JobPermanentError):
+        raise hata(409, str(kayit_sonucu))
+    for sonuc in (kayit_sonucu, pdf_sonucu):
+        if isinstance(sonuc, BaseException):
+            mesaj = sonuc.detail if isinstance(sonuc, HTTPException) else str(sonuc)
+            print(f"PIPELINE HATA (kayıt/PDF): {mesaj}")
+            raise hata(500, mesaj)
+    
+    return FastJSONResponse(
+        content={
+            "status": "success" if len(basarili) == len(fotograflar) else "partial",
+            "text": metin,
+            **kayit_sonucu,
+            "uygunluk": uygunluk,
+            "gorsel_analiz": birlesik_analiz,
+            "images": gorseller,
+            "asamalar": zaman.asamalar,
+            "toplam_ms": zaman.toplam_ms()
+        },
+        headers={"Server-Timing": ", ".join(
+            f"{a['ad']};dur={a['sure_ms']}" for a in zaman.asamalar if "sure_ms" in a
+        )}
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Arka plan işinin durumunu getir"""
+    job = await db.get(RaporIsi, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    
+    return {
+        "id": job.id,
+        "tur": job.tur,
+        "durum": job.durum,
+        "deneme": job.deneme,
+        "sonuc": job.sonuc,
+        "hata": job.hata,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None
+    }
+
+
+def _encode_cursor(created_at: datetime, rapor_id: int) -> str:
+    """Sayfalama imleci - istemci için opak (created_at, id) çifti"""
+    raw = json.dumps([created_at.isoformat(), rapor_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, rapor_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(rapor_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfalama imleci")
+
+
+def _alan_listesi(fields: Optional[str], gecerli) -> Optional[List[str]]:
+    """fields=a,b parametresini doğrula; verilmemişse None (tüm alanlar)"""
+    if fields is None:
+        return None
+    alanlar = [f.strip() for f in fields.split(",") if f.strip()]
+    gecersiz = [f for f in alanlar if f not in gecerli]
+    if gecersiz:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz alan: {', '.join(gecersiz)} (geçerli alanlar: {', '.join(gecerli)})"
+        )
+    return alanlar
 
 
 @app.get("/api/reports")
 async def get_reports(
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Tüm raporları listele"""
+    """
+    Tüm raporları listele
+    cursor verilirse (created_at, id) üzerinden keyset sayfalama yapılır; skip eski istemciler içindir.
+    fields verilirse (örn. id,sertifika_no,durum) sadece bu özet alanlar okunur ve döner.
+    """
+    limit = max(1, min(limit, 100))
+    alanlar = _alan_listesi(fields, list(projections.OZET_KOLONLARI))
+    toplam_sorgusu = select(func.count()).select_from(KalibrasyonRaporu)
     try:
-        # Toplam rapor sayısı
-        result = await db.execute(select(KalibrasyonRaporu))
-        total = len(result.scalars().all())
-        
-        # Sayfalanmış raporlar
-        result = await db.execute(
-            select(KalibrasyonRaporu)
-            .order_by(desc(KalibrasyonRaporu.created_at))
-            .offset(skip)
-            .limit(limit)
+        # Sayfalanmış raporlar - sadece dönen kolonlar, rapor_data yüklenmez.
+        # Toplam sayı aynı sorguda alt sorgu olarak gelir (tek round-trip)
+        query = (
+            select(*projections.ozet_kolonlari(alanlar), toplam_sorgusu.scalar_subquery().label("toplam"))
+            .order_by(desc(KalibrasyonRaporu.created_at), desc(KalibrasyonRaporu.id))
+            .limit(limit + 1)
         )
-        reports = result.scalars().all()
+        if cursor:
+            created_at, rapor_id = _decode_cursor(cursor)
+            query = query.where(
+                tuple_(KalibrasyonRaporu.created_at, KalibrasyonRaporu.id) < tuple_(created_at, rapor_id)
+            )
+        elif skip:
+            query = query.offset(skip)
         
-        return {
+        rows = (await db.execute(query)).all()
+        reports = rows[:limit]
+        # Sayfa boşsa (son sayfanın ötesi) toplam ayrıca sayılır
+        total = rows[0].toplam if rows else (await db.execute(toplam_sorgusu)).scalar_one()
+        
+        # limit+1'inci satır geldiyse devamı var
+        next_cursor = None
+        if len(rows) > limit and reports[-1].created_at is not None:
+            next_cursor = _encode_cursor(reports[-1].created_at, reports[-1].id)
+        
+        return FastJSONResponse({
             "total": total,
+            "next_cursor": next_cursor,
+            "reports": [projections.rapor_ozeti(r, alanlar) for r in reports]
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Raporları getirme hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _tsquery(config: str, q: str):
+    """Kullanıcı metnini (tırnak, -, or destekli) tsquery'ye çevir"""
+    return func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), q)
+
+
+@app.get("/api/reports/search")
+async def search_reports(
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sertifika arşivinde ara (müşteri, cihaz tipi/marka/model, seri no, sertifika no).
+    Tam metin eşleşmeleri ve seri/sertifika no trigram benzerliği birlikte puanlanıp sıralanır.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Arama metni boş olamaz")
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    R = KalibrasyonRaporu
+    
+    try:
+        # Kodlar 'simple', serbest metin 'turkish' ile indekslendi - sorgu ikisiyle de eşleşebilir
+        tsq = _tsquery("simple", q).op("||")(_tsquery("turkish", q))
+        kosul = or_(
+            R.arama_vektoru.bool_op("@@")(tsq),
+            R.seri_no.bool_op("%")(q),
+            R.sertifika_no.bool_op("%")(q),
+        )
+        if len(q) >= 3:
+            # Seri no parçası ile arama (trigram indeksi ILIKE'ı da hızlandırır)
+            desen = "%" + q.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+            kosul = or_(kosul, R.seri_no.ilike(desen, escape="!"), R.sertifika_no.ilike(desen, escape="!"))
+        
+        skor = (
+            func.ts_rank_cd(R.arama_vektoru, tsq)
+            + func.coalesce(func.greatest(func.similarity(R.seri_no, q), func.similarity(R.sertifika_no, q)), 0)
+        ).label("skor")
+        
+        # Toplam eşleşme sayısı aynı sorguda pencere fonksiyonuyla gelir
+        rows = (await db.execute(
+            select(*projections.ozet_kolonlari(), skor, func.count().over().label("toplam"))
+            .where(kosul)
+            .order_by(desc(skor), desc(R.id))
+            .offset(offset)
+            .limit(limit)
+        )).all()
+        
+        return FastJSONResponse({
+            "total": rows[0].toplam if rows else 0,
+            "reports": [{**projections.rapor_ozeti(r), "skor": round(float(r.skor), 4)} for r in rows]
+        })
+    except Exception as e:
+        print(f"Rapor arama hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Tek istekte okunabilecek en fazla rapor_data alt yolu
+RAPOR_ALAN_LIMITI = 20
+
+
+def _json_yollari(alanlar: List[str]) -> List[tuple]:
+    """'a.b,c' biçimindeki alan listesini JSONB yol demetlerine çevir (dizi elemanı için sayı: a.0.b)"""
+    yollar = [
+        tuple(alan.strip().split("."))
+        for grup in alanlar for alan in grup.split(",") if alan.strip()
+    ]
+    if len(yollar) > RAPOR_ALAN_LIMITI:
+        raise HTTPException(status_code=400, detail=f"En fazla {RAPOR_ALAN_LIMITI} alan istenebilir")
+    if any("" in yol for yol in yollar):
+        raise HTTPException(status_code=400, detail="Geçersiz alan yolu")
+    return yollar
+
+
+@app.post("/api/reports/query")
+async def query_reports(sorgu: RaporSorgusu, db: AsyncSession = Depends(get_db)):
+    """
+    Raporları rapor_data iç alanlarına göre filtrele (JSONB @>, GIN indeksli).
+    filtre belgenin bir parçasıdır, diziler eleman içermeyle eşleşir; örn. referans cihaz seri no:
+    {"kalibrasyonBilgileri": {"referansCihazlar": [{"seri_no": "26087294"}]}}
+    Belgeler yüklenmez - özet kolonlar ve istenen alanlar döner.
+    """
+    if not sorgu.filtre:
+        raise HTTPException(status_code=400, detail="Filtre boş olamaz")
+    yollar = _json_yollari(sorgu.alanlar)
+    limit = max(1, min(sorgu.limit, 100))
+    
+    try:
+        rows = (await db.execute(
+            select(*projections.ozet_kolonlari(), *projections.alan_kolonlari(yollar))
+            .where(KalibrasyonRaporu.rapor_data.contains(sorgu.filtre))
+            .order_by(desc(KalibrasyonRaporu.created_at), desc(KalibrasyonRaporu.id))
+            .offset(max(0, sorgu.offset))
+            .limit(limit)
+        )).all()
+        
+        return FastJSONResponse({
             "reports": [
-                {
-                    "id": r.id,
-                    "sertifika_no": r.sertifika_no,
-                    "musteri_adi": r.musteri_adi,
-                    "cihaz_tipi": r.cihaz_tipi,
-                    "kalibrasyon_tarihi": r.kalibrasyon_tarihi.strftime("%d.%m.%Y"),
-                    "durum": r.durum,
-                    "uygunluk": r.uygunluk,
-                    "created_at": r.created_at.isoformat() if r.created_at else None
-                }
-                for r in reports
+                {**projections.rapor_ozeti(r), **({"alanlar": projections.alan_degerleri(r, yollar)} if yollar else {})}
+                for r in rows
             ]
-        }
+        })
     except Exception as e:
-        print(f"Raporları getirme hatası: {str(e)}")
+        print(f"Rapor sorgu hatası: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _detay_alanlari(fields: Optional[str]):
+    """Detay fields parametresini (parçalar, rapor_data alt yolları) olarak ayır"""
+    if fields is None:
+        return list(projections.DETAY_PARCALARI), []
+    secilen = [f.strip() for f in fields.split(",") if f.strip()]
+    alt_yollar = [f[len("rapor_data."):] for f in secilen if f.startswith("rapor_data.")]
+    parcalar = _alan_listesi(
+        ",".join(f for f in secilen if not f.startswith("rapor_data.")), projections.DETAY_PARCALARI
+    )
+    if alt_yollar and "rapor_data" in parcalar:
+        raise HTTPException(status_code=400, detail="rapor_data ve rapor_data alt yolları birlikte istenemez")
+    return parcalar, _json_yollari(alt_yollar) if alt_yollar else []
+
+
 @app.get("/api/reports/{rapor_id}")
 async def get_report_detail(
     rapor_id: int,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Tek bir raporun detaylarını getir"""
+    """
+    Tek bir raporun detaylarını getir (rapor ve ölçümleri tek sorguda)
+    fields verilirse sadece istenen parçalar okunur (virgülle ayrılmış):
+    rapor_data, olcumler ya da rapor_data'nın alt yolları, örn.
+    fields=olcumler,rapor_data.genelBilgiler,rapor_data.olcumSonuclari.disCapOlcumleri
+    Alt yollar rapor_data'nın tamamı yerine okunur ve "alanlar" altında döner.
+    """
+    parcalar, yollar = _detay_alanlari(fields)
     try:
-        result = await db.execute(
-            select(KalibrasyonRaporu)
-            .where(KalibrasyonRaporu.id == rapor_id)
-        )
-        report = result.scalar_one_or_none()
+        report = (await db.execute(projections.detay_sorgusu(rapor_id, parcalar, yollar))).first()
         
         if not report:
             raise HTTPException(status_code=404, detail="Rapor bulunamadı")
         
-        # İlişkili ölçüm sonuçlarını getir
-        olcumler = await db.execute(
-            select(OlcumSonucu)
-            .where(OlcumSonucu.rapor_id == rapor_id)
-        )
-        
-        return {
-            "rapor": {
-                "id": report.id,
-                "sertifika_no": report.sertifika_no,
-                "rapor_data": report.rapor_data,
-                "pdf_path": report.pdf_path,
-                "created_at": report.created_at.isoformat() if report.created_at else None
-            },
-            "olcumler": [
-                {
-                    "olcum_tipi": o.olcum_tipi,
-                    "alt_tip": o.alt_tip,
-                    "referans_deger": o.referans_deger,
-                    "olculen_deger": o.olculen_deger,
-                    "sapma": o.sapma,
-                    "belirsizlik": o.belirsizlik
-                }
-                for o in olcumler.scalars().all()
-            ]
-        }
+        rapor = {"id": report.id, "sertifika_no": report.sertifika_no}
+        if yollar:
+            rapor["alanlar"] = projections.alan_degerleri(report, yollar)
+        elif "rapor_data" in parcalar:
+            rapor["rapor_data"] = report.rapor_data
+        rapor["pdf_path"] = report.pdf_path
+        rapor["created_at"] = report.created_at.isoformat() if report.created_at else None
+        
+        cevap = {"rapor": rapor}
+        if "olcumler" in parcalar:
+            cevap["olcumler"] = report.olcumler
+        return FastJSONResponse(cevap)
     except HTTPException:
         raise
     except Exception as e:
@@ -1252,31 +1684,259 @@ async def create_organizasyon(data: dict, db: AsyncSession = Depends(get_db)):
 
 
 @app.get("/api/organizasyonlar")
-async def list_organizasyonlar(db: AsyncSession = Depends(get_db)):
-    """Organizasyonları listele"""
-    from sqlalchemy.orm import selectinload
+async def list_organizasyonlar(
+    skip: int = 0,
+    limit: int = 50,
+    durum: Optional[DurumEnum] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Organizasyonları listele
+    Cihaz ve tamamlanan sayıları SQL'de gruplanarak hesaplanır, kalibrasyon verisi yüklenmez.
+    """
+    limit = max(1, min(limit, 200))
     
-    result = await db.execute(
-        select(Organizasyon)
-        .options(selectinload(Organizasyon.kalibrasyonlar))
-        .order_by(desc(Organizasyon.baslangic_tarihi))
+    # Organizasyon başına kalibrasyon sayıları
+    sayilar = (
+        select(
+            Kalibrasyon.organizasyon_id.label("organizasyon_id"),
+            func.count(Kalibrasyon.id).label("cihaz_sayisi"),
+            func.count(Kalibrasyon.id).filter(
+                Kalibrasyon.durum == DurumEnum.TAMAMLANDI
+            ).label("tamamlanan"),
+        )
+        .group_by(Kalibrasyon.organizasyon_id)
+        .subquery()
     )
-    organizasyonlar = result.scalars().all()
     
-    return {
+    count_query = select(func.count()).select_from(Organizasyon)
+    query = (
+        select(
+            Organizasyon.id,
+            Organizasyon.ad,
+            Organizasyon.musteri_adi,
+            Organizasyon.baslangic_tarihi,
+            Organizasyon.durum,
+            func.coalesce(sayilar.c.cihaz_sayisi, 0).label("cihaz_sayisi"),
+            func.coalesce(sayilar.c.tamamlanan, 0).label("tamamlanan"),
+        )
+        .outerjoin(sayilar, sayilar.c.organizasyon_id == Organizasyon.id)
+        .order_by(desc(Organizasyon.baslangic_tarihi), desc(Organizasyon.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    if durum:
+        count_query = count_query.where(Organizasyon.durum == durum)
+        query = query.where(Organizasyon.durum == durum)
+    
+    total = (await db.execute(count_query)).scalar_one()
+    rows = (await db.execute(query)).all()
+    
+    return FastJSONResponse({
+        "total": total,
         "organizasyonlar": [
             {
                 "id": org.id,
                 "ad": org.ad,
                 "musteri": org.musteri_adi,
-                "baslangic": org.baslangic_tarihi.isoformat(),
+                "baslangic": org.baslangic_tarihi.isoformat() if org.baslangic_tarihi else None,
                 "durum": org.durum.value,
-                "cihaz_sayisi": len(org.kalibrasyonlar),
-                "tamamlanan": len([k for k in org.kalibrasyonlar if k.durum == DurumEnum.TAMAMLANDI])
+                "cihaz_sayisi": org.cihaz_sayisi,
+                "tamamlanan": org.tamamlanan
             }
-            for org in organizasyonlar
+            for org in rows
         ]
-    }
+    })
+
+
+def _zip_suresi_doldu(path: Path) -> bool:
+    try:
+        return time.time() - path.stat().st_mtime > CERTIFICATE_ZIP_TTL_SECONDS
+    except FileNotFoundError:
+        return True
+
+
+def _eski_ziplari_sil():
+    """Süresi dolmuş toplu sertifika ZIP'lerini sil"""
+    for path in UPLOAD_DIR.glob("sertifikalar_org*.zip"):
+        if _zip_suresi_doldu(path):
+            path.unlink(missing_ok=True)
+
+
+@app.post("/api/organizasyonlar/{organizasyon_id}/certificates")
+async def create_organizasyon_certificates(
+    organizasyon_id: int,
+    stream: bool = True,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Organizasyonun tamamlanmış tüm kalibrasyonlarının sertifikalarını paralel üretir.
+    stream=true: NDJSON ilerleme satırları, sonunda ZIP indirme adresi
+    stream=false: hepsi bitince ZIP dosyasının kendisi
+    """
+    org = await db.get(Organizasyon, organizasyon_id)
+    if not org:
+        raise HTTPException(status_code=404, detail="Organizasyon bulunamadı")
+    
+    result = await db.execute(
+        select(Kalibrasyon, CihazTanim)
+        .outerjoin(CihazTanim, Kalibrasyon.cihaz_id == CihazTanim.id)
+        .where(
+            Kalibrasyon.organizasyon_id == organizasyon_id,
+            Kalibrasyon.durum == DurumEnum.TAMAMLANDI
+        )
+        .order_by(Kalibrasyon.id)
+    )
+    
+    # Sertifika verileri DB oturumu kapanmadan hazırlanır, stream sırasında DB kullanılmaz.
+    # Ölçüm verisi eksik/geçersiz kalibrasyon tüm partiyi düşürmez, hatalı olarak raporlanır
+    sertifikalar, veri_hatalari = [], {}
+    for kalibrasyon, cihaz in result.all():
+        try:
+            cert = _kalibrasyon_sertifika_verisi(
+                kalibrasyon,
+                genel_bilgiler=_genel_bilgiler(org, org.id),
+                cihaz_bilgileri=_cihaz_bilgileri(cihaz),
+                teknisyen=org.created_by or "Teknisyen",
+            )
+            sertifikalar.append((f"{cert['sertifikaNo']}.pdf", _pdf_verisi(cert)))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"TOPLU SERTİFİKA VERİ HATASI (kalibrasyon {kalibrasyon.id}): {str(e)}")
+            veri_hatalari[f"kalibrasyon_{kalibrasyon.id}.pdf"] = f"Geçersiz kalibrasyon verisi: {str(e)}"
+    
+    if not sertifikalar and not veri_hatalari:
+        raise HTTPException(status_code=404, detail="Organizasyonda tamamlanmış kalibrasyon yok")
+    toplam = len(sertifikalar) + len(veri_hatalari)
+    
+    zip_filename = f"sertifikalar_org{organizasyon_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    
+    async def render_one(dosya_adi: str, cert: dict):
+        try:
+            return dosya_adi, await pdf_engine.render_kalibrasyon_pdf_async(cert), None
+        except Exception as e:
+            print(f"TOPLU SERTİFİKA HATA ({dosya_adi}): {str(e)}")
+            return dosya_adi, None, str(e)
+    
+    async def render_all():
+        """Tüm sertifikaları process pool'a birlikte gönder, bittikçe (dosya, pdf, hata) ver"""
+        for dosya_adi, hata in veri_hatalari.items():
+            yield dosya_adi, None, hata
+        tasks = [asyncio.create_task(render_one(ad, cert)) for ad, cert in sertifikalar]
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    
+    def build_zip(pdfler: dict) -> bytes:
+        buffer = io.BytesIO()
+        # PDF'ler zaten sıkıştırılmış, tekrar deflate etmek CPU israfı
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zf:
+            for dosya_adi, pdf_bytes in sorted(pdfler.items()):
+                zf.writestr(dosya_adi, pdf_bytes)
+        return buffer.getvalue()
+    
+    if not stream:
+        pdfler = {ad: pdf_bytes async for ad, pdf_bytes, hata in render_all() if pdf_bytes}
+        if not pdfler:
+            raise HTTPException(
+                status_code=422 if not sertifikalar else 500,
+                detail="Hiçbir sertifika oluşturulamadı"
+            )
+        zip_bytes = await asyncio.to_thread(build_zip, pdfler)
+        return _bytes_stream_response(zip_bytes, zip_filename, media_type="application/zip")
+    
+    async def progress():
+        pdfler, hatalar = {}, {}
+        async for dosya_adi, pdf_bytes, hata in render_all():
+            if pdf_bytes:
+                pdfler[dosya_adi] = pdf_bytes
+            else:
+                hatalar[dosya_adi] = hata
+            yield json.dumps({
+                "durum": "ilerleme",
+                "dosya": dosya_adi,
+                "basarili": pdf_bytes is not None,
+                "hata": hata,
+                "tamamlanan": len(pdfler) + len(hatalar),
+                "toplam": toplam
+            }, ensure_ascii=False) + "\n"
+        
+        if pdfler:
+            await asyncio.to_thread(_eski_ziplari_sil)
+            zip_bytes = await asyncio.to_thread(build_zip, pdfler)
+            # Önce geçici dosyaya yaz, indirme yarım ZIP görmesin
+            tmp_path = UPLOAD_DIR / f"{zip_filename}.{uuid.uuid4().hex}.tmp"
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(zip_bytes)
+            await asyncio.to_thread(os.replace, tmp_path, UPLOAD_DIR / zip_filename)
+        
+        yield json.dumps({
+            "durum": "bitti",
+            "basarili": len(pdfler),
+            "hatali": len(hatalar),
+            "hatalar": hatalar,
+            "zip": zip_filename if pdfler else None,
+            "gecerlilik_saniye": CERTIFICATE_ZIP_TTL_SECONDS if pdfler else None,
+            "indirme_url": f"/api/organizasyonlar/{organizasyon_id}/certificates/{zip_filename}" if pdfler else None
+        }, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@app.get("/api/organizasyonlar/{organizasyon_id}/certificates/{zip_filename}")
+async def download_organizasyon_certificates(organizasyon_id: int, zip_filename: str):
+    """Toplu üretilmiş sertifika ZIP'ini indir"""
+    zip_path = UPLOAD_DIR / zip_filename
+    if (
+        Path(zip_filename).name != zip_filename
+        or not zip_filename.startswith(f"sertifikalar_org{organizasyon_id}_")
+        or not zip_filename.endswith(".zip")
+        or await asyncio.to_thread(_zip_suresi_doldu, zip_path)
+    ):
+        await asyncio.to_thread(_eski_ziplari_sil)
+        raise HTTPException(status_code=404, detail="Sertifika arşivi bulunamadı")
+    
+    return FileResponse(path=str(zip_path), media_type="application/zip", filename=zip_filename)
+
+
+@app.get("/api/organizasyonlar/{organizasyon_id}/uygunluk")
+async def evaluate_organizasyon_uygunluk(
+    organizasyon_id: int,
+    sablon_id: Optional[int] = None,
+    detay: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Organizasyondaki tüm kalibrasyonların uygunluğunu tek seferde değerlendir"""
+    org = await db.get(Organizasyon, organizasyon_id)
+    if not org:
+        raise HTTPException(status_code=404, detail="Organizasyon bulunamadı")
+    
+    result = await db.execute(
+        select(Kalibrasyon.id, Kalibrasyon.olcum_verileri, CihazTanim.cihaz_tipi)
+        .outerjoin(CihazTanim, Kalibrasyon.cihaz_id == CihazTanim.id)
+        .where(Kalibrasyon.organizasyon_id == organizasyon_id)
+        .order_by(Kalibrasyon.id)
+    )
+    rows = result.all()
+    
+    await catalog.ensure_loaded()
+    sablonlar = [_sablon_parametreleri(sablon_id, row.cihaz_tipi) for row in rows]
+    sonuclar = await asyncio.to_thread(
+        conformity.evaluate,
+        [row.olcum_verileri for row in rows],
+        [parametreler for _, parametreler in sablonlar],
+        detay=detay,
+    )
+    
+    return FastJSONResponse({
+        "organizasyon_id": organizasyon_id,
+        "ozet": {
+            karar: sum(1 for sonuc in sonuclar if sonuc["karar"] == karar)
+            for karar in conformity.KARARLAR
+        },
+        "kalibrasyonlar": [
+            {"kalibrasyon_id": row.id, "sablon_id": sablon, **sonuc}
+            for row, (sablon, _), sonuc in zip(rows, sablonlar, sonuclar)
+        ]
+    })
 
 
 # Cihaz API'leri
@@ -1326,45 +1986,37 @@ async def list_cihazlar(db: AsyncSession = Depends(get_db)):
     }
 
 
-# Kalibrasyon API'leri
-@app.post("/api/kalibrasyonlar")
-async def create_kalibrasyon(data: dict, db: AsyncSession = Depends(get_db)):
-    """Yeni kalibrasyon kaydı oluştur"""
-    kalibrasyon = Kalibrasyon(
-        organizasyon_id=data['organizasyon_id'],
-        cihaz_id=data['cihaz_id'],
-        sicaklik=data['ortam']['sicaklik'],
-        nem=data['ortam']['nem'],
-        olcum_verileri=data['olcumler'],
-        sesli_ozet_text=data.get('sesli_ozet', ''),
-        fotograflar=data.get('fotograflar', []),
-        kalibrasyon_tarihi=datetime.now(),
-        durum=DurumEnum.TAMAMLANDI,
-        uygunluk=all(olcum.get('sonuc', True) for olcum in data['olcumler'])
-    )
+def _genel_bilgiler(org: Optional[Organizasyon], organizasyon_id: Optional[int]) -> dict:
+    """Sertifikanın müşteri bilgileri - organizasyon kaydından"""
+    return {
+        "musteriAdi": (org.musteri_adi if org else "") or "",
+        "musteriAdres": (org.musteri_adres if org else "") or "",
+        "istekNo": f"IST-{organizasyon_id}"
+    }
+
+
+def _cihaz_bilgileri(cihaz: Optional[CihazTanim]) -> dict:
+    """Sertifikanın cihaz bilgileri - cihaz tanımından"""
+    return {
+        "cihazAdi": cihaz.cihaz_adi if cihaz else "Cihaz",
+        "marka": (cihaz.marka if cihaz else "") or "",
+        "model": (cihaz.model if cihaz else "") or "",
+        "seriNo": (cihaz.seri_no if cihaz else "") or "",
+        "olcmeAraligi": (cihaz.olcme_araligi if cihaz else "") or "",
+        "cozunurluk": (cihaz.cozunurluk if cihaz else "") or ""
+    }
+
+
+def _kalibrasyon_sertifika_verisi(kalibrasyon: Kalibrasyon, genel_bilgiler: dict, cihaz_bilgileri: dict, teknisyen: str) -> dict:
+    """Kalibrasyon kaydından sertifika PDF verisi oluştur (KalibrasyonSertifikasiData formatında)"""
+    tarih = kalibrasyon.kalibrasyon_tarihi or datetime.now()
     
-    db.add(kalibrasyon)
-    await db.commit()
-    await db.refresh(kalibrasyon)
-    
-    # PDF oluştur
-    pdf_data = {
-        "sertifikaNo": f"KAL-{datetime.now().strftime('%Y%m%d')}-{kalibrasyon.id}",
-        "genelBilgiler": {
-            "musteriAdi": "Test Müşteri",  # TODO: organizasyondan al
-            "musteriAdres": "Test Adres",
-            "istekNo": f"IST-{kalibrasyon.organizasyon_id}"
-        },
-        "cihazBilgileri": {
-            "cihazAdi": data.get('cihaz_adi', 'Cihaz'),
-            "marka": data.get('marka', ''),
-            "model": data.get('model', ''),
-            "seriNo": data.get('seri_no', ''),
-            "olcmeAraligi": "0-100 mm",
-            "cozunurluk": "0.01 mm"
-        },
+    return {
+        "sertifikaNo": f"KAL-{tarih.strftime('%Y%m%d')}-{kalibrasyon.id}",
+        "genelBilgiler": genel_bilgiler,
+        "cihazBilgileri": cihaz_bilgileri,
         "kalibrasyonBilgileri": {
-            "kalibrasyonTarihi": datetime.now().strftime("%d.%m.%Y"),
+            "kalibrasyonTarihi": tarih.strftime("%d.%m.%Y"),
             "ortamKosullari": {
                 "sicaklik": f"{kalibrasyon.sicaklik} °C",
                 "nem": f"{kalibrasyon.nem} %"
@@ -1377,16 +2029,17 @@ async def create_kalibrasyon(data: dict, db: AsyncSession = Depends(get_db)):
                     "referansDeger": olcum['nominal'],
                     "olculenDeger": olcum['olculen'],
                     "sapma": olcum['sapma'],
-                    "belirsizlik": olcum['belirsizlik']
+                    "belirsizlik": olcum['belirsizlik'],
+                    "okumalar": olcum.get('okumalar')
                 }
-                for olcum in data['olcumler']
+                for olcum in kalibrasyon.olcum_verileri or []
             ]
         },
         "uygunlukDegerlendirmesi": {
             "sonuc": kalibrasyon.uygunluk,
             "aciklama": "Kalibrasyon tamamlandı."
         },
-        "kalibrasyonuYapanlar": [{"adSoyad": data.get('teknisyen', 'Teknisyen'), "unvan": "Teknisyen"}],
+        "kalibrasyonuYapanlar": [{"adSoyad": teknisyen, "unvan": "Teknisyen"}],
         "onaylayanlar": [{"adSoyad": "Müdür", "unvan": "Teknik Müdür"}],
         "laboratuvarBilgileri": {
             "adresi": "Lab Adresi",
@@ -1394,106 +2047,229 @@ async def create_kalibrasyon(data: dict, db: AsyncSession = Depends(get_db)):
             "akreditasyonBilgisi": "TEST-001"
         }
     }
+
+
+# Kalibrasyon API'leri
+@app.post("/api/kalibrasyonlar", status_code=202)
+async def create_kalibrasyon(data: dict, db: AsyncSession = Depends(get_db)):
+    """Yeni kalibrasyon kaydı oluştur (sertifika PDF'i arka planda üretilir)"""
+    if job_queue.full():
+        raise HTTPException(status_code=503, detail="İş kuyruğu dolu, lütfen daha sonra tekrar deneyin")
     
-    pdf_path = await _generate_kalibrasyon_pdf(pdf_data)
+    # Şablon bulunabilirse uygunluk sunucuda hesaplanır, aksi halde istemcinin sonucu kullanılır
+    uygunluk = all(olcum.get('sonuc', True) for olcum in data['olcumler'])
+    cihaz = await db.get(CihazTanim, data['cihaz_id']) if data.get('cihaz_id') else None
+    await catalog.ensure_loaded()
+    _, parametreler = _sablon_parametreleri(data.get('sablon_id'), cihaz.cihaz_tipi if cihaz else None)
+    if parametreler:
+        degerlendirme = conformity.evaluate([data['olcumler']], [parametreler], detay=False)[0]
+        if degerlendirme["uygunluk"] is not None:
+            uygunluk = degerlendirme["uygunluk"]
     
-    # PDF yolunu güncelle
-    kalibrasyon.fotograflar = kalibrasyon.fotograflar or []
-    kalibrasyon.ekler = [pdf_path]
-    await db.commit()
+    kalibrasyon = Kalibrasyon(
+        organizasyon_id=data['organizasyon_id'],
+        cihaz_id=data['cihaz_id'],
+        sicaklik=data['ortam']['sicaklik'],
+        nem=data['ortam']['nem'],
+        olcum_verileri=data['olcumler'],
+        sesli_ozet_text=data.get('sesli_ozet', ''),
+        fotograflar=data.get('fotograflar', []),
+        kalibrasyon_tarihi=datetime.now(),
+        durum=DurumEnum.TAMAMLANDI,
+        uygunluk=uygunluk
+    )
+    
+    db.add(kalibrasyon)
+    await db.flush()
+    
+    # PDF oluşturma işi kayıtla aynı transaction'da yazılır - iş alınamazsa kayıt da oluşmaz.
+    # Müşteri ve cihaz bilgileri iş çalışırken kayıtlardan okunur (toplu sertifikayla aynı veri)
+    job = await _enqueue_job("kalibrasyon_pdf", {
+        "kalibrasyon_id": kalibrasyon.id,
+        "teknisyen": data.get('teknisyen', 'Teknisyen'),
+    }, db=db)
     
     return {
         "id": kalibrasyon.id,
         "organizasyon_id": kalibrasyon.organizasyon_id,
         "cihaz_id": kalibrasyon.cihaz_id,
-        "pdf_path": pdf_path,
-        "uygunluk": kalibrasyon.uygunluk
+        "uygunluk": kalibrasyon.uygunluk,
+        **job
     }
 
 
-# ===== STANDART API'LERİ =====
-
-@app.get("/api/standards")
-async def list_standards(db: AsyncSession = Depends(get_db)):
-    """Tüm kalibrasyon standartlarını listele"""
-    from sqlalchemy.orm import selectinload
+@job_queue.handler("kalibrasyon_pdf")
+async def _kalibrasyon_pdf_job(payload: dict) -> dict:
+    """Kalibrasyon sertifikasını oluştur ve kayda ekle"""
+    async with AsyncSessionLocal() as db:
+        kalibrasyon = await db.get(Kalibrasyon, payload['kalibrasyon_id'])
+        if not kalibrasyon:
+            raise JobPermanentError(f"Kalibrasyon bulunamadı: {payload['kalibrasyon_id']}")
+        org = await db.get(Organizasyon, kalibrasyon.organizasyon_id) if kalibrasyon.organizasyon_id else None
+        cihaz = await db.get(CihazTanim, kalibrasyon.cihaz_id) if kalibrasyon.cihaz_id else None
+        
+        try:
+            pdf_data = _kalibrasyon_sertifika_verisi(
+                kalibrasyon,
+                genel_bilgiler=_genel_bilgiler(org, kalibrasyon.organizasyon_id),
+                cihaz_bilgileri=_cihaz_bilgileri(cihaz),
+                teknisyen=payload.get('teknisyen') or "Teknisyen",
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            # Eksik/geçersiz ölçüm verisi tekrar denemeyle düzelmez
+            raise JobPermanentError(f"Geçersiz kalibrasyon verisi: {str(e)}") from e
     
+    pdf_path = await _generate_kalibrasyon_pdf(pdf_data)
+    
+    # PDF yolunu güncelle
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Kalibrasyon)
+            .where(Kalibrasyon.id == payload['kalibrasyon_id'])
+            .values(ekler=[pdf_path])
+        )
+        await db.commit()
+    
+    return {"kalibrasyon_id": payload['kalibrasyon_id'], "pdf_path": pdf_path}
+
+
+def _sablon_parametreleri(sablon_id: Optional[int], cihaz_tipi: Optional[CihazTipiEnum]):
+    """
+    Değerlendirmede kullanılacak şablonu katalogdan bul: (sablon_id, parametreler).
+    sablon_id verilmezse cihaz tipine ait ilk şablon kullanılır. Katalog önceden yüklenmiş olmalı.
+    """
+    if sablon_id is None and cihaz_tipi is not None:
+        sablonlar = catalog.by_cihaz_tipi.get(cihaz_tipi.value, {}).get("standartlar")
+        if sablonlar:
+            sablon_id = sablonlar[0]["sablon_id"]
+    if sablon_id is None:
+        return None, None
+    return sablon_id, catalog.by_sablon_id.get(sablon_id, {}).get("parametreler")
+
+
+@app.get("/api/kalibrasyonlar/{kalibrasyon_id}/uygunluk")
+async def evaluate_kalibrasyon_uygunluk(
+    kalibrasyon_id: int,
+    sablon_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Kalibrasyonun ölçümlerini şablon toleranslarına göre değerlendir"""
     result = await db.execute(
-        select(CalibrasyonStandardi)
-        .options(selectinload(CalibrasyonStandardi.sablonlar))
-        .order_by(CalibrasyonStandardi.kod)
+        select(Kalibrasyon.id, Kalibrasyon.olcum_verileri, CihazTanim.cihaz_tipi)
+        .outerjoin(CihazTanim, Kalibrasyon.cihaz_id == CihazTanim.id)
+        .where(Kalibrasyon.id == kalibrasyon_id)
     )
-    standartlar = result.scalars().all()
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Kalibrasyon bulunamadı")
     
-    return {
-        "standartlar": [
-            {
-                "id": s.id,
-                "kod": s.kod,
-                "ad_tr": s.ad_tr,
-                "ad_en": s.ad_en,
-                "organizasyon": s.organizasyon,
-                "yil": s.yil,
-                "sablon_sayisi": len(s.sablonlar)
-            }
-            for s in standartlar
-        ]
-    }
+    await catalog.ensure_loaded()
+    sablon_id, parametreler = _sablon_parametreleri(sablon_id, row.cihaz_tipi)
+    if parametreler is None:
+        raise HTTPException(status_code=404, detail="Kalibrasyon için şablon parametresi bulunamadı")
+    
+    sonuc = conformity.evaluate([row.olcum_verileri], [parametreler])[0]
+    return {"kalibrasyon_id": kalibrasyon_id, "sablon_id": sablon_id, **sonuc}
+
+
+def _belirsizlik_cevabi(nominal: list, butce: dict) -> List[dict]:
+    return [
+        {
+            "nominal": n,
+            "u_a": round(u_a, 9),
+            "u_b": round(u_b, 9),
+            "u_c": round(u_c, 9),
+            "serbestlik_derecesi": None if nu == float("inf") else round(nu, 1),
+            "k": round(k, 2),
+            "U": round(U, 6)
+        }
+        for n, u_a, u_b, u_c, nu, k, U in zip(
+            nominal, *(butce[alan].tolist() for alan in ("u_a", "u_b", "u_c", "nu_eff", "k", "U"))
+        )
+    ]
+
+
+@app.post("/api/belirsizlik")
+async def compute_belirsizlik(request: BelirsizlikRequest):
+    """Verilen noktalar için GUM belirsizlik bütçesini hesapla"""
+    katkilar = uncertainty.Katkilar(
+        cozunurluk=request.cozunurluk,
+        sicaklik_sapmasi=uncertainty.sicaklik_sapmasi(request.sicaklik),
+        referans_sabit=request.referans_sabit,
+        referans_oransal=request.referans_oransal,
+        referans_k=request.referans_k,
+    )
+    nominal = [n.nominal for n in request.noktalar]
+    butce = uncertainty.hesapla(nominal, [n.okumalar for n in request.noktalar], katkilar)
+    return {"noktalar": _belirsizlik_cevabi(nominal, butce)}
 
 
-@app.get("/api/standards/{cihaz_tipi}")
-async def get_standards_by_device(cihaz_tipi: str, db: AsyncSession = Depends(get_db)):
-    """Cihaz tipine göre uygun standartları getir"""
-    from sqlalchemy.orm import selectinload
-    
+@app.get("/api/kalibrasyonlar/{kalibrasyon_id}/belirsizlik")
+async def get_kalibrasyon_belirsizlik(kalibrasyon_id: int, db: AsyncSession = Depends(get_db)):
+    """Kayıtlı kalibrasyonun ölçüm noktaları için belirsizlik bütçesi"""
     result = await db.execute(
-        select(StandardSablon)
-        .options(selectinload(StandardSablon.standart))
-        .where(StandardSablon.cihaz_tipi_kodu == cihaz_tipi)
+        select(Kalibrasyon.olcum_verileri, Kalibrasyon.sicaklik, CihazTanim.cozunurluk)
+        .outerjoin(CihazTanim, Kalibrasyon.cihaz_id == CihazTanim.id)
+        .where(Kalibrasyon.id == kalibrasyon_id)
     )
-    sablonlar = result.scalars().all()
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Kalibrasyon bulunamadı")
     
-    return {
-        "standartlar": [
-            {
-                "id": s.standart.id,
-                "standart_kod": s.standart.kod,
-                "standart_ad": s.standart.ad_tr,
-                "sablon_id": s.id,
-                "cihaz_tipi_adi": s.cihaz_tipi_adi,
-                "grup": s.grup
-            }
-            for s in sablonlar
-        ]
-    }
+    cozunurluk = uncertainty.sayi_oku(row.cozunurluk)
+    if not cozunurluk:
+        raise HTTPException(status_code=422, detail="Cihazın çözünürlüğü tanımlı değil")
+    
+    olcumler = [
+        o for o in row.olcum_verileri or []
+        if isinstance(o, dict) and uncertainty.sayi_oku(o.get('nominal')) is not None
+    ]
+    nominal = [uncertainty.sayi_oku(o['nominal']) for o in olcumler]
+    katkilar = uncertainty.Katkilar(
+        cozunurluk=cozunurluk,
+        sicaklik_sapmasi=uncertainty.sicaklik_sapmasi(row.sicaklik),
+    )
+    butce = uncertainty.hesapla(nominal, [o.get('okumalar') for o in olcumler], katkilar)
+    return {"kalibrasyon_id": kalibrasyon_id, "noktalar": _belirsizlik_cevabi(nominal, butce)}
+
+
+# ===== STANDART API'LERİ =====
+
+def _catalog_response(payload: dict, if_none_match: Optional[str]) -> Response:
+    """Katalog cevabını ETag ile döndür; istemcideki sürüm güncelse 304"""
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+    if catalog.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(payload, headers=headers)
+
+
+@app.get("/api/standards")
+async def list_standards(if_none_match: Optional[str] = Header(None)):
+    """Tüm kalibrasyon standartlarını listele"""
+    await catalog.ensure_loaded()
+    return _catalog_response(catalog.standartlar, if_none_match)
+
+
+@app.get("/api/standards/{cihaz_tipi}")
+async def get_standards_by_device(cihaz_tipi: str, if_none_match: Optional[str] = Header(None)):
+    """Cihaz tipine göre uygun standartları getir"""
+    await catalog.ensure_loaded()
+    return _catalog_response(catalog.by_cihaz_tipi.get(cihaz_tipi, {"standartlar": []}), if_none_match)
 
 
 @app.get("/api/templates/{template_id}/parameters")
-async def get_template_parameters(template_id: int, db: AsyncSession = Depends(get_db)):
+async def get_template_parameters(template_id: int, if_none_match: Optional[str] = Header(None)):
     """Şablonun parametrelerini getir"""
-    result = await db.execute(
-        select(SablonParametre)
-        .where(SablonParametre.sablon_id == template_id)
-        .order_by(SablonParametre.id)
-    )
-    parametreler = result.scalars().all()
-    
-    return {
-        "parametreler": [
-            {
-                "id": p.id,
-                "ad": p.parametre_adi,
-                "kod": p.parametre_kodu,
-                "birim": p.birim,
-                "tolerans_tipi": p.tolerans_tipi,
-                "tolerans_degeri": p.tolerans_degeri,
-                "test_noktalari": p.test_noktalari,
-                "zorunlu": p.zorunlu,
-                "referans": p.referans
-            }
-            for p in parametreler
-        ]
-    }
+    await catalog.ensure_loaded()
+    return _catalog_response(catalog.by_sablon_id.get(template_id, {"parametreler": []}), if_none_match)
+
+
+@app.post("/api/admin/standards-cache/invalidate")
+async def invalidate_standards_cache():
+    """Seed sonrası standart kataloğunu hemen yeniden yükle"""
+    catalog.invalidate()
+    await catalog.ensure_loaded()
+    return catalog.stats()
 
 
 if __name__ == "__main__":
@@ -1,12 +1,24 @@
 """
 Veritabanı modelleri - Kalibrasyon raporları ve ilişkili veriler
 """
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text, Boolean, ForeignKey, Index, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
 
 
+# Arşiv araması için ağırlıklı tam metin vektörü. Sertifika/seri no gibi kodlar kök bulmadan
+# ('simple'), serbest metinler Türkçe sözlükle işlenir. Fonksiyonlar IMMUTABLE olduğundan
+# Postgres bunu satır yazılırken kendisi hesaplar; toplu yeniden indeksleme gerekmez.
+ARAMA_VEKTORU_SQL = (
+    "setweight(to_tsvector('simple', coalesce(sertifika_no, '') || ' ' || coalesce(seri_no, '')), 'A') || "
+    "setweight(to_tsvector('turkish', coalesce(musteri_adi, '')), 'B') || "
+    "setweight(to_tsvector('turkish', coalesce(cihaz_tipi, '') || ' ' || coalesce(cihaz_marka, '') || ' ' "
+    "|| coalesce(cihaz_model, '')), 'C')"
+)
+
+
 class KalibrasyonRaporu(Base):
     """Ana kalibrasyon raporu tablosu"""
     __tablename__ = "kalibrasyon_raporlari"
@@ -41,8 +53,11 @@ class KalibrasyonRaporu(Base):
     durum = Column(String(50), default="tamamlandi")  # tamamlandi, iptal, beklemede
     uygunluk = Column(Boolean, default=True)  # Uygun/Uygun değil
     
-    # JSON olarak tüm rapor verisi (backup/detaylı veri için)
-    rapor_data = Column(JSON)
+    # Tüm rapor verisi - JSONB: iç alanlara göre indeksli filtre ve kısmi okuma (#>) yapılabilir
+    rapor_data = Column(JSONB)
+    
+    # Tam metin arama vektörü (sadece arama sorgusunda kullanılır, varsayılan olarak yüklenmez)
+    arama_vektoru = deferred(Column(TSVECTOR, Computed(ARAMA_VEKTORU_SQL, persisted=True)))
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -52,6 +67,26 @@ class KalibrasyonRaporu(Base):
     # İlişkiler
     olcumler = relationship("OlcumSonucu", back_populates="rapor", cascade="all, delete-orphan")
     dosyalar = relationship("RaporDosya", back_populates="rapor", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # /api/reports keyset sayfalaması (created_at, id) sırasıyla okur
+        Index("ix_kalibrasyon_raporlari_created_at_id", "created_at", "id"),
+        # /api/reports/search: tam metin ve seri/sertifika no için bulanık (pg_trgm) arama
+        Index("ix_kalibrasyon_raporlari_arama_vektoru", "arama_vektoru", postgresql_using="gin"),
+        Index(
+            "ix_kalibrasyon_raporlari_seri_no_trgm", "seri_no",
+            postgresql_using="gin", postgresql_ops={"seri_no": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_kalibrasyon_raporlari_sertifika_no_trgm", "sertifika_no",
+            postgresql_using="gin", postgresql_ops={"sertifika_no": "gin_trgm_ops"}
+        ),
+        # rapor_data @> {...} iç alan filtreleri (jsonb_path_ops: sadece @>, daha küçük indeks)
+        Index(
+            "ix_kalibrasyon_raporlari_rapor_data", "rapor_data",
+            postgresql_using="gin", postgresql_ops={"rapor_data": "jsonb_path_ops"}
+        ),
+    )
 
 
 class OlcumSonucu(Base):
@@ -107,3 +142,38 @@ class Kullanici(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
+
+
+class RaporIsi(Base):
+    """Arka planda çalışan rapor/PDF üretim işleri (kuyruk kaydı)"""
+    __tablename__ = "rapor_isleri"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tur = Column(String(50), nullable=False)  # save_report, kalibrasyon_pdf
+    durum = Column(String(20), default="bekliyor", index=True)  # bekliyor, calisiyor, tamamlandi, hata
+    
+    payload = Column(JSON)  # İşin girdi verisi
+    sonuc = Column(JSON, nullable=True)  # rapor_id, pdf_path vs.
+    hata = Column(Text, nullable=True)
+    deneme = Column(Integer, default=0)  # Kaç kez çalıştırıldı
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class TranskripsiyonOnbellegi(Base):
+    """Ses kaydı transkripsiyon önbelleği - aynı kayıt tekrar yüklenince Whisper'a gidilmez"""
+    __tablename__ = "transkripsiyon_onbellegi"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    ses_hash = Column(String(64), nullable=False)  # Ses dosyası byte'larının SHA-256'sı
+    model = Column(String(50), nullable=False)
+    dil = Column(String(10), nullable=False)
+    metin = Column(Text, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    son_erisim = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("ses_hash", "model", "dil", name="uq_transkripsiyon_onbellegi_anahtar"),
+    )
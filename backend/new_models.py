@@ -1,7 +1,8 @@
 """
 Yeni sistem için veritabanı modelleri
 """
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text, Boolean, ForeignKey, Enum, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -60,7 +61,7 @@ class CihazTanim(Base):
     cozunurluk = Column(String(50))
     
     # Kalibrasyon için gerekli alanlar (JSON)
-    kalibrasyon_noktalari = Column(JSON)  # [0, 25, 50, 75, 100] gibi
+    kalibrasyon_noktalari = Column(JSONB)  # [0, 25, 50, 75, 100] gibi
     toleranslar = Column(JSON)  # {"sapma": 0.05, "belirsizlik": 0.02} gibi
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -68,6 +69,14 @@ class CihazTanim(Base):
     
     # İlişkiler
     kalibrasyonlar = relationship("Kalibrasyon", back_populates="cihaz")
+    
+    __table_args__ = (
+        # kalibrasyon_noktalari @> [...] filtreleri
+        Index(
+            "ix_cihaz_tanimlari_kalibrasyon_noktalari", "kalibrasyon_noktalari",
+            postgresql_using="gin", postgresql_ops={"kalibrasyon_noktalari": "jsonb_path_ops"}
+        ),
+    )
 
 
 class Kalibrasyon(Base):
@@ -75,15 +84,15 @@ class Kalibrasyon(Base):
     __tablename__ = "kalibrasyonlar"
     
     id = Column(Integer, primary_key=True, index=True)
-    organizasyon_id = Column(Integer, ForeignKey("organizasyonlar.id"))
+    organizasyon_id = Column(Integer, ForeignKey("organizasyonlar.id"), index=True)
     cihaz_id = Column(Integer, ForeignKey("cihaz_tanimlari.id"))
     
     # Ortam koşulları
     sicaklik = Column(Float)
     nem = Column(Float)
     
-    # Ölçüm verileri (JSON)
-    olcum_verileri = Column(JSON)  # Cihaz tipine göre dinamik
+    # Ölçüm verileri (JSONB, GIN indeksli)
+    olcum_verileri = Column(JSONB)  # Cihaz tipine göre dinamik
     
     # Sonuç
     uygunluk = Column(Boolean, default=True)
@@ -106,6 +115,14 @@ class Kalibrasyon(Base):
     # İlişkiler
     organizasyon = relationship("Organizasyon", back_populates="kalibrasyonlar")
     cihaz = relationship("CihazTanim", back_populates="kalibrasyonlar")
+    
+    __table_args__ = (
+        # olcum_verileri @> [{...}] filtreleri
+        Index(
+            "ix_kalibrasyonlar_olcum_verileri", "olcum_verileri",
+            postgresql_using="gin", postgresql_ops={"olcum_verileri": "jsonb_path_ops"}
+        ),
+    )
 
 
 class FormSablonu(Base):
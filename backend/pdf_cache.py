@@ -0,0 +1,136 @@
+"""
+Sertifika PDF önbelleği - sertifika verisinin kanonik JSON hash'i ile içerik adresli,
+bayt bütçeli LRU önbellek. Diskteki sertifika dosyaları için kullanım istatistiği ve
+kayıtlara bağlı olmayan dosyaların bütçeye göre temizlenmesi.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Bellekteki PDF'ler için üst sınırlar
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "64"))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+# Diskteki sertifika PDF'leri için bütçe; aşılınca hiçbir kayda bağlı olmayan dosyalar silinir
+PDF_DISK_MAX_MB = int(os.getenv("PDF_DISK_MAX_MB", "1024"))
+# Yeni yazılmış dosyalar (kaydı henüz oluşturulmamış olabilir) bu süre boyunca silinmez
+PDF_DISK_MIN_AGE_SECONDS = float(os.getenv("PDF_DISK_MIN_AGE_SECONDS", "3600"))
+# Yeni PDF yazıldıktan sonra bütçe kontrolü en fazla bu aralıkla (saniye) yapılır
+PDF_DISK_PRUNE_INTERVAL = float(os.getenv("PDF_DISK_PRUNE_INTERVAL", "300"))
+# İçerik adresli sertifika dosyalarının adı
+PDF_DISK_PATTERN = "kalibrasyon_sertifikasi_*.pdf"
+
+
+def cache_key(cert: dict, template_version: str) -> str:
+    """Sertifika verisi + şablon versiyonu için kanonik SHA-256 anahtarı (değerler değiştirilmeden)"""
+    payload = json.dumps(
+        {"sablon": template_version, "sertifika": cert},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """En son kullanılan PDF'leri bayt ve adet bütçesi içinde tutar (LRU tahliye)"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._items.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        # Bütçeden büyük tek bir PDF önbelleği boşaltmasın
+        if len(data) > self.max_bytes:
+            return
+        if key in self._items:
+            self._size -= len(self._items.pop(key))
+        self._items[key] = data
+        self._size += len(data)
+
+        while self._size > self.max_bytes or len(self._items) > self.max_entries:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _disk_files(directory: Path) -> list:
+    """Sertifika dosyaları, en eski erişilen başta: (yol, boyut, son erişim)"""
+    files = []
+    for path in directory.glob(PDF_DISK_PATTERN):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((path, st.st_size, max(st.st_atime, st.st_mtime)))
+    return sorted(files, key=lambda f: f[2])
+
+
+def disk_stats(directory: Path) -> dict:
+    files = _disk_files(directory)
+    return {
+        "files": len(files),
+        "bytes": sum(size for _, size, _ in files),
+        "max_bytes": PDF_DISK_MAX_MB * 1024 * 1024,
+    }
+
+
+def prune_disk(
+    directory: Path,
+    referenced: Iterable[str],
+    max_bytes: int = PDF_DISK_MAX_MB * 1024 * 1024,
+    min_age: float = PDF_DISK_MIN_AGE_SECONDS,
+) -> dict:
+    """
+    Toplam boyut bütçeyi aşıyorsa, kayıtlara bağlı olmayan (referenced'da adı geçmeyen) ve
+    min_age'den eski dosyaları en eski erişilenden başlayarak sil. Kayıtlı sertifikalar silinmez.
+    """
+    referenced = {Path(p).name for p in referenced if p}
+    files = _disk_files(directory)
+    total = sum(size for _, size, _ in files)
+    now = time.time()
+    removed = removed_bytes = 0
+    for path, size, accessed in files:
+        if total <= max_bytes:
+            break
+        if path.name in referenced or now - accessed < min_age:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+        removed_bytes += size
+    return {"removed": removed, "removed_bytes": removed_bytes, "bytes": total, "max_bytes": max_bytes}
+
+
+render_cache = PdfCache(PDF_CACHE_MAX_MB * 1024 * 1024, PDF_CACHE_MAX_ENTRIES)
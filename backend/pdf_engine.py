@@ -0,0 +1,404 @@
+"""
+Sertifika PDF render motoru - fpdf2 yerleşim işini process pool'da çalıştırır
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from fpdf import FPDF
+
+import fonts
+from pdf_cache import cache_key, render_cache
+
+# Render için ayrılacak worker process sayısı (varsayılan: CPU çekirdek sayısı)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+
+# Sertifika yerleşimi değiştiğinde artırılmalı (önbellekteki eski PDF'ler geçersiz olur)
+TEMPLATE_VERSION = "1"
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Aynı anda render edilen aynı sertifikalar tek render'ı paylaşır
+_inflight: Dict[str, asyncio.Task] = {}
+# Eşzamanlı ilk render'lar birden fazla pool oluşturmasın
+_pool_lock = asyncio.Lock()
+
+
+def _init_worker():
+    """Worker açılışında fontları yükle (fork ile ana process'ten gelmişse bir şey yapmaz)"""
+    fonts.registry.load()
+
+
+def _warm_worker():
+    """Worker process'i ayağa kaldırmak için boş iş"""
+    return os.getpid()
+
+
+def render_kalibrasyon_pdf(cert: dict) -> bytes:
+    """
+    Kalibrasyon sertifikası PDF'ini oluşturur (ISO 17020 formatında) ve byte olarak döndürür.
+    Sadece düz dict alır, böylece worker process'e pickle ile gönderilebilir.
+    """
+    # PDF oluştur - Yatay sayfa (landscape) kullan, marjinleri minimize et
+    pdf = FPDF(orientation='L', unit='mm', format='A4')  # 'L' = Landscape
+    pdf.set_auto_page_break(auto=True, margin=8)  # Daha az marjin
+    pdf.set_left_margin(8)
+    pdf.set_right_margin(8)
+    pdf.set_top_margin(8)
+    pdf.add_page()
+    
+    # Türkçe font ekle (önbellekten, diske dokunmadan)
+    font_name = fonts.registry.attach(pdf)
+    
+    # BAŞLIK - ŞİRKET BİLGİLERİ
+    sert_bilgi = cert.get('sertifika_bilgileri', {})
+    
+    pdf.set_font(font_name, 'B', 14)
+    pdf.set_text_color(30, 58, 138)
+    pdf.multi_cell(0, 5, sert_bilgi.get('firma', ''), align='C')
+    
+    pdf.set_font(font_name, '', 8)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 4, sert_bilgi.get('adres', ''), ln=True, align='C')
+    pdf.cell(0, 4, f"Tel: {sert_bilgi.get('telefon', '')} Faks: {sert_bilgi.get('faks', '')}", ln=True, align='C')
+    pdf.cell(0, 4, f"E-posta: {sert_bilgi.get('email', '')} Web: {sert_bilgi.get('website', '')}", ln=True, align='C')
+    pdf.ln(2)
+    
+    # Akreditasyon bilgisi
+    pdf.set_font(font_name, 'B', 9)
+    pdf.cell(0, 5, f"Akreditasyon No: {sert_bilgi.get('akreditasyon_no', '')}", ln=True, align='C')
+    pdf.ln(2)
+    
+    # KALİBRASYON SERTİFİKASI başlığı
+    pdf.set_font(font_name, 'B', 16)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 10, 'KALİBRASYON SERTİFİKASI', ln=True, align='C')
+    pdf.ln(2)
+    
+    # Sertifika No ve Tarih
+    pdf.set_font(font_name, 'B', 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 6, f"Sertifika No: {sert_bilgi.get('sertifika_no', '')}       Tarih: {sert_bilgi.get('tarih', '')}", ln=True, align='C')
+    pdf.ln(2)
+    
+    # MÜŞTERİ BİLGİLERİ
+    musteri = cert.get('musteri_bilgileri', {})
+    
+    # Yeterli yer var mı kontrol et
+    if pdf.get_y() > 170:
+        pdf.add_page()
+    
+    pdf.set_font(font_name, 'B', 10)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(0, 7, 'MÜŞTERİ BİLGİLERİ', ln=True, fill=True, border=1)
+    pdf.set_font(font_name, '', 9)
+    
+    pdf.cell(45, 6, 'Sahibi:', border=1)
+    pdf.cell(0, 6, musteri.get('sahibi', ''), border=1, ln=True)
+    pdf.cell(45, 6, 'Adres:', border=1)
+    pdf.cell(0, 6, musteri.get('adres', ''), border=1, ln=True)
+    pdf.cell(45, 6, 'İstek Numarası:', border=1)
+    pdf.cell(0, 6, musteri.get('istek_numarasi', ''), border=1, ln=True)
+    pdf.ln(1)
+    
+    # CİHAZ BİLGİLERİ
+    cihaz = cert.get('cihaz_bilgileri', {})
+    pdf.set_font(font_name, 'B', 10)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(0, 7, 'CİHAZ BİLGİLERİ', ln=True, fill=True, border=1)
+    pdf.set_font(font_name, '', 9)
+    
+    cihaz_fields = [
+        ('Makine/Cihaz:', cihaz.get('makine_cihaz', '')),
+        ('İmalatçı:', cihaz.get('imalatci', '')),
+        ('Tip:', cihaz.get('tip', '')),
+        ('Seri Numarası:', cihaz.get('seri_numarasi', '')),
+        ('Kalibrasyon Tarihi:', cihaz.get('kalibrasyon_tarihi', '')),
+        ('Ölçme Aralığı:', cihaz.get('olcme_araligi', '')),
+        ('Çözünürlük:', cihaz.get('cozunurluk', '')),
+    ]
+    
+    for label, value in cihaz_fields:
+        pdf.cell(50, 6, label, border=1)
+        pdf.cell(0, 6, str(value), border=1, ln=True)
+    pdf.ln(1)
+    
+    # ÇEVRE ŞARTLARI
+    kal_detay = cert.get('kalibrasyon_detaylari', {})
+    cevre = kal_detay.get('cevre_sartlari', {})
+    
+    pdf.set_font(font_name, 'B', 10)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(0, 7, 'ÇEVRE ŞARTLARI', ln=True, fill=True, border=1)
+    pdf.set_font(font_name, '', 9)
+    
+    pdf.cell(50, 6, 'Sıcaklık:', border=1)
+    pdf.cell(0, 6, cevre.get('sicaklik', ''), border=1, ln=True)
+    pdf.cell(50, 6, 'Bağıl Nem:', border=1)
+    pdf.cell(0, 6, cevre.get('bagil_nem', ''), border=1, ln=True)
+    pdf.ln(1)
+    
+    # FONKSİYONELLİK KONTROLÜ
+    fonk = cert.get('fonksiyonellik_kontrolu', {})
+    if fonk:
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'FONKSİYONELLİK KONTROLÜ', ln=True, fill=True, border=1)
+        pdf.set_font(font_name, '', 9)
+        
+        for kontrol, durum in fonk.items():
+            pdf.cell(95, 6, kontrol.replace('_', ' ').title() + ':', border=1)
+            pdf.cell(0, 6, str(durum), border=1, ln=True)
+        pdf.ln(1)
+    
+    # ÖLÇÜM SONUÇLARI - Yeterli yer varsa aynı sayfada devam et
+    if pdf.get_y() > 160:  # Sayfa sonuna yaklaşıldıysa
+        pdf.add_page()
+    else:
+        pdf.ln(3)  # Biraz boşluk
+    
+    pdf.set_font(font_name, 'B', 12)
+    pdf.set_text_color(30, 58, 138)
+    pdf.cell(0, 8, 'ÖLÇÜM SONUÇLARI', ln=True, align='C')
+    pdf.set_text_color(0, 0, 0)
+    pdf.ln(1)
+    
+    olcum = cert.get('olcum_sonuclari', {})
+    
+    # DIŞ ÇAP ÖLÇÜMLERİ
+    if 'dis_cap_olcumleri' in olcum:
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'DIŞ ÇAP ÖLÇÜMLERİ', ln=True, fill=True, border=1)
+        
+        # Tablo başlıkları - sütun genişliklerini küçülttük
+        pdf.set_font(font_name, 'B', 7)
+        pdf.set_fill_color(200, 200, 200)
+        pdf.cell(24, 8, 'Referans', border=1, fill=True, align='C')
+        pdf.cell(24, 8, 'İç', border=1, fill=True, align='C')
+        pdf.cell(24, 8, 'Orta', border=1, fill=True, align='C')
+        pdf.cell(24, 8, 'Dış', border=1, fill=True, align='C')
+        pdf.cell(26, 8, 'Sapma İç', border=1, fill=True, align='C')
+        pdf.cell(26, 8, 'Sapma Orta', border=1, fill=True, align='C')
+        pdf.cell(22, 8, 'Belirsizlik', border=1, fill=True, align='C', ln=True)
+        
+        # Veriler
+        pdf.set_font(font_name, '', 7)
+        for olc in olcum['dis_cap_olcumleri']:
+            ref = olc.get('referans_deger_mm', '')
+            oc = olc.get('olculen_deger', {})
+            sap = olc.get('sapma', {})
+            bel = olc.get('olcum_belirsizligi_mm', '')
+            
+            pdf.cell(24, 7, str(ref) if ref else '-', border=1, align='C')
+            pdf.cell(24, 7, str(oc.get('ic_mm')) if oc.get('ic_mm') is not None else '-', border=1, align='C')
+            pdf.cell(24, 7, str(oc.get('orta_mm')) if oc.get('orta_mm') is not None else '-', border=1, align='C')
+            pdf.cell(24, 7, str(oc.get('dis_mm')) if oc.get('dis_mm') is not None else '-', border=1, align='C')
+            pdf.cell(26, 7, str(sap.get('ic_mm')) if sap.get('ic_mm') is not None else '-', border=1, align='C')
+            pdf.cell(26, 7, str(sap.get('orta_mm')) if sap.get('orta_mm') is not None else '-', border=1, align='C')
+            pdf.cell(22, 7, str(bel) if bel else '-', border=1, align='C', ln=True)
+        pdf.ln(1)
+    
+    # İÇ ÇAP ÖLÇÜMLERİ
+    if 'ic_cap_olcumleri' in olcum:
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'İÇ ÇAP ÖLÇÜMLERİ', ln=True, fill=True, border=1)
+        
+        pdf.set_font(font_name, 'B', 8)
+        pdf.set_fill_color(200, 200, 200)
+        pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
+        
+        pdf.set_font(font_name, '', 8)
+        for olc in olcum['ic_cap_olcumleri']:
+            pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
+        pdf.ln(1)
+    
+    # DERİNLİK ÖLÇÜMLERİ
+    if 'derinlik_olcumleri' in olcum:
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'DERİNLİK ÖLÇÜMLERİ', ln=True, fill=True, border=1)
+        
+        pdf.set_font(font_name, 'B', 8)
+        pdf.set_fill_color(200, 200, 200)
+        pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
+        
+        pdf.set_font(font_name, '', 8)
+        for olc in olcum['derinlik_olcumleri']:
+            pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
+        pdf.ln(1)
+    
+    # KADEME ÖLÇÜMLERİ
+    if 'kademe_olcumleri' in olcum:
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'KADEME ÖLÇÜMLERİ', ln=True, fill=True, border=1)
+        
+        pdf.set_font(font_name, 'B', 8)
+        pdf.set_fill_color(200, 200, 200)
+        pdf.cell(47, 8, 'Referans Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Ölçülen Değer (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Sapma (mm)', border=1, fill=True, align='C')
+        pdf.cell(47, 8, 'Belirsizlik (mm)', border=1, fill=True, align='C', ln=True)
+        
+        pdf.set_font(font_name, '', 8)
+        for olc in olcum['kademe_olcumleri']:
+            pdf.cell(47, 7, str(olc.get('referans_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olculen_deger_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('sapma_mm', '')), border=1, align='C')
+            pdf.cell(47, 7, str(olc.get('olcum_belirsizligi_mm', '')), border=1, align='C', ln=True)
+        pdf.ln(2)
+    
+    # UYGUNLUK DEĞERLENDİRMESİ
+    uygunluk = cert.get('uygunluk_degerlendirmesi', {})
+    if uygunluk:
+        # Landscape A4: height=210mm, margin=10mm, usable=190mm
+        # 175mm'den sonra yer kalmıyor, yeni sayfa aç
+        if pdf.get_y() > 175:
+            pdf.add_page()
+        
+        pdf.set_font(font_name, 'B', 10)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 7, 'UYGUNLUK DEĞERLENDİRMESİ', ln=True, fill=True, border=1)
+        pdf.set_font(font_name, '', 7)
+        
+        try:
+            pdf.multi_cell(0, 5, uygunluk.get('karar_kurali', ''), border=1)
+        except:
+            pdf.add_page()
+            pdf.multi_cell(0, 5, uygunluk.get('karar_kurali', ''), border=1)
+        pdf.ln(2)
+        
+        if 'aciklamalar' in uygunluk:
+            for aciklama in uygunluk['aciklamalar']:
+                if pdf.get_y() > 175:
+                    pdf.add_page()
+                try:
+                    pdf.multi_cell(0, 4, '- ' + aciklama, border=0)
+                except:
+                    pdf.add_page()
+                    pdf.multi_cell(0, 4, '- ' + aciklama, border=0)
+        pdf.ln(2)
+        
+        if 'olcum_belirsizligi_aciklama' in uygunluk:
+            if pdf.get_y() > 175:
+                pdf.add_page()
+            try:
+                pdf.multi_cell(0, 4, uygunluk['olcum_belirsizligi_aciklama'], border=0)
+            except:
+                pdf.add_page()
+                pdf.multi_cell(0, 4, uygunluk['olcum_belirsizligi_aciklama'], border=0)
+        pdf.ln(1)
+    
+    # ONAY BİLGİLERİ
+    onay = cert.get('onay_bilgileri', {})
+    if onay:
+        pdf.ln(1)
+        pdf.set_font(font_name, 'B', 9)
+        
+        # İki sütun için
+        col_width = pdf.w / 2 - 20
+        
+        pdf.cell(col_width, 6, 'Kalibrasyonu Yapan:', border=0)
+        pdf.cell(col_width, 6, 'Onaylayan:', border=0, ln=True)
+        pdf.ln(1)
+        
+        pdf.set_font(font_name, '', 9)
+        yapan = onay.get('kalibrasyonu_yapan', {})
+        onaylayan = onay.get('onaylayan', {})
+        
+        pdf.cell(col_width, 6, yapan.get('isim', ''), border='T', align='C')
+        pdf.cell(col_width, 6, onaylayan.get('isim', ''), border='T', align='C', ln=True)
+        
+        pdf.cell(col_width, 5, yapan.get('unvan', ''), border=0, align='C')
+        pdf.cell(col_width, 5, onaylayan.get('unvan', ''), border=0, align='C', ln=True)
+        
+        if 'tarih' in onaylayan:
+            pdf.cell(col_width, 5, '', border=0)
+            pdf.cell(col_width, 5, f"Tarih: {onaylayan.get('tarih', '')}", border=0, align='C', ln=True)
+    
+    # Footer
+    pdf.ln(2)
+    pdf.set_font(font_name, '', 7)
+    pdf.set_text_color(100, 100, 100)
+    standartlar = cert.get('standartlar', {})
+    if standartlar:
+        pdf.multi_cell(0, 3, f"Bu sertifika {standartlar.get('akreditasyon_standardi', '')} standardına göre düzenlenmiştir.", align='C')
+
+    return bytes(pdf.output())
+
+
+def start_pool(workers: int = PDF_WORKERS) -> ProcessPoolExecutor:
+    """Process pool'u oluştur ve tüm worker'ları önceden başlat"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        # Worker'lar ilk istekte değil, açılışta ayağa kalksın
+        for future in [_pool.submit(_warm_worker) for _ in range(workers)]:
+            future.result()
+    return _pool
+
+
+def shutdown_pool():
+    """Process pool'u kapat"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def certificate_key(cert: dict) -> str:
+    """Sertifikanın içerik adresi (önbellek anahtarı ve dosya adı için)"""
+    return cache_key(cert, TEMPLATE_VERSION)
+
+
+async def _get_pool() -> ProcessPoolExecutor:
+    """Pool açılışta başlatılmadıysa ilk render'da tek sefer başlat"""
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        return _pool or await asyncio.to_thread(start_pool)
+
+
+async def _render(cert: dict, key: str) -> bytes:
+    pool = await _get_pool()
+    pdf_bytes = await asyncio.get_running_loop().run_in_executor(pool, render_kalibrasyon_pdf, cert)
+    render_cache.put(key, pdf_bytes)
+    return pdf_bytes
+
+
+def _render_bitti(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Bekleyen kalmadıysa "exception never retrieved" uyarısı çıkmasın
+    if not task.cancelled():
+        task.exception()
+
+
+async def render_kalibrasyon_pdf_async(cert: dict, key: Optional[str] = None) -> bytes:
+    """Sertifikayı event loop'u bloklamadan process pool'da render et (önbellekli)"""
+    key = key or certificate_key(cert)
+    cached = render_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Render kendi task'ında çalışır; bekleyenlerden biri iptal edilirse diğerleri etkilenmez
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_render(cert, key))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _render_bitti(key, t))
+    return await asyncio.shield(task)
@@ -0,0 +1,250 @@
+"""
+Sesli sertifika hattı - ses kaydı (ve isteğe bağlı fotoğraflar) tek istekte
+transkripsiyon, taslak çıkarma, görsel analiz, uygunluk, kayıt ve PDF aşamalarından geçer.
+Aşama süreleri ölçülür; birbirinden bağımsız aşamalar eşzamanlı çalışır.
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from new_models import CihazTipiEnum
+from uncertainty import sayi_oku
+
+# Dış çap tablosundaki ölçüm konumları (taslak anahtarı -> OlcumItem.tip)
+_DIS_CAP_KONUMLARI = [("ic_mm", "ic"), ("orta_mm", "orta"), ("dis_mm", "dis")]
+# Taslaktaki ölçüm listesi -> (KalibrasyonSertifikasiData listesi, OlcumItem.tip)
+_OLCUM_LISTELERI = [
+    ("ic_cap_olcumleri", "icCapOlcumleri", "ic"),
+    ("derinlik_olcumleri", "derinlikOlcumleri", "derinlik"),
+    ("kademe_olcumleri", "kademeOlcumleri", "kademe"),
+]
+# Cihaz adı eşleştirmesinde Türkçe karakterler ASCII karşılıklarına indirgenir
+_ASCII = str.maketrans("çğıöşü", "cgiosu")
+
+
+class StageTimer:
+    """Aşama sürelerini (ms) ve sonuç durumlarını toplar"""
+
+    def __init__(self):
+        self._baslangic = time.perf_counter()
+        self.asamalar: List[dict] = []
+
+    @asynccontextmanager
+    async def asama(self, ad: str):
+        kayit = {"ad": ad, "baslangic_ms": self._ms(self._baslangic), "durum": "tamam"}
+        bas = time.perf_counter()
+        try:
+            yield kayit
+        except BaseException:
+            kayit["durum"] = "hata"
+            raise
+        finally:
+            kayit["sure_ms"] = self._ms(bas)
+            self.asamalar.append(kayit)
+
+    def atla(self, ad: str):
+        self.asamalar.append({"ad": ad, "durum": "atlandi"})
+
+    def toplam_ms(self) -> float:
+        return self._ms(self._baslangic)
+
+    @staticmethod
+    def _ms(bas: float) -> float:
+        return round((time.perf_counter() - bas) * 1000, 1)
+
+
+def _olcum(tip: str, referans, olculen, sapma, belirsizlik) -> Optional[dict]:
+    referans, olculen = sayi_oku(referans), sayi_oku(olculen)
+    if referans is None or olculen is None:
+        return None
+    sapma = sayi_oku(sapma)
+    return {
+        "tip": tip,
+        "referansDeger": referans,
+        "olculenDeger": olculen,
+        "sapma": round(olculen - referans, 6) if sapma is None else sapma,
+        "belirsizlik": sayi_oku(belirsizlik) or 0.0,
+    }
+
+
+def taslaktan_sertifika(taslak: dict, sonuc: bool = True, notlar: Optional[list] = None) -> dict:
+    """
+    generate_report taslağını (snake_case, kalibrasyon_sertifikasi içeriği)
+    save-report'un beklediği KalibrasyonSertifikasiData (camelCase) formatına çevir.
+    Referans veya ölçülen değeri okunamayan noktalar atlanır.
+    """
+    sert = taslak.get("sertifika_bilgileri") or {}
+    musteri = taslak.get("musteri_bilgileri") or {}
+    cihaz = taslak.get("cihaz_bilgileri") or {}
+    detay = taslak.get("kalibrasyon_detaylari") or {}
+    cevre = detay.get("cevre_sartlari") or {}
+    olcumler = taslak.get("olcum_sonuclari") or {}
+    uygunluk = taslak.get("uygunluk_degerlendirmesi") or {}
+    onay = taslak.get("onay_bilgileri") or {}
+
+    dis_cap = []
+    for olcum in olcumler.get("dis_cap_olcumleri") or []:
+        olculen, sapma = olcum.get("olculen_deger") or {}, olcum.get("sapma") or {}
+        for anahtar, tip in _DIS_CAP_KONUMLARI:
+            nokta = _olcum(tip, olcum.get("referans_deger_mm"), olculen.get(anahtar),
+                           sapma.get(anahtar), olcum.get("olcum_belirsizligi_mm"))
+            if nokta:
+                dis_cap.append(nokta)
+
+    olcum_sonuclari = {"disCapOlcumleri": dis_cap, "paralellikOlcumleri": []}
+    for kaynak, hedef, tip in _OLCUM_LISTELERI:
+        olcum_sonuclari[hedef] = [
+            nokta for olcum in olcumler.get(kaynak) or []
+            if (nokta := _olcum(tip, olcum.get("referans_deger_mm"), olcum.get("olculen_deger_mm"),
+                                olcum.get("sapma_mm"), olcum.get("olcum_belirsizligi_mm")))
+        ]
+
+    def personel(kisi) -> List[dict]:
+        return [{"adSoyad": kisi.get("isim", ""), "unvan": kisi.get("unvan", "")}] if kisi else []
+
+    return {
+        "sertifikaNo": sert.get("sertifika_no", ""),
+        "genelBilgiler": {
+            "musteriAdi": musteri.get("sahibi", ""),
+            "musteriAdres": musteri.get("adres", ""),
+            "istekNo": musteri.get("istek_numarasi"),
+        },
+        "cihazBilgileri": {
+            "cihazAdi": cihaz.get("makine_cihaz", ""),
+            "marka": cihaz.get("imalatci", ""),
+            "model": cihaz.get("tip", ""),
+            "seriNo": cihaz.get("seri_numarasi", ""),
+            "olcmeAraligi": cihaz.get("olcme_araligi", ""),
+            "cozunurluk": cihaz.get("cozunurluk", ""),
+        },
+        "kalibrasyonBilgileri": {
+            "kalibrasyonTarihi": cihaz.get("kalibrasyon_tarihi") or sert.get("tarih", ""),
+            "ortamKosullari": {"sicaklik": cevre.get("sicaklik", ""), "nem": cevre.get("bagil_nem", "")},
+            "referansCihazlar": taslak.get("referans_cihazlar") or [],
+        },
+        "olcumSonuclari": olcum_sonuclari,
+        "uygunlukDegerlendirmesi": {"sonuc": sonuc, "aciklama": uygunluk.get("karar_kurali", "")},
+        "kalibrasyonuYapanlar": personel(onay.get("kalibrasyonu_yapan")),
+        "onaylayanlar": personel(onay.get("onaylayan")),
+        "laboratuvarBilgileri": {
+            "adresi": sert.get("adres", ""),
+            "iletisim": " / ".join(x for x in (sert.get("telefon"), sert.get("email")) if x),
+            "akreditasyonBilgisi": sert.get("akreditasyon_no", ""),
+        },
+        "notlar": list(uygunluk.get("aciklamalar") or []) + list(notlar or []),
+    }
+
+
+def _dis_cap_satirlari(olcumler: list) -> List[dict]:
+    """
+    Nokta başına dış çap ölçümlerini (tip: ic/orta/dis) PDF tablosundaki referans başına
+    satırlara topla. Tipi tanınmayan nokta dış ölçüm kabul edilir.
+    """
+    konumlar = {tip: anahtar for anahtar, tip in _DIS_CAP_KONUMLARI}
+    satirlar: List[dict] = []
+    for olcum in olcumler:
+        anahtar = konumlar.get(olcum.get("tip"), "dis_mm")
+        satir = satirlar[-1] if satirlar else None
+        if satir is None or satir["referans_deger_mm"] != olcum.get("referansDeger") or anahtar in satir["olculen_deger"]:
+            satir = {"referans_deger_mm": olcum.get("referansDeger"), "olculen_deger": {}, "sapma": {},
+                     "olcum_belirsizligi_mm": olcum.get("belirsizlik")}
+            satirlar.append(satir)
+        satir["olculen_deger"][anahtar] = olcum.get("olculenDeger")
+        satir["sapma"][anahtar] = olcum.get("sapma")
+        # Satırdaki noktalardan en büyük belirsizlik beyan edilir
+        belirsizlik = olcum.get("belirsizlik")
+        if belirsizlik is not None and (satir["olcum_belirsizligi_mm"] is None or belirsizlik > satir["olcum_belirsizligi_mm"]):
+            satir["olcum_belirsizligi_mm"] = belirsizlik
+    return satirlar
+
+
+def sertifikadan_pdf_verisi(sertifika: dict) -> dict:
+    """
+    KalibrasyonSertifikasiData (camelCase) verisini PDF render'ının okuduğu
+    kalibrasyon_sertifikasi (snake_case) formatına çevir - taslaktan_sertifika'nın tersi.
+    """
+    genel = sertifika.get("genelBilgiler") or {}
+    cihaz = sertifika.get("cihazBilgileri") or {}
+    kalibrasyon = sertifika.get("kalibrasyonBilgileri") or {}
+    ortam = kalibrasyon.get("ortamKosullari") or {}
+    olcumler = sertifika.get("olcumSonuclari") or {}
+    uygunluk = sertifika.get("uygunlukDegerlendirmesi") or {}
+    lab = sertifika.get("laboratuvarBilgileri") or {}
+
+    olcum_sonuclari = {}
+    if olcumler.get("disCapOlcumleri"):
+        olcum_sonuclari["dis_cap_olcumleri"] = _dis_cap_satirlari(olcumler["disCapOlcumleri"])
+    for hedef, kaynak, _ in _OLCUM_LISTELERI:
+        if olcumler.get(kaynak):
+            olcum_sonuclari[hedef] = [
+                {
+                    "referans_deger_mm": o.get("referansDeger"),
+                    "olculen_deger_mm": o.get("olculenDeger"),
+                    "sapma_mm": o.get("sapma"),
+                    "olcum_belirsizligi_mm": o.get("belirsizlik"),
+                }
+                for o in olcumler[kaynak]
+            ]
+
+    def kisi(liste) -> dict:
+        return {"isim": liste[0].get("adSoyad", ""), "unvan": liste[0].get("unvan", "")} if liste else {}
+
+    sonuc = uygunluk.get("sonuc")
+    karar = "UYGUNDUR" if sonuc else "UYGUN DEĞİLDİR" if sonuc is not None else ""
+    uygunluk_pdf = {
+        "karar_kurali": " - ".join(x for x in (karar, uygunluk.get("aciklama")) if x),
+        "aciklamalar": [str(n) for n in sertifika.get("notlar") or []],
+    }
+    if uygunluk.get("olcumBelirsizligiAciklama"):
+        uygunluk_pdf["olcum_belirsizligi_aciklama"] = uygunluk["olcumBelirsizligiAciklama"]
+
+    return {
+        "sertifika_bilgileri": {
+            "adres": lab.get("adresi", ""),
+            "email": lab.get("iletisim", ""),
+            "akreditasyon_no": lab.get("akreditasyonBilgisi", ""),
+            "sertifika_no": sertifika.get("sertifikaNo", ""),
+            "tarih": kalibrasyon.get("kalibrasyonTarihi", ""),
+        },
+        "musteri_bilgileri": {
+            "sahibi": genel.get("musteriAdi", ""),
+            "adres": genel.get("musteriAdres", ""),
+            "istek_numarasi": genel.get("istekNo") or "",
+        },
+        "cihaz_bilgileri": {
+            "makine_cihaz": cihaz.get("cihazAdi", ""),
+            "imalatci": cihaz.get("marka", ""),
+            "tip": cihaz.get("model", ""),
+            "seri_numarasi": cihaz.get("seriNo", ""),
+            "kalibrasyon_tarihi": kalibrasyon.get("kalibrasyonTarihi", ""),
+            "olcme_araligi": cihaz.get("olcmeAraligi", ""),
+            "cozunurluk": cihaz.get("cozunurluk", ""),
+        },
+        "kalibrasyon_detaylari": {
+            "cevre_sartlari": {"sicaklik": ortam.get("sicaklik", ""), "bagil_nem": ortam.get("nem", "")},
+        },
+        "olcum_sonuclari": olcum_sonuclari,
+        "uygunluk_degerlendirmesi": uygunluk_pdf,
+        "onay_bilgileri": {
+            "kalibrasyonu_yapan": kisi(sertifika.get("kalibrasyonuYapanlar")),
+            "onaylayan": kisi(sertifika.get("onaylayanlar")),
+        },
+    }
+
+
+def uygunluk_noktalari(sertifika: dict) -> List[dict]:
+    """KalibrasyonSertifikasiData ölçümlerini conformity.evaluate nokta formatına çevir"""
+    return [
+        {"nominal": o["referansDeger"], "olculen": o["olculenDeger"], "belirsizlik": o["belirsizlik"]}
+        for liste in sertifika["olcumSonuclari"].values()
+        for o in liste
+    ]
+
+
+def cihaz_tipi_bul(cihaz_adi: Optional[str]) -> Optional[CihazTipiEnum]:
+    """Serbest metin cihaz adından ('KUMPAS', 'Dijital Mikrometre' vb.) cihaz tipini bul"""
+    ad = str(cihaz_adi or "").replace("İ", "i").replace("I", "ı").casefold().translate(_ASCII)
+    for tip in CihazTipiEnum:
+        if tip is not CihazTipiEnum.DIGER and tip.value.replace("_", " ") in ad:
+            return tip
+    return None
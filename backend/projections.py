@@ -0,0 +1,102 @@
+"""
+Rapor projeksiyonları - liste ve detay endpoint'leri ORM nesnesi oluşturmaz, sadece
+yanıtta dönecek kolonları okur (Row demetleri). Detayda ölçümler ayrı sorgu yerine
+aynı satırda jsonb_agg ile gelir, böylece tek round-trip yeterli olur.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+
+from models import KalibrasyonRaporu, OlcumSonucu
+
+R = KalibrasyonRaporu
+O = OlcumSonucu
+
+# Liste/arama yanıtındaki alanlar (fields= ile daraltılabilir)
+OZET_KOLONLARI = {
+    "id": R.id,
+    "sertifika_no": R.sertifika_no,
+    "musteri_adi": R.musteri_adi,
+    "cihaz_tipi": R.cihaz_tipi,
+    "kalibrasyon_tarihi": R.kalibrasyon_tarihi,
+    "durum": R.durum,
+    "uygunluk": R.uygunluk,
+    "created_at": R.created_at,
+}
+# Sayfalama imleci için her zaman okunan kolonlar
+_ZORUNLU_OZET = ("id", "created_at")
+
+# Detay yanıtında fields= ile seçilebilen büyük parçalar
+DETAY_PARCALARI = ("rapor_data", "olcumler")
+
+# Ölçüm satırının yanıttaki alanları
+_OLCUM_KOLONLARI = {
+    "olcum_tipi": O.olcum_tipi,
+    "alt_tip": O.alt_tip,
+    "referans_deger": O.referans_deger,
+    "olculen_deger": O.olculen_deger,
+    "sapma": O.sapma,
+    "belirsizlik": O.belirsizlik,
+}
+
+
+def ozet_kolonlari(alanlar: Optional[Sequence[str]] = None) -> list:
+    """İstenen özet alanlarının kolonları (alanlar None ise hepsi)"""
+    secili = OZET_KOLONLARI if alanlar is None else {
+        ad: kolon for ad, kolon in OZET_KOLONLARI.items() if ad in alanlar or ad in _ZORUNLU_OZET
+    }
+    return list(secili.values())
+
+
+def rapor_ozeti(row, alanlar: Optional[Sequence[str]] = None) -> dict:
+    ozet = {}
+    for ad in OZET_KOLONLARI if alanlar is None else [a for a in OZET_KOLONLARI if a in alanlar]:
+        deger = getattr(row, ad)
+        if ad == "kalibrasyon_tarihi":
+            deger = deger.strftime("%d.%m.%Y") if deger else None
+        elif ad == "created_at":
+            deger = deger.isoformat() if deger else None
+        ozet[ad] = deger
+    return ozet
+
+
+def alan_kolonlari(yollar: List[tuple]) -> list:
+    """Her yol için rapor_data #> '{...}' - belgenin sadece istenen parçası okunur"""
+    return [R.rapor_data[yol].label(f"alan_{i}") for i, yol in enumerate(yollar)]
+
+
+def alan_degerleri(row, yollar: List[tuple]) -> Dict[str, object]:
+    return {".".join(yol): getattr(row, f"alan_{i}") for i, yol in enumerate(yollar)}
+
+
+def olcumler_kolonu():
+    """Raporun ölçümleri tek JSONB dizisi olarak (ilişkili alt sorgu, id sırasıyla)"""
+    nesne = func.jsonb_build_object(
+        *(x for ad, kolon in _OLCUM_KOLONLARI.items() for x in (literal_column(f"'{ad}'"), kolon))
+    )
+    return (
+        select(func.coalesce(
+            func.jsonb_agg(aggregate_order_by(nesne, O.id)),
+            literal_column("'[]'::jsonb"),
+            type_=JSONB,
+        ))
+        .where(O.rapor_id == R.id)
+        .scalar_subquery()
+        .label("olcumler")
+    )
+
+
+def detay_sorgusu(rapor_id: int, parcalar: Sequence[str], yollar: List[tuple]):
+    """
+    Rapor detayı için tek sorgu. yollar verilirse rapor_data yerine sadece o alt yollar okunur;
+    parcalar'da olmayan rapor_data/olcumler hiç okunmaz.
+    """
+    kolonlar = [R.id, R.sertifika_no, R.pdf_path, R.created_at]
+    if yollar:
+        kolonlar += alan_kolonlari(yollar)
+    elif "rapor_data" in parcalar:
+        kolonlar.append(R.rapor_data)
+    if "olcumler" in parcalar:
+        kolonlar.append(olcumler_kolonu())
+    return select(*kolonlar).where(R.id == rapor_id)
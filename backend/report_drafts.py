@@ -0,0 +1,197 @@
+"""
+Rapor taslakları - generate_report için aynı transkripsiyon metni (normalize edilmiş)
+ve prompt versiyonu tekrar geldiğinde GPT'ye gidilmez. Aynı anda gelen özdeş istekler
+tek bir upstream çağrısını paylaşır (single-flight).
+Akış (SSE) modunda gelen JSON parça parça okunur, tamamlanan bölümler hemen yayınlanır.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Prompt şablonu değiştiğinde artırılmalı - eski taslaklar geçersiz olur
+REPORT_PROMPT_VERSION = "1"
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", "3600"))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "500"))
+
+
+def normalize_transcript(text: str) -> str:
+    """Anlamı değiştirmeyen farkları (Unicode biçimi, boşluklar) temizle"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def draft_key(text: str) -> str:
+    """Taslak anahtarı - prompt tarih içerdiği için gün de anahtarın parçası"""
+    payload = json.dumps(
+        [REPORT_PROMPT_VERSION, datetime.now().strftime("%Y%m%d"), normalize_transcript(text)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DraftCache:
+    """TTL'li LRU önbellek + eşzamanlı özdeş istekleri birleştirme"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get(self, key: str):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            self.evictions += 1
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: dict):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict):
+        self._put(key, value)
+
+    async def get_or_create(self, key: str, factory: Callable[[], Awaitable[dict]]) -> dict:
+        """Önbellekte varsa döndür; aynı anahtar için çağrı sürüyorsa onu bekle; yoksa üret.
+        Dönen sözlük önbellekle paylaşılır, değiştirilmemelidir."""
+        cached = self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Üretim kendi task'ında çalışır; ilk isteyen iptal edilse de bekleyenler sonucu alır
+            self.misses += 1
+            task = asyncio.create_task(self._create(key, factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._created(key, t))
+        return await asyncio.shield(task)
+
+    async def _create(self, key: str, factory: Callable[[], Awaitable[dict]]) -> dict:
+        # Hatalar önbelleğe alınmaz, bekleyenler de aynı hatayı alır
+        value = await factory()
+        self._put(key, value)
+        return value
+
+    def _created(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Bekleyen kalmadıysa "exception never retrieved" uyarısı çıkmasın
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        toplam = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._items),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "prompt_version": REPORT_PROMPT_VERSION,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / toplam, 3) if toplam else None,
+            "evictions": self.evictions,
+        }
+
+
+class SectionParser:
+    """
+    Artımlı JSON okuyucu - belirli derinlikteki nesnenin üyelerini, değeri kapandığı anda
+    (anahtar, değer) olarak verir. Rapor için derinlik 2: {"kalibrasyon_sertifikasi": {bölümler}}
+    """
+
+    def __init__(self, depth: int = 2):
+        self.target = depth
+        self._text = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Yeni metin parçasını işle, bu parçayla tamamlanan bölümleri döndür"""
+        start = len(self._text)
+        self._text += chunk
+        text = self._text
+        completed = []
+
+        for i in range(start, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == self.target and self._expect_key:
+                        self._key = json.loads(text[self._string_start:i + 1])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == self.target and ch == "{":
+                    self._expect_key = True
+            elif ch in "}]":
+                if self._depth == self.target:
+                    completed.extend(self._complete(text, i))
+                self._depth -= 1
+            elif self._depth == self.target:
+                if ch == ":":
+                    self._expect_key = False
+                    self._value_start = i + 1
+                elif ch == ",":
+                    completed.extend(self._complete(text, i))
+                    self._expect_key = True
+
+        return completed
+
+    def _complete(self, text: str, end: int) -> List[Tuple[str, Any]]:
+        if self._key is None or self._value_start is None:
+            return []
+        key, start = self._key, self._value_start
+        self._key = self._value_start = None
+        try:
+            return [(key, json.loads(text[start:end]))]
+        except ValueError:
+            return []
+
+
+draft_cache = DraftCache(REPORT_CACHE_TTL_SECONDS, REPORT_CACHE_MAX_ENTRIES)
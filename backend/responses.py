@@ -0,0 +1,37 @@
+"""
+Hızlı JSON yanıtları - uygulamanın varsayılan yanıt sınıfı orjson ile kodlar.
+datetime, Enum (DurumEnum, CihazTipiEnum), NumPy dizileri orjson'da doğrudan desteklenir;
+Decimal ve pydantic modelleri varsayılan dönüştürücüden geçer.
+
+Not: FastAPI, endpoint'in döndürdüğü dict'i yine de jsonable_encoder'dan geçirir.
+Büyük yanıt üreten endpoint'ler FastJSONResponse'u doğrudan döndürerek bu adımı da atlar.
+"""
+import decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj):
+    """orjson'un doğrudan kodlayamadığı tipler"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,156 @@
+"""
+Kalibrasyon standartları kataloğu - standart, şablon ve parametre tabloları
+process içinde bir kez yüklenir ve endeksli yapılardan sunulur.
+Veri sadece seed script'leri ile değiştiği için tablolar her istekte sorgulanmaz.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal
+from standards_models import CalibrasyonStandardi, StandardSablon, SablonParametre
+
+# Veritabanındaki sürüm damgasının kaç saniyede bir kontrol edileceği (0 = her istekte)
+STANDARDS_CATALOG_CHECK_SECONDS = float(os.getenv("STANDARDS_CATALOG_CHECK_SECONDS", "60"))
+
+
+class StandardsCatalog:
+    """Okuma anında yüklenen (read-through) standart kataloğu"""
+
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self.etag: Optional[str] = None
+        self.standartlar: dict = {"standartlar": []}
+        self.by_kod: Dict[str, dict] = {}
+        self.by_cihaz_tipi: Dict[str, dict] = {}
+        self.by_sablon_id: Dict[int, dict] = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    def invalidate(self):
+        """Bir sonraki istekte katalog yeniden yüklensin"""
+        self.etag = None
+        self._stamp = None
+
+    async def ensure_loaded(self):
+        """Katalog yüklü değilse ya da veritabanı sürüm damgası değiştiyse yeniden yükle"""
+        if self.etag and time.monotonic() - self._checked_at < self.check_seconds:
+            return
+        async with self._lock:
+            if self.etag and time.monotonic() - self._checked_at < self.check_seconds:
+                return
+            async with AsyncSessionLocal() as db:
+                stamp = await self._read_stamp(db)
+                if not self.etag or stamp != self._stamp:
+                    await self._load(db)
+                    self._stamp = stamp
+            self._checked_at = time.monotonic()
+
+    @staticmethod
+    async def _read_stamp(db) -> tuple:
+        """Seed script'leri sadece ekleme yaptığı için satır sayısı + en büyük id yeterli bir sürüm damgasıdır"""
+        kolonlar = []
+        for model in (CalibrasyonStandardi, StandardSablon, SablonParametre):
+            kolonlar.append(select(func.count(model.id)).scalar_subquery())
+            kolonlar.append(select(func.max(model.id)).scalar_subquery())
+        row = (await db.execute(select(*kolonlar))).one()
+        return tuple(row)
+
+    async def _load(self, db):
+        standartlar = (await db.execute(
+            select(CalibrasyonStandardi).order_by(CalibrasyonStandardi.kod)
+        )).scalars().all()
+        sablonlar = (await db.execute(
+            select(StandardSablon).order_by(StandardSablon.id)
+        )).scalars().all()
+        parametreler = (await db.execute(
+            select(SablonParametre).order_by(SablonParametre.id)
+        )).scalars().all()
+
+        standart_by_id = {s.id: s for s in standartlar}
+        sablon_sayisi: Dict[int, int] = {}
+        by_cihaz_tipi: Dict[str, list] = {}
+        for sablon in sablonlar:
+            sablon_sayisi[sablon.standart_id] = sablon_sayisi.get(sablon.standart_id, 0) + 1
+            standart = standart_by_id.get(sablon.standart_id)
+            if standart is None:
+                continue
+            by_cihaz_tipi.setdefault(sablon.cihaz_tipi_kodu, []).append({
+                "id": standart.id,
+                "standart_kod": standart.kod,
+                "standart_ad": standart.ad_tr,
+                "sablon_id": sablon.id,
+                "cihaz_tipi_adi": sablon.cihaz_tipi_adi,
+                "grup": sablon.grup
+            })
+
+        by_sablon_id: Dict[int, list] = {}
+        for p in parametreler:
+            by_sablon_id.setdefault(p.sablon_id, []).append({
+                "id": p.id,
+                "ad": p.parametre_adi,
+                "kod": p.parametre_kodu,
+                "birim": p.birim,
+                "tolerans_tipi": p.tolerans_tipi,
+                "tolerans_degeri": p.tolerans_degeri,
+                "test_noktalari": p.test_noktalari,
+                "zorunlu": p.zorunlu,
+                "referans": p.referans
+            })
+
+        standart_listesi = [
+            {
+                "id": s.id,
+                "kod": s.kod,
+                "ad_tr": s.ad_tr,
+                "ad_en": s.ad_en,
+                "organizasyon": s.organizasyon,
+                "yil": s.yil,
+                "sablon_sayisi": sablon_sayisi.get(s.id, 0)
+            }
+            for s in standartlar
+        ]
+
+        self.standartlar = {"standartlar": standart_listesi}
+        self.by_kod = {s["kod"]: s for s in standart_listesi}
+        self.by_cihaz_tipi = {k: {"standartlar": v} for k, v in by_cihaz_tipi.items()}
+        self.by_sablon_id = {k: {"parametreler": v} for k, v in by_sablon_id.items()}
+
+        # ETag tüm katalog içeriğinden türetilir - veri aynıysa yeniden yüklemede de aynı kalır
+        icerik = json.dumps(
+            [self.standartlar, by_cihaz_tipi, by_sablon_id],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        self.etag = '"' + hashlib.sha256(icerik.encode("utf-8")).hexdigest()[:32] + '"'
+        self.loads += 1
+        print(f"Standart kataloğu yüklendi: {len(standartlar)} standart, "
+              f"{len(sablonlar)} şablon, {len(parametreler)} parametre")
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """İstemcinin elindeki ETag güncel mi (If-None-Match)"""
+        if not if_none_match or not self.etag:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "etag": self.etag,
+            "yukleme_sayisi": self.loads,
+            "standart": len(self.by_kod),
+            "cihaz_tipi": len(self.by_cihaz_tipi),
+            "sablon": len(self.by_sablon_id),
+        }
+
+
+catalog = StandardsCatalog(STANDARDS_CATALOG_CHECK_SECONDS)
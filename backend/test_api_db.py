@@ -3,6 +3,7 @@ Veritabanı API endpoint'lerini test et
 """
 import requests
 import json
+import time
 from datetime import datetime
 
 # API base URL
@@ -91,16 +92,30 @@ def test_save_report():
         json=test_data
     )
     
-    if response.status_code == 200:
-        result = response.json()
+    if response.status_code != 202:
+        print(f"❌ Hata: {response.status_code}")
+        print(f"   {response.text}")
+        return None
+    
+    # Kayıt arka planda yapılıyor, iş bitene kadar durumu sorgula
+    job_id = response.json()['job_id']
+    print(f"   - İş kuyruğa alındı (ID: {job_id})")
+    for _ in range(60):
+        job = requests.get(f"{BASE_URL}/api/jobs/{job_id}").json()
+        if job['durum'] in ("tamamlandi", "hata"):
+            break
+        time.sleep(0.5)
+    
+    if job['durum'] == "tamamlandi":
+        result = job['sonuc']
         print(f"✅ Rapor başarıyla kaydedildi!")
         print(f"   - Rapor ID: {result['rapor_id']}")
         print(f"   - Sertifika No: {result['sertifika_no']}")
         print(f"   - PDF: {result['pdf_path']}")
         return result['rapor_id']
     else:
-        print(f"❌ Hata: {response.status_code}")
-        print(f"   {response.text}")
+        print(f"❌ İş tamamlanamadı: {job['durum']}")
+        print(f"   {job['hata']}")
         return None
 
 
@@ -0,0 +1,51 @@
+"""Ses segmentleme ve transkript birleştirme testleri (pytest)"""
+import asyncio
+
+import audio
+
+
+def test_kisa_kayit_tek_segment():
+    assert audio._segment_araliklari(120.0, 300.0, 2.0) == [(0.0, 120.0)]
+
+
+def test_segmentler_ortusur_ve_kaydi_kaplar():
+    araliklar = audio._segment_araliklari(700.0, 300.0, 2.0)
+    assert araliklar == [(0.0, 300.0), (298.0, 300.0), (596.0, 104.0)]
+    bas, uzunluk = araliklar[-1]
+    assert bas + uzunluk == 700.0
+
+
+def test_tam_kat_uzunlukta_bos_segment_olusmaz():
+    araliklar = audio._segment_araliklari(598.0, 300.0, 2.0)
+    assert araliklar == [(0.0, 300.0), (298.0, 300.0)]
+
+
+def test_ortusen_kelimeler_bir_kez_yazilir():
+    metin = audio.stitch([
+        "dış çap ölçümü yirmi beş milimetre",
+        "Yirmi beş, milimetre referans değer",
+    ])
+    assert metin == "dış çap ölçümü yirmi beş milimetre referans değer"
+
+
+def test_ortusme_yoksa_metinler_eklenir():
+    assert audio.stitch(["birinci parça", "ikinci parça"]) == "birinci parça ikinci parça"
+
+
+def test_bos_parcalar_atlanir():
+    assert audio.stitch(["", "tek parça", ""]) == "tek parça"
+
+
+def test_ortusme_siniri():
+    onceki = " ".join(f"k{i}" for i in range(10))
+    sonraki = " ".join(f"k{i}" for i in range(5, 10)) + " son"
+    assert audio.stitch([onceki, sonraki], max_ortusme=3) == onceki + " " + sonraki
+
+
+def test_transkript_sirasi_korunur():
+    async def transcribe(segment):
+        await asyncio.sleep(0.01 if segment == "a" else 0)
+        return segment.upper()
+
+    sonuc = asyncio.run(audio.transcribe_segments(["a", "b", "c"], transcribe, concurrency=2))
+    assert sonuc == ["A", "B", "C"]
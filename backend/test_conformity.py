@@ -0,0 +1,56 @@
+"""Uygunluk karar motoru testleri (pytest)"""
+import conformity
+
+PARAMETRELER = [
+    {"kod": "DIS", "tolerans_degeri": 0.03, "tolerans_tipi": "absolute", "test_noktalari": [0, 25, 50]},
+    {"kod": "IC", "tolerans_degeri": 0.1, "tolerans_tipi": "percentage", "test_noktalari": [100]},
+]
+
+
+def _nokta(nominal, olculen, belirsizlik=0.0, **ek):
+    return {"nominal": nominal, "olculen": olculen, "belirsizlik": belirsizlik, **ek}
+
+
+def test_koruma_bandi_kararlari():
+    olcumler = [
+        _nokta(25, 25.01, 0.01),   # 0.01 + 0.01 <= 0.03 -> uygun
+        _nokta(25, 25.025, 0.01),  # sınırda -> belirsiz
+        _nokta(50, 50.05, 0.01),   # 0.05 - 0.01 > 0.03 -> uygun_degil
+    ]
+    sonuc = conformity.evaluate([olcumler], [PARAMETRELER])[0]
+    assert [n["karar"] for n in sonuc["noktalar"]] == ["uygun", "belirsiz", "uygun_degil"]
+    assert sonuc["karar"] == "uygun_degil"
+    assert sonuc["uygunluk"] is False
+    assert sonuc["ozet"] == {"uygun": 1, "belirsiz": 1, "uygun_degil": 1, "degerlendirilemedi": 0}
+
+
+def test_yuzde_tolerans_ve_kod_eslestirme():
+    # 100 mm için %0,1 -> 0.1 mm; kod verilirse test noktasına bakılmaz
+    olcumler = [_nokta(100, 100.05), _nokta(7, 7.05, parametre_kodu="IC")]
+    noktalar = conformity.evaluate([olcumler], [PARAMETRELER])[0]["noktalar"]
+    assert noktalar[0]["parametre_kodu"] == "IC"
+    assert noktalar[0]["tolerans"] == 0.1
+    assert noktalar[0]["karar"] == "uygun"
+    assert abs(noktalar[1]["tolerans"] - 0.007) < 1e-12
+    assert noktalar[1]["karar"] == "uygun_degil"
+
+
+def test_eslesmeyen_ve_eksik_noktalar_degerlendirilemez():
+    olcumler = [_nokta(13, 13.0), _nokta(25, None), "gecersiz"]
+    sonuc = conformity.evaluate([olcumler], [PARAMETRELER])[0]
+    assert [n["karar"] for n in sonuc["noktalar"]] == ["degerlendirilemedi", "degerlendirilemedi"]
+    assert sonuc["karar"] == "degerlendirilemedi"
+    assert sonuc["uygunluk"] is None
+
+
+def test_birden_fazla_grup_ve_sablonsuz_grup():
+    gruplar = [[_nokta(0, 0.0)], [], [_nokta(25, 25.0)]]
+    sonuclar = conformity.evaluate(gruplar, [PARAMETRELER, PARAMETRELER, None], detay=False)
+    assert [s["karar"] for s in sonuclar] == ["uygun", "degerlendirilemedi", "degerlendirilemedi"]
+    assert all("noktalar" not in s for s in sonuclar)
+
+
+def test_koruma_bandi_sifir_basit_kabul():
+    olcumler = [[_nokta(25, 25.02, 0.02)]]
+    assert conformity.evaluate(olcumler, [PARAMETRELER])[0]["karar"] == "belirsiz"
+    assert conformity.evaluate(olcumler, [PARAMETRELER], guard_band=0.0)[0]["karar"] == "uygun"
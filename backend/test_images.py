@@ -0,0 +1,79 @@
+"""Görsel ön işleme ve çoklu fotoğraf analizi birleştirme testleri (pytest)"""
+import hashlib
+
+import pytest
+from PIL import Image, UnidentifiedImageError
+
+import images
+
+
+def test_cihaz_turu_cogunluk_oyuyla_secilir():
+    sonuc = images.merge_analyses([
+        {"cihaz_turu": "Kumpas"},
+        {"cihaz_turu": "Mikrometre"},
+        {"cihaz_turu": "kumpas "},
+        {},
+    ])
+    assert sonuc["cihaz_turu"] == "Kumpas"
+
+
+def test_turkce_buyuk_kucuk_harf_ve_noktalama_tekillestirilir():
+    sonuc = images.merge_analyses([
+        {"anomaliler": ["Çizik İzi var.", "Pas"]},
+        {"anomaliler": ["çizik izi var", "IŞIK yansıması"]},
+        {"anomaliler": "ışık yansıması!"},
+    ])
+    assert sonuc["anomaliler"] == ["Çizik İzi var.", "Pas", "IŞIK yansıması"]
+
+
+def test_ilk_gorulme_sirasi_korunur():
+    sonuc = images.merge_analyses([
+        {"oneriler": ["Temizle", "Kalibre et"]},
+        {"oneriler": ["Yağla", "temizle"]},
+    ])
+    assert sonuc["oneriler"] == ["Temizle", "Kalibre et", "Yağla"]
+
+
+def test_gosterge_degeri_tek_ise_liste_olmaz():
+    assert images.merge_analyses([
+        {"gosterge_deger": "12,50 mm"}, {"gosterge_deger": "12,50 MM"},
+    ])["gosterge_deger"] == "12,50 mm"
+    assert images.merge_analyses([
+        {"gosterge_deger": "12,50"}, {"gosterge_deger": "12,52"},
+    ])["gosterge_deger"] == ["12,50", "12,52"]
+
+
+def test_bos_analizler():
+    assert images.merge_analyses([{}, {}]) == {
+        "cihaz_turu": None,
+        "gorsel_durum": None,
+        "gosterge_deger": None,
+        "anomaliler": [],
+        "oneriler": [],
+    }
+
+
+def _yukleme(tmp_path, icerik: bytes):
+    path = tmp_path / "upload_test.tmp"
+    path.write_bytes(icerik)
+    return path, hashlib.sha256(icerik).hexdigest()
+
+
+def test_orijinal_taninan_formatin_uzantisiyla_saklanir(tmp_path):
+    png = tmp_path / "kaynak.png"
+    Image.new("RGB", (2000, 1000), "white").save(png)
+    path, sha = _yukleme(tmp_path, png.read_bytes())
+
+    hazir = images._prepare(path, sha)
+    assert hazir.orijinal == f"image_{sha[:24]}.png"
+    assert (tmp_path / hazir.orijinal).exists()
+    assert (tmp_path / hazir.kucuk_resim).exists()
+    assert not path.exists()
+    assert max(hazir.genislik, hazir.yukseklik) == images.IMAGE_MAX_EDGE
+
+
+def test_gorsel_olmayan_icerik_reddedilir(tmp_path):
+    path, sha = _yukleme(tmp_path, b"<html><script>alert(1)</script></html>")
+    with pytest.raises(UnidentifiedImageError):
+        images._prepare(path, sha)
+    assert not list(tmp_path.glob("image_*"))
@@ -0,0 +1,215 @@
+"""Arka plan iş kuyruğu testleri (pytest) - Postgres yerine SQLite (aiosqlite) üzerinde"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import jobs
+from jobs import JobPermanentError, JobQueue, JobQueueFull
+from models import RaporIsi
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def calistir(tmp_path, monkeypatch):
+    """Senaryoyu boş rapor_isleri tablosu olan geçici bir SQLite veritabanıyla çalıştır"""
+    monkeypatch.setattr(jobs, "JOB_RETRY_DELAY", 0)
+
+    def calistir_(senaryo):
+        async def ana():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(RaporIsi.__table__.create)
+            Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            monkeypatch.setattr(jobs, "AsyncSessionLocal", Session)
+            try:
+                return await senaryo(Session)
+            finally:
+                await engine.dispose()
+        return asyncio.run(ana())
+
+    return calistir_
+
+
+async def _bitene_kadar(Session, job_id: int) -> RaporIsi:
+    for _ in range(200):
+        async with Session() as db:
+            job = await db.get(RaporIsi, job_id)
+            if job.durum in ("tamamlandi", "hata"):
+                return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"İş #{job_id} bitmedi")
+
+
+def test_hata_sonrasi_tekrar_denenir_ve_tamamlanir(calistir):
+    cagrilar = []
+
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=2, max_size=10)
+
+        @kuyruk.handler("deneme")
+        async def handler(payload):
+            cagrilar.append(payload)
+            if len(cagrilar) == 1:
+                raise RuntimeError("geçici hata")
+            return {"tamam": payload["n"]}
+
+        await kuyruk.start()
+        try:
+            job_id = await kuyruk.enqueue("deneme", {"n": 1})
+            return await _bitene_kadar(Session, job_id)
+        finally:
+            await kuyruk.stop()
+
+    job = calistir(senaryo)
+    assert len(cagrilar) == 2
+    assert (job.durum, job.deneme, job.sonuc, job.hata) == ("tamamlandi", 2, {"tamam": 1}, None)
+
+
+def test_kalici_hata_tekrar_denenmez(calistir):
+    cagrilar = []
+
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=1, max_size=10)
+
+        @kuyruk.handler("deneme")
+        async def handler(payload):
+            cagrilar.append(payload)
+            raise JobPermanentError("geçersiz veri")
+
+        await kuyruk.start()
+        try:
+            job_id = await kuyruk.enqueue("deneme", {})
+            job = await _bitene_kadar(Session, job_id)
+            await asyncio.sleep(0.05)
+            return job
+        finally:
+            await kuyruk.stop()
+
+    job = calistir(senaryo)
+    assert len(cagrilar) == 1
+    assert (job.durum, job.deneme, job.hata) == ("hata", 1, "geçersiz veri")
+
+
+def test_deneme_hakki_bitince_hataya_duser(calistir, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ATTEMPTS", 2)
+
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=1, max_size=10)
+
+        @kuyruk.handler("deneme")
+        async def handler(payload):
+            raise RuntimeError("hep hata")
+
+        await kuyruk.start()
+        try:
+            return await _bitene_kadar(Session, await kuyruk.enqueue("deneme", {}))
+        finally:
+            await kuyruk.stop()
+
+    job = calistir(senaryo)
+    assert (job.durum, job.deneme) == ("hata", 2)
+
+
+def test_is_ayni_anda_yalnizca_bir_kez_calisir(calistir):
+    cagrilar = []
+
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=1, max_size=10)
+
+        @kuyruk.handler("deneme")
+        async def handler(payload):
+            cagrilar.append(payload)
+            await asyncio.sleep(0.01)
+            return {}
+
+        async with Session() as db:
+            job = RaporIsi(tur="deneme", durum="bekliyor", payload={}, deneme=0)
+            db.add(job)
+            await db.commit()
+        # Aynı iş iki kez kuyruğa düşmüş gibi (ör. iki process'in kurtarması)
+        await asyncio.gather(kuyruk._run(job.id), kuyruk._run(job.id))
+        return await _bitene_kadar(Session, job.id)
+
+    job = calistir(senaryo)
+    assert len(cagrilar) == 1
+    assert (job.durum, job.deneme) == ("tamamlandi", 1)
+
+
+def test_kirasi_dolan_is_kurtarilir_calisan_ise_dokunulmaz(calistir):
+    cagrilar = []
+
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=1, max_size=10)
+
+        @kuyruk.handler("deneme")
+        async def handler(payload):
+            cagrilar.append(payload["ad"])
+            return {}
+
+        simdi = datetime.now(timezone.utc)
+        async with Session() as db:
+            eski = RaporIsi(tur="deneme", durum="calisiyor", payload={"ad": "eski"}, deneme=1,
+                            updated_at=simdi - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 60))
+            taze = RaporIsi(tur="deneme", durum="calisiyor", payload={"ad": "taze"}, deneme=1,
+                            updated_at=simdi)
+            bekleyen = RaporIsi(tur="deneme", durum="bekliyor", payload={"ad": "bekleyen"}, deneme=0)
+            db.add_all([eski, taze, bekleyen])
+            await db.commit()
+
+        await kuyruk.start()
+        try:
+            eski_son = await _bitene_kadar(Session, eski.id)
+            await _bitene_kadar(Session, bekleyen.id)
+            async with Session() as db:
+                taze_son = await db.get(RaporIsi, taze.id)
+            return eski_son, taze_son
+        finally:
+            await kuyruk.stop()
+
+    eski, taze = calistir(senaryo)
+    assert sorted(cagrilar) == ["bekleyen", "eski"]
+    assert (eski.durum, eski.deneme) == ("tamamlandi", 2)
+    assert (taze.durum, taze.deneme) == ("calisiyor", 1)
+
+
+def test_is_cagiranin_transactioninda_yazilir(calistir):
+    async def senaryo(Session):
+        kuyruk = JobQueue(workers=1, max_size=1)
+        kuyruk.handler("deneme")(lambda payload: None)
+        kuyruk._queue = asyncio.Queue(maxsize=1)
+
+        async with Session() as db:
+            db.add(RaporIsi(tur="kayit", durum="tamamlandi", payload={}))
+            await kuyruk.enqueue("deneme", {"n": 1}, db=db)
+
+        # Kuyruk doluyken iş reddedilir, oturumdaki değişiklik de yazılmaz
+        async with Session() as db:
+            db.add(RaporIsi(tur="kayit", durum="tamamlandi", payload={"yazilmamali": True}))
+            with pytest.raises(JobQueueFull):
+                await kuyruk.enqueue("deneme", {"n": 2}, db=db)
+
+        async with Session() as db:
+            return (await db.execute(select(RaporIsi.tur, RaporIsi.payload).order_by(RaporIsi.id))).all()
+
+    assert calistir(senaryo) == [("kayit", {}), ("deneme", {"n": 1})]
+
+
+def test_kuyruk_doluyken_503(monkeypatch):
+    import main
+
+    dolu = JobQueue(workers=1, max_size=1)
+    dolu._queue = asyncio.Queue(maxsize=1)
+    dolu._queue.put_nowait(1)
+    monkeypatch.setattr(dolu, "_handlers", main.job_queue._handlers)
+    monkeypatch.setattr(main, "job_queue", dolu)
+
+    client = TestClient(main.app)
+    response = client.post("/api/kalibrasyonlar", json={})
+    assert response.status_code == 503
+    assert "kuyruğu dolu" in response.json()["detail"]
@@ -0,0 +1,121 @@
+"""Sertifika PDF önbelleği ve disk temizliği testleri (pytest)"""
+import asyncio
+import os
+import time
+
+import pdf_cache
+from pdf_cache import PdfCache
+
+
+def test_anahtar_sozluk_sirasindan_bagimsiz():
+    a = {"sertifika_no": "KAL-1", "olcumler": [{"nominal": 10.0, "olculen": 10.02}]}
+    b = {"olcumler": [{"olculen": 10.02, "nominal": 10.0}], "sertifika_no": "KAL-1"}
+    assert pdf_cache.cache_key(a, "1") == pdf_cache.cache_key(b, "1")
+
+
+def test_ayni_sayi_ayni_anahtar():
+    # Metinden okunan ya da hesaplanan aynı float değeri aynı anahtarı verir
+    assert pdf_cache.cache_key({"u": float("0.030")}, "1") == pdf_cache.cache_key({"u": 0.03}, "1")
+    assert pdf_cache.cache_key({"u": 0.1 + 0.2}, "1") != pdf_cache.cache_key({"u": 0.3}, "1")
+
+
+def test_icerik_ve_sablon_farki_anahtari_degistirir():
+    cert = {"musteri": "ACME", "olculen": 10.02}
+    anahtar = pdf_cache.cache_key(cert, "1")
+    assert pdf_cache.cache_key(cert, "2") != anahtar
+    assert pdf_cache.cache_key({**cert, "olculen": 10.03}, "1") != anahtar
+    # Değerler değiştirilmeden hash'lenir - PDF'e basılan boşluk farkı da farklı sertifikadır
+    assert pdf_cache.cache_key({**cert, "musteri": "ACME "}, "1") != anahtar
+
+
+def test_lru_adet_butcesi():
+    cache = PdfCache(max_bytes=1000, max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"  # a en son kullanılan olur
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_bayt_butcesi():
+    cache = PdfCache(max_bytes=10, max_entries=100)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("a", b"x" * 5)  # aynı anahtar - boyut yeniden hesaplanır, tahliye yok
+    assert cache.stats()["bytes"] == 9 and cache.stats()["evictions"] == 0
+    cache.put("c", b"x" * 4)
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 9
+
+
+def test_butceden_buyuk_pdf_onbellegi_bosaltmaz():
+    cache = PdfCache(max_bytes=10, max_entries=100)
+    cache.put("a", b"x" * 5)
+    cache.put("dev", b"x" * 11)
+    assert cache.get("dev") is None
+    assert cache.get("a") == b"x" * 5
+
+
+def _dosya(directory, ad, boyut, yas):
+    path = directory / ad
+    path.write_bytes(b"x" * boyut)
+    zaman = time.time() - yas
+    os.utime(path, (zaman, zaman))
+    return path
+
+
+def test_budama_kayitli_ve_yeni_dosyalara_dokunmaz(tmp_path):
+    en_eski = _dosya(tmp_path, "kalibrasyon_sertifikasi_a.pdf", 100, 9000)
+    kayitli = _dosya(tmp_path, "kalibrasyon_sertifikasi_b.pdf", 100, 8000)
+    eski = _dosya(tmp_path, "kalibrasyon_sertifikasi_c.pdf", 100, 7000)
+    yeni = _dosya(tmp_path, "kalibrasyon_sertifikasi_d.pdf", 100, 10)
+    baska = _dosya(tmp_path, "image_abc.jpg", 1000, 9000)
+
+    sonuc = pdf_cache.prune_disk(tmp_path, [str(kayitli), None], max_bytes=150, min_age=3600)
+
+    assert not en_eski.exists() and not eski.exists()
+    assert kayitli.exists() and yeni.exists() and baska.exists()
+    assert sonuc == {"removed": 2, "removed_bytes": 200, "bytes": 200, "max_bytes": 150}
+
+
+def test_budama_butce_altinda_dosya_silmez(tmp_path):
+    eski = _dosya(tmp_path, "kalibrasyon_sertifikasi_a.pdf", 100, 5000)
+    sonuc = pdf_cache.prune_disk(tmp_path, [], max_bytes=1000, min_age=0)
+    assert eski.exists() and sonuc["removed"] == 0
+    assert pdf_cache.disk_stats(tmp_path)["files"] == 1
+
+
+def test_pdf_yazilinca_disk_butcesi_uygulanir(tmp_path, monkeypatch):
+    import main
+
+    kayitli = _dosya(tmp_path, "kalibrasyon_sertifikasi_a.pdf", 1024 * 1024, 9000)
+    eski = _dosya(tmp_path, "kalibrasyon_sertifikasi_b.pdf", 1024 * 1024, 8000)
+
+    async def referanslar(db):
+        return [kayitli.name]
+
+    class Oturum:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            pass
+
+    monkeypatch.setattr(main, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(main, "AsyncSessionLocal", Oturum)
+    monkeypatch.setattr(main, "_pdf_referanslari", referanslar)
+    monkeypatch.setattr(main, "_son_disk_kontrolu", 0.0)
+    monkeypatch.setattr(pdf_cache, "PDF_DISK_MAX_MB", 1)
+
+    async def calistir():
+        main._disk_temizligi_planla()
+        ilk = main._disk_temizligi
+        main._disk_temizligi_planla()  # aralık dolmadan ikinci kontrol başlamaz
+        assert main._disk_temizligi is ilk
+        return await ilk
+
+    sonuc = asyncio.run(calistir())
+    assert sonuc["removed"] == 1
+    assert kayitli.exists() and not eski.exists()
@@ -0,0 +1,92 @@
+"""Sesli sertifika hattı format dönüşümü testleri (pytest)"""
+import json
+from pathlib import Path
+
+import pytest
+
+import pipeline
+from new_models import CihazTipiEnum
+
+TASLAK = json.loads(
+    (Path(__file__).parent / "test_kalibrasyon.json").read_text(encoding="utf-8")
+)["kalibrasyon_sertifikasi"]
+
+
+def _dolu_dis_cap_noktalari():
+    return [
+        (olcum["referans_deger_mm"], tip)
+        for olcum in TASLAK["olcum_sonuclari"]["dis_cap_olcumleri"]
+        for anahtar, tip in pipeline._DIS_CAP_KONUMLARI
+        if olcum["olculen_deger"][anahtar] is not None
+    ]
+
+
+def test_taslak_olcumleri_camelcase_noktalara_cevrilir():
+    sertifika = pipeline.taslaktan_sertifika(TASLAK, notlar=["ek not"])
+    dis_cap = sertifika["olcumSonuclari"]["disCapOlcumleri"]
+    # Okunamayan (null) konumlar atlanır, kalanlar ic/orta/dis tipiyle gelir
+    assert [(o["referansDeger"], o["tip"]) for o in dis_cap] == _dolu_dis_cap_noktalari()
+    assert sertifika["olcumSonuclari"]["icCapOlcumleri"] == [
+        {"tip": "ic", "referansDeger": 20.0, "olculenDeger": 20.02, "sapma": 0.02, "belirsizlik": 0.03}
+    ]
+    assert sertifika["cihazBilgileri"]["cozunurluk"] == "0,02 mm"
+    assert sertifika["kalibrasyonuYapanlar"] == [{"adSoyad": "Mutlu YAVUZ", "unvan": "Kalibrasyon Personeli"}]
+    assert sertifika["notlar"][-1] == "ek not"
+    assert len(sertifika["notlar"]) == len(TASLAK["uygunluk_degerlendirmesi"]["aciklamalar"]) + 1
+
+
+def test_okunamayan_deger_atlanir_sapma_hesaplanir():
+    taslak = {"olcum_sonuclari": {"ic_cap_olcumleri": [
+        {"referans_deger_mm": "10,00", "olculen_deger_mm": "10,02 mm"},
+        {"referans_deger_mm": 20, "olculen_deger_mm": "okunamadı"},
+    ]}}
+    noktalar = pipeline.taslaktan_sertifika(taslak)["olcumSonuclari"]["icCapOlcumleri"]
+    assert noktalar == [
+        {"tip": "ic", "referansDeger": 10.0, "olculenDeger": 10.02, "sapma": 0.02, "belirsizlik": 0.0}
+    ]
+
+
+def test_pdf_verisi_dis_cap_satirlarini_yeniden_kurar():
+    pdf = pipeline.sertifikadan_pdf_verisi(pipeline.taslaktan_sertifika(TASLAK))
+    satirlar = pdf["olcum_sonuclari"]["dis_cap_olcumleri"]
+    kaynak = TASLAK["olcum_sonuclari"]["dis_cap_olcumleri"]
+    assert [s["referans_deger_mm"] for s in satirlar] == [o["referans_deger_mm"] for o in kaynak]
+    for satir, olcum in zip(satirlar, kaynak):
+        dolu = {k: v for k, v in olcum["olculen_deger"].items() if v is not None}
+        assert satir["olculen_deger"] == dolu
+    assert pdf["olcum_sonuclari"]["ic_cap_olcumleri"][0]["olculen_deger_mm"] == 20.02
+    assert pdf["cihaz_bilgileri"]["seri_numarasi"] == TASLAK["cihaz_bilgileri"]["seri_numarasi"]
+    assert pdf["onay_bilgileri"]["onaylayan"]["isim"] == "Abdullah ÖZTÜRK"
+    assert pdf["uygunluk_degerlendirmesi"]["karar_kurali"].startswith("UYGUNDUR - ")
+
+
+def test_dis_cap_satirinda_en_buyuk_belirsizlik_beyan_edilir():
+    satirlar = pipeline._dis_cap_satirlari([
+        {"tip": "ic", "referansDeger": 10.0, "olculenDeger": 10.0, "sapma": 0.0, "belirsizlik": 0.01},
+        {"tip": "dis", "referansDeger": 10.0, "olculenDeger": 10.01, "sapma": 0.01, "belirsizlik": 0.02},
+        {"tip": "ic", "referansDeger": 10.0, "olculenDeger": 10.0, "sapma": 0.0, "belirsizlik": 0.01},
+    ])
+    # Aynı konum tekrar edince yeni satır açılır
+    assert len(satirlar) == 2
+    assert satirlar[0]["olculen_deger"] == {"ic_mm": 10.0, "dis_mm": 10.01}
+    assert satirlar[0]["olcum_belirsizligi_mm"] == 0.02
+
+
+def test_uygunluk_noktalari_tum_listeleri_kapsar():
+    sertifika = pipeline.taslaktan_sertifika(TASLAK)
+    noktalar = pipeline.uygunluk_noktalari(sertifika)
+    assert len(noktalar) == sum(len(v) for v in sertifika["olcumSonuclari"].values())
+    assert {"nominal": 20.0, "olculen": 20.02, "belirsizlik": 0.03} in noktalar
+
+
+@pytest.mark.parametrize("ad, tip", [
+    ("KUMPAS", CihazTipiEnum.KUMPAS),
+    ("Dijital Mikrometre", CihazTipiEnum.MIKROMETRE),
+    ("DİJİTAL MİKROMETRE", CihazTipiEnum.MIKROMETRE),
+    ("Basınç Transmitteri", CihazTipiEnum.BASINC_TRANSMITTERI),
+    ("Sıcaklık Ölçer", CihazTipiEnum.SICAKLIK_OLCER),
+    ("Mastar", None),
+    (None, None),
+])
+def test_cihaz_tipi_bul(ad, tip):
+    assert pipeline.cihaz_tipi_bul(ad) is tip
@@ -0,0 +1,142 @@
+"""Rapor taslağı önbelleği ve artımlı bölüm okuyucu testleri (pytest)"""
+import asyncio
+import json
+
+import pytest
+
+import report_drafts
+from report_drafts import DraftCache, SectionParser
+
+RAPOR = {
+    "kalibrasyon_sertifikasi": {
+        "sertifika_bilgileri": {"sertifika_no": "KAL-001", "not": "iç \"tırnak\" ve {süslü} [köşeli]"},
+        "olcum_sonuclari": {"ic_cap_olcumleri": [{"referans_deger_mm": 10, "olculen_deger_mm": 10.01}]},
+        "onay_bilgileri": {"onaylayan": "A\\B, C"},
+    }
+}
+
+
+def _parcala(metin, boyut):
+    return [metin[i:i + boyut] for i in range(0, len(metin), boyut)]
+
+
+@pytest.mark.parametrize("boyut", [1, 3, 7, 1000])
+def test_bolumler_kapandikca_verilir(boyut):
+    metin = json.dumps(RAPOR, ensure_ascii=False, indent=2)
+    parser = SectionParser(depth=2)
+    bolumler = []
+    for parca in _parcala(metin, boyut):
+        bolumler.extend(parser.feed(parca))
+    assert bolumler == list(RAPOR["kalibrasyon_sertifikasi"].items())
+
+
+def test_bolum_kapanmadan_verilmez():
+    parser = SectionParser(depth=2)
+    assert parser.feed('{"kalibrasyon_sertifikasi": {"a": {"x": 1') == []
+    assert parser.feed('}, "b": [1, 2') == [("a", {"x": 1})]
+    assert parser.feed("]}}") == [("b", [1, 2])]
+
+
+def test_transkript_normalizasyonu_ve_anahtar():
+    assert report_drafts.normalize_transcript("  iç   çap\n\t10 mm ") == "iç çap 10 mm"
+    # NFC: ayrışık "ç" (c + birleşik çengel) ile hazır "ç" aynı anahtarı verir
+    assert report_drafts.draft_key("iç çap") == report_drafts.draft_key("iç  çap")
+    assert report_drafts.draft_key("iç çap") != report_drafts.draft_key("dış çap")
+
+
+def test_ozdes_istekler_birlestirilir():
+    cache = DraftCache(ttl_seconds=60, max_entries=10)
+    cagri = 0
+
+    async def factory():
+        nonlocal cagri
+        cagri += 1
+        await asyncio.sleep(0.01)
+        return {"sonuc": cagri}
+
+    async def calistir():
+        return await asyncio.gather(*(cache.get_or_create("k", factory) for _ in range(3)))
+
+    sonuclar = asyncio.run(calistir())
+    assert cagri == 1
+    assert sonuclar == [{"sonuc": 1}] * 3
+    assert cache.stats()["coalesced"] == 2
+    assert cache.get("k") == {"sonuc": 1}
+
+
+def test_hata_onbellege_alinmaz():
+    cache = DraftCache(ttl_seconds=60, max_entries=10)
+
+    async def hatali():
+        raise RuntimeError("api hatası")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_create("k", hatali))
+    assert cache.get("k") is None
+
+
+def test_en_eski_kayit_atilir():
+    cache = DraftCache(ttl_seconds=60, max_entries=2)
+    cache.put("a", {"a": 1})
+    cache.put("b", {"b": 1})
+    cache.get("a")
+    cache.put("c", {"c": 1})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"a": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def _sse_olaylari(govde: str):
+    olaylar = []
+    for blok in govde.strip().split("\n\n"):
+        olay, veri = blok.split("\n", 1)
+        olaylar.append((olay.removeprefix("event: "), json.loads(veri.removeprefix("data: "))))
+    return olaylar
+
+
+def test_akisli_ve_normal_istekler_tek_uretimi_paylasir(monkeypatch):
+    import main
+
+    metin = json.dumps(RAPOR, ensure_ascii=False)
+    cagri = {"stream": 0, "chat": 0}
+
+    async def chat_stream(tur, **kwargs):
+        cagri["stream"] += 1
+        for parca in _parcala(metin, 16):
+            await asyncio.sleep(0.002)
+            yield parca
+
+    async def chat(tur, **kwargs):
+        cagri["chat"] += 1
+        raise AssertionError("akış sürerken ikinci üretim başlatılmamalı")
+
+    monkeypatch.setattr(main.llm.gateway, "chat_stream", chat_stream)
+    monkeypatch.setattr(main.llm.gateway, "chat", chat)
+    monkeypatch.setattr(main, "draft_cache", DraftCache(ttl_seconds=60, max_entries=10))
+
+    async def akis():
+        response = await main.generate_report_stream(main.TranscriptionRequest(text="aynı metin"))
+        return "".join([parca async for parca in response.body_iterator])
+
+    async def sonra(istek):
+        await asyncio.sleep(0.01)  # akış başladıktan sonra gelen istekler
+        return await istek
+
+    async def calistir():
+        return await asyncio.gather(
+            akis(),
+            sonra(akis()),
+            sonra(main.generate_report(main.TranscriptionRequest(text="aynı  metin"))),
+        )
+
+    lider, takipci, normal = asyncio.run(calistir())
+    assert cagri == {"stream": 1, "chat": 0}
+    assert normal == RAPOR
+    bolumler = list(RAPOR["kalibrasyon_sertifikasi"])
+    for govde in (lider, takipci):
+        olaylar = _sse_olaylari(govde)
+        assert [v["ad"] for o, v in olaylar if o == "section"] == bolumler
+        assert olaylar[-1] == ("done", RAPOR)
+    # Tokenları yalnızca üretimi başlatan istek alır
+    assert any(o == "token" for o, _ in _sse_olaylari(lider))
+    assert not any(o == "token" for o, _ in _sse_olaylari(takipci))
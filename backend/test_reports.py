@@ -0,0 +1,94 @@
+"""Rapor listesi keyset sayfalama testleri (pytest)"""
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import main
+from models import KalibrasyonRaporu
+
+
+def test_imlec_saat_dilimiyle_geri_cozulur():
+    created_at = datetime(2024, 3, 1, 9, 30, 15, 123456, tzinfo=timezone(timedelta(hours=3)))
+    cozulen, rapor_id = main._decode_cursor(main._encode_cursor(created_at, 42))
+    assert (cozulen, rapor_id) == (created_at, 42)
+    assert cozulen.utcoffset() == timedelta(hours=3)
+
+
+@pytest.mark.parametrize("cursor", [
+    "bozuk!",
+    base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+    base64.urlsafe_b64encode(b'["tarih degil", 1]').decode(),
+    base64.urlsafe_b64encode(b'["2024-03-01T09:30:00", "id"]').decode(),
+    "ğ",
+])
+def test_gecersiz_imlec_400(cursor):
+    with pytest.raises(HTTPException) as hata:
+        main._decode_cursor(cursor)
+    assert hata.value.status_code == 400
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Özet kolonları olan kalibrasyon_raporlari tablosuyla SQLite (Postgres'e özgü kolonlar hariç)"""
+    pytest.importorskip("aiosqlite")
+    db_path = tmp_path / "raporlar.db"
+    tablo = KalibrasyonRaporu.__table__
+
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    with sync_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE kalibrasyon_raporlari (id INTEGER PRIMARY KEY, sertifika_no VARCHAR,"
+            " musteri_adi VARCHAR, cihaz_tipi VARCHAR, kalibrasyon_tarihi DATETIME, durum VARCHAR,"
+            " uygunluk BOOLEAN, created_at DATETIME)"
+        )
+        ayni_an = datetime(2024, 3, 1, 12, 0, 0)
+        zamanlar = [ayni_an - timedelta(hours=1), ayni_an, ayni_an, ayni_an, ayni_an + timedelta(hours=1), ayni_an]
+        conn.execute(insert(tablo), [
+            {"id": i, "sertifika_no": f"KAL-{i}", "durum": "tamamlandi", "uygunluk": True, "created_at": zaman}
+            for i, zaman in enumerate(zamanlar, start=1)
+        ])
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_db():
+        async with Session() as session:
+            yield session
+
+    main.app.dependency_overrides[main.get_db] = get_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.pop(main.get_db, None)
+
+
+def test_ayni_created_at_sayfa_sinirinda_id_ile_ayrilir(client):
+    idler, cursor, sayfalar = [], None, 0
+    while True:
+        params = {"limit": 2, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/reports", params=params)
+        assert response.status_code == 200
+        sayfa = response.json()
+        assert sayfa["total"] == 6
+        idler += [r["id"] for r in sayfa["reports"]]
+        sayfalar += 1
+        cursor = sayfa["next_cursor"]
+        if cursor is None:
+            break
+
+    # created_at azalan, eşitlikte id azalan; sayfa sınırında tekrar ya da atlama yok
+    assert idler == [5, 6, 4, 3, 2, 1]
+    assert sayfalar == 3
+
+
+def test_bozuk_imlecle_liste_400(client):
+    response = client.get("/api/reports", params={"cursor": "bozuk!"})
+    assert response.status_code == 400
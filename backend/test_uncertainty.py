@@ -0,0 +1,103 @@
+"""Belirsizlik bütçesi testleri (pytest)"""
+import math
+
+import numpy as np
+import pytest
+
+import uncertainty
+from uncertainty import Katkilar
+
+
+def test_b_tipi_butce_okumasiz():
+    katkilar = Katkilar(cozunurluk=0.02)
+    sonuc = uncertainty.hesapla([0.0, 100.0], None, katkilar)
+    u_ref0 = katkilar.referans_sabit / katkilar.referans_k
+    u_coz = 0.02 / (2 * math.sqrt(3))
+    assert sonuc["u_a"].tolist() == [0.0, 0.0]
+    assert sonuc["u_b"][0] == pytest.approx(math.hypot(u_ref0, u_coz))
+    assert sonuc["u_b"][1] > sonuc["u_b"][0]  # referansın oransal katkısı uzunlukla artar
+    assert sonuc["k"].tolist() == [2.0, 2.0]
+    assert np.isinf(sonuc["nu_eff"]).all()
+
+
+def test_a_tipi_katki_ve_kapsam_faktoru():
+    okumalar = [25.0, 25.02, 24.98, 25.04, 25.0]
+    sonuc = uncertainty.hesapla([25.0], [okumalar], Katkilar(cozunurluk=0.001))
+    s = np.std(okumalar, ddof=1)
+    assert sonuc["u_a"][0] == pytest.approx(s / math.sqrt(5))
+    # A tipi baskın, serbestlik derecesi küçük -> k, 2'den büyük
+    assert 4 <= sonuc["nu_eff"][0] < 5
+    assert sonuc["k"][0] > 2.5
+
+
+def test_tek_okuma_a_tipi_vermez():
+    sonuc = uncertainty.hesapla([10.0, 20.0], [[10.01], None], Katkilar(cozunurluk=0.01))
+    assert sonuc["u_a"].tolist() == [0.0, 0.0]
+
+
+@pytest.mark.parametrize("deger, beklenen", [(0.012345, 0.012), (0.0296, 0.03), (1.26, 1.3), (0.0, 0.0)])
+def test_iki_anlamli_basamak(deger, beklenen):
+    assert uncertainty._iki_anlamli_basamak(np.array([deger]))[0] == pytest.approx(beklenen)
+
+
+def test_metinden_sayi_ve_sicaklik():
+    assert uncertainty.sayi_oku("0,02 mm") == 0.02
+    assert uncertainty.sayi_oku(5) == 5.0
+    assert uncertainty.sayi_oku("yok") is None
+    assert uncertainty.sicaklik_sapmasi("20 ± 1°C") == 1.0
+    assert uncertainty.sicaklik_sapmasi("23 °C") == 3.0
+    assert uncertainty.sicaklik_sapmasi("") == 0.0
+
+
+def _sertifika(belirsizlik, okumalar=None):
+    return {
+        "cihazBilgileri": {"cozunurluk": "0,02 mm"},
+        "kalibrasyonBilgileri": {"ortamKosullari": {"sicaklik": "20 °C"}},
+        "olcumSonuclari": {
+            "disCapOlcumleri": [
+                {"tip": "dis", "referansDeger": 25.0, "olculenDeger": 25.0, "sapma": 0.0,
+                 "belirsizlik": belirsizlik, "okumalar": okumalar},
+            ],
+        },
+        "uygunlukDegerlendirmesi": {"sonuc": True, "aciklama": ""},
+    }
+
+
+def test_sertifika_hesaplanan_degeri_yazar():
+    yeni = uncertainty.sertifikaya_uygula(_sertifika(0.0))
+    assert yeni["olcumSonuclari"]["disCapOlcumleri"][0]["belirsizlik"] == 0.012
+    assert "k=2" in yeni["uygunlukDegerlendirmesi"]["olcumBelirsizligiAciklama"]
+
+
+def test_okumasiz_noktada_buyuk_girilen_deger_korunur():
+    yeni = uncertainty.sertifikaya_uygula(_sertifika(0.03))
+    assert yeni["olcumSonuclari"]["disCapOlcumleri"][0]["belirsizlik"] == 0.03
+
+
+def test_okumali_noktada_hesaplanan_deger_kullanilir():
+    yeni = uncertainty.sertifikaya_uygula(_sertifika(0.5, okumalar=[25.0, 25.02, 24.98, 25.04, 25.0]))
+    assert yeni["olcumSonuclari"]["disCapOlcumleri"][0]["belirsizlik"] == pytest.approx(0.029)
+
+
+def test_sertifikaya_uygula_kopya_doner_ve_tekrar_uygulanabilir():
+    cert = _sertifika(0.0)
+    yeni = uncertainty.sertifikaya_uygula(cert)
+    assert cert["olcumSonuclari"]["disCapOlcumleri"][0]["belirsizlik"] == 0.0
+    assert uncertainty.sertifikaya_uygula(yeni) == yeni
+
+
+def test_yilan_formatinda_aciklama_eklenir():
+    cert = {
+        "cihaz_bilgileri": {"cozunurluk": "0,02 mm"},
+        "olcum_sonuclari": {"ic_cap_olcumleri": [{"referans_deger_mm": 10, "olcum_belirsizligi_mm": 0}]},
+        "uygunluk_degerlendirmesi": {"karar_kurali": "x"},
+    }
+    yeni = uncertainty.sertifikaya_uygula(cert)
+    assert yeni["olcum_sonuclari"]["ic_cap_olcumleri"][0]["olcum_belirsizligi_mm"] > 0
+    assert "olcum_belirsizligi_aciklama" in yeni["uygunluk_degerlendirmesi"]
+
+
+def test_cozunurluk_yoksa_dokunulmaz():
+    cert = _sertifika(0.03)
+    cert["cihazBilgileri"] = {}
+    assert uncertainty.sertifikaya_uygula(cert) is cert
@@ -0,0 +1,102 @@
+"""
+Transkripsiyon önbelleği - ses dosyasının SHA-256'sı + model + dil anahtarıyla
+veritabanında tutulur. Aynı kayıt tekrar yüklendiğinde Whisper çağrılmaz.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import AsyncSessionLocal
+from models import TranskripsiyonOnbellegi
+
+# Kayıtların geçerlilik süresi ve tutulacak en fazla kayıt
+TRANSCRIPT_CACHE_TTL_DAYS = float(os.getenv("TRANSCRIPT_CACHE_TTL_DAYS", "30"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "5000"))
+
+
+class TranscriptionCache:
+    """Veritabanı destekli, TTL ve adet sınırlı transkripsiyon önbelleği"""
+
+    def __init__(self, ttl_days: float, max_entries: int):
+        self.ttl = timedelta(days=ttl_days)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - self.ttl
+
+    async def get(self, ses_hash: str, model: str, dil: str) -> Optional[str]:
+        T = TranskripsiyonOnbellegi
+        try:
+            async with AsyncSessionLocal() as db:
+                row = (await db.execute(
+                    select(T.id, T.metin).where(
+                        T.ses_hash == ses_hash, T.model == model, T.dil == dil,
+                        T.created_at >= self._cutoff()
+                    )
+                )).first()
+                if row:
+                    # Son erişim, adet sınırında hangi kaydın silineceğini belirler
+                    await db.execute(update(T).where(T.id == row.id).values(son_erisim=func.now()))
+                    await db.commit()
+        except Exception as e:
+            # Önbellek okunamazsa transkripsiyon normal yoldan devam eder
+            print(f"Transkripsiyon önbelleği okuma hatası: {str(e)}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row.metin
+
+    async def put(self, ses_hash: str, model: str, dil: str, metin: str):
+        T = TranskripsiyonOnbellegi
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(T(ses_hash=ses_hash, model=model, dil=dil, metin=metin))
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # Aynı kayıt eşzamanlı bir istekle zaten eklendi
+                    await db.rollback()
+                    return
+                await self._evict(db)
+        except Exception as e:
+            print(f"Transkripsiyon önbelleği yazma hatası: {str(e)}")
+
+    async def _evict(self, db):
+        """Süresi dolan kayıtları ve adet sınırını aşan en eski erişilmiş kayıtları sil"""
+        T = TranskripsiyonOnbellegi
+        expired = await db.execute(delete(T).where(T.created_at < self._cutoff()))
+        fazla = await db.execute(
+            delete(T).where(T.id.in_(
+                select(T.id).order_by(desc(T.son_erisim), desc(T.id)).offset(self.max_entries)
+            ))
+        )
+        await db.commit()
+        self.evictions += expired.rowcount + fazla.rowcount
+
+    async def stats(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            entries = (await db.execute(
+                select(func.count()).select_from(TranskripsiyonOnbellegi)
+            )).scalar_one()
+        toplam = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_days": self.ttl.total_seconds() / 86400,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / toplam, 3) if toplam else None,
+            "evictions": self.evictions,
+        }
+
+
+transcription_cache = TranscriptionCache(TRANSCRIPT_CACHE_TTL_DAYS, TRANSCRIPT_CACHE_MAX_ENTRIES)
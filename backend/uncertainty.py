@@ -0,0 +1,215 @@
+"""
+Ölçüm belirsizliği bütçesi (GUM) - bir kalibrasyonun tüm noktaları için
+A tipi (tekrarlı okumalar) ve B tipi (referans cihaz, çözünürlük, sıcaklık)
+katkılar NumPy ile birlikte hesaplanır, genişletilmiş belirsizlik U = k * u_c.
+
+Uzunluklar mm, sıcaklık °C cinsindendir.
+"""
+import math
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Referans cihazın (mastar bloğu vb.) sertifikasındaki genişletilmiş belirsizlik: U_ref = sabit + oransal * L
+BELIRSIZLIK_REFERANS_SABIT_MM = float(os.getenv("BELIRSIZLIK_REFERANS_SABIT_MM", "0.0005"))
+BELIRSIZLIK_REFERANS_ORANSAL = float(os.getenv("BELIRSIZLIK_REFERANS_ORANSAL", "0.000005"))
+BELIRSIZLIK_REFERANS_K = float(os.getenv("BELIRSIZLIK_REFERANS_K", "2"))
+# Çelik için ısıl genleşme katsayısı (1/°C) ve referans sıcaklık
+BELIRSIZLIK_GENLESME_KATSAYISI = float(os.getenv("BELIRSIZLIK_GENLESME_KATSAYISI", "0.0000115"))
+REFERANS_SICAKLIK = 20.0
+
+# GUM Tablo G.2 - %95,45 kapsama olasılığı için t dağılımı (serbestlik derecesi -> k)
+_T_TABLOSU_NU = np.array([1, 2, 3, 4, 5, 6, 7, 8, 10, 20, 50, 100], dtype=float)
+_T_TABLOSU_K = np.array([13.97, 4.53, 3.31, 2.87, 2.65, 2.52, 2.43, 2.37, 2.28, 2.13, 2.05, 2.02])
+
+_SAYI = re.compile(r"[-+]?\d+(?:[.,]\d+)?")
+
+
+@dataclass(frozen=True)
+class Katkilar:
+    """B tipi katkı seti - aynı referans cihaz ve koşullar için bütçe katsayıları önbelleklenir"""
+    cozunurluk: float
+    sicaklik_sapmasi: float = 0.0  # |t - 20| + ortam değişimi, °C
+    referans_sabit: float = BELIRSIZLIK_REFERANS_SABIT_MM
+    referans_oransal: float = BELIRSIZLIK_REFERANS_ORANSAL
+    referans_k: float = BELIRSIZLIK_REFERANS_K
+    genlesme_katsayisi: float = BELIRSIZLIK_GENLESME_KATSAYISI
+
+
+@lru_cache(maxsize=256)
+def _b_tipi_katsayilari(katkilar: Katkilar) -> Tuple[float, float, float]:
+    """
+    B tipi varyansı uzunluğun polinomu olarak yaz: u_B^2(L) = c0 + c1*L + c2*L^2
+    Böylece tüm noktalar tek bir vektörel polinom hesabıyla bulunur.
+    """
+    a = katkilar.referans_sabit / katkilar.referans_k
+    b = katkilar.referans_oransal / katkilar.referans_k
+    u_cozunurluk = katkilar.cozunurluk / (2 * math.sqrt(3))  # dikdörtgen dağılım, yarı genişlik r/2
+    u_sicaklik_orani = katkilar.genlesme_katsayisi * katkilar.sicaklik_sapmasi / math.sqrt(3)
+    return (
+        a * a + u_cozunurluk * u_cozunurluk,
+        2 * a * b,
+        b * b + u_sicaklik_orani * u_sicaklik_orani,
+    )
+
+
+def kapsam_faktoru(nu_eff: np.ndarray) -> np.ndarray:
+    """Etkin serbestlik derecesinden kapsam faktörü (sonsuz için k=2)"""
+    k = np.interp(nu_eff, _T_TABLOSU_NU, _T_TABLOSU_K, right=2.0)
+    return np.where(np.isinf(nu_eff), 2.0, k)
+
+
+def hesapla(nominal, okumalar: Optional[List[Optional[List[float]]]], katkilar: Katkilar) -> dict:
+    """
+    Tüm noktaların belirsizlik bütçesini hesapla.
+    nominal: nokta başına referans uzunluk, okumalar: nokta başına tekrarlı okumalar (yoksa None)
+    """
+    L = np.abs(np.asarray(nominal, dtype=float))
+    n_nokta = L.shape[0]
+
+    # A tipi: okumalar NaN ile doldurulmuş 2 boyutlu diziye alınır
+    u_a = np.zeros(n_nokta)
+    nu_a = np.full(n_nokta, np.inf)
+    if okumalar and any(okumalar):
+        genislik = max(len(o or []) for o in okumalar)
+        tablo = np.full((n_nokta, genislik), np.nan)
+        for i, o in enumerate(okumalar):
+            if o:
+                tablo[i, :len(o)] = o
+        n = np.sum(~np.isnan(tablo), axis=1)
+        tekrarli = n >= 2
+        if tekrarli.any():
+            s = np.nanstd(tablo[tekrarli], axis=1, ddof=1)
+            u_a[tekrarli] = s / np.sqrt(n[tekrarli])
+            nu_a[tekrarli] = n[tekrarli] - 1
+
+    c0, c1, c2 = _b_tipi_katsayilari(katkilar)
+    u_b2 = c0 + L * (c1 + L * c2)
+
+    u_c2 = u_a * u_a + u_b2
+    u_c = np.sqrt(u_c2)
+
+    # Welch-Satterthwaite: B tipi katkılar sonsuz serbestlik dereceli kabul edilir
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nu_eff = np.where(u_a > 0, u_c2 * u_c2 / (u_a ** 4 / nu_a), np.inf)
+    k = kapsam_faktoru(nu_eff)
+
+    return {
+        "u_a": u_a,
+        "u_b": np.sqrt(u_b2),
+        "u_c": u_c,
+        "nu_eff": nu_eff,
+        "k": k,
+        "U": _iki_anlamli_basamak(k * u_c),
+    }
+
+
+def _iki_anlamli_basamak(deger: np.ndarray) -> np.ndarray:
+    """Belirsizlik iki anlamlı basamağa yuvarlanır (GUM 7.2.6)"""
+    with np.errstate(divide="ignore"):
+        basamak = np.where(deger > 0, np.floor(np.log10(np.where(deger > 0, deger, 1))) - 1, 0)
+    olcek = 10.0 ** basamak
+    return np.round(deger / olcek) * olcek
+
+
+def sayi_oku(metin) -> Optional[float]:
+    """'0,02 mm', '20 °C' gibi metinlerden ilk sayıyı oku"""
+    if isinstance(metin, (int, float)):
+        return float(metin)
+    eslesme = _SAYI.search(str(metin or ""))
+    return float(eslesme.group().replace(",", ".")) if eslesme else None
+
+
+def sicaklik_sapmasi(metin) -> float:
+    """'20 ± 1°C' -> |20 - 20| + 1; sıcaklık okunamazsa 0"""
+    sayilar = [float(s.replace(",", ".")) for s in _SAYI.findall(str(metin or ""))]
+    if not sayilar:
+        return 0.0
+    degisim = abs(sayilar[1]) if "±" in str(metin) and len(sayilar) > 1 else 0.0
+    return abs(sayilar[0] - REFERANS_SICAKLIK) + degisim
+
+
+def aciklama(k: float) -> str:
+    return (
+        f"Beyan edilen genişletilmiş ölçüm belirsizliği standart belirsizliğin k={k:g} olarak alınan "
+        "genişletme katsayısı ile çarpımı sonucunda bulunan değerdir ve yaklaşık %95 oranında güvenilirlik sağlamaktadır."
+    )
+
+
+# Sertifika formatlarındaki ölçüm listeleri: (liste anahtarı, referans değer anahtarı, belirsizlik anahtarı)
+_KAMEL_LISTELER = [
+    ("disCapOlcumleri", "referansDeger", "belirsizlik"),
+    ("icCapOlcumleri", "referansDeger", "belirsizlik"),
+    ("derinlikOlcumleri", "referansDeger", "belirsizlik"),
+    ("kademeOlcumleri", "referansDeger", "belirsizlik"),
+    ("paralellikOlcumleri", "referansDeger", "belirsizlik"),
+]
+_YILAN_LISTELER = [
+    ("dis_cap_olcumleri", "referans_deger_mm", "olcum_belirsizligi_mm"),
+    ("ic_cap_olcumleri", "referans_deger_mm", "olcum_belirsizligi_mm"),
+    ("derinlik_olcumleri", "referans_deger_mm", "olcum_belirsizligi_mm"),
+    ("kademe_olcumleri", "referans_deger_mm", "olcum_belirsizligi_mm"),
+]
+
+
+def sertifikaya_uygula(cert: dict) -> dict:
+    """
+    Sertifikadaki belirsizlik değerlerini hesaplanan bütçe ile değiştir (kopya döndürür).
+    Hem KalibrasyonSertifikasiData (camelCase) hem GPT rapor (snake_case) formatını destekler.
+    Tekrarlı okuması (okumalar) olmayan noktada A tipi katkı bilinmediği için girilen değer
+    hesaplanandan büyükse girilen değer korunur - belirsizlik olduğundan küçük beyan edilmez.
+    Çözünürlük okunamazsa sertifika olduğu gibi döner.
+    """
+    if "olcumSonuclari" in cert:
+        cihaz = cert.get("cihazBilgileri") or {}
+        ortam = (cert.get("kalibrasyonBilgileri") or {}).get("ortamKosullari") or {}
+        olcumler, listeler = cert.get("olcumSonuclari") or {}, _KAMEL_LISTELER
+    else:
+        cihaz = cert.get("cihaz_bilgileri") or {}
+        ortam = (cert.get("kalibrasyon_detaylari") or {}).get("cevre_sartlari") or {}
+        olcumler, listeler = cert.get("olcum_sonuclari") or {}, _YILAN_LISTELER
+
+    cozunurluk = sayi_oku(cihaz.get("cozunurluk"))
+    if not cozunurluk:
+        return cert
+
+    # Tüm listelerin noktaları tek bir hesaba girer
+    konumlar, nominal, okumalar = [], [], []
+    for liste, ref_anahtar, _ in listeler:
+        for i, olcum in enumerate(olcumler.get(liste) or []):
+            ref = sayi_oku(olcum.get(ref_anahtar)) if isinstance(olcum, dict) else None
+            if ref is None:
+                continue
+            konumlar.append((liste, i))
+            nominal.append(ref)
+            okumalar.append(olcum.get("okumalar"))
+    if not konumlar:
+        return cert
+
+    katkilar = Katkilar(cozunurluk=cozunurluk, sicaklik_sapmasi=sicaklik_sapmasi(ortam.get("sicaklik")))
+    sonuc = hesapla(nominal, okumalar, katkilar)
+
+    yeni_olcumler = {liste: [dict(o) if isinstance(o, dict) else o for o in olcumler.get(liste) or []]
+                     for liste, _, _ in listeler if liste in olcumler}
+    belirsizlik_anahtari = listeler[0][2]
+    for (liste, i), U, u_a in zip(konumlar, sonuc["U"].tolist(), sonuc["u_a"].tolist()):
+        olcum = yeni_olcumler[liste][i]
+        girilen = sayi_oku(olcum.get(belirsizlik_anahtari))
+        olcum[belirsizlik_anahtari] = girilen if u_a == 0 and girilen is not None and girilen > U else round(U, 6)
+
+    yeni = dict(cert)
+    if "olcumSonuclari" in cert:
+        yeni["olcumSonuclari"] = {**olcumler, **yeni_olcumler}
+        uygunluk = cert.get("uygunlukDegerlendirmesi")
+        if isinstance(uygunluk, dict):
+            yeni["uygunlukDegerlendirmesi"] = {**uygunluk, "olcumBelirsizligiAciklama": aciklama(float(sonuc["k"].max()))}
+    else:
+        yeni["olcum_sonuclari"] = {**olcumler, **yeni_olcumler}
+        uygunluk = cert.get("uygunluk_degerlendirmesi")
+        if isinstance(uygunluk, dict):
+            yeni["uygunluk_degerlendirmesi"] = {**uygunluk, "olcum_belirsizligi_aciklama": aciklama(float(sonuc["k"].max()))}
+    return yeni
@@ -525,9 +525,10 @@ class _KalibrasyonFormPageState extends State<KalibrasyonFormPage> {
           }),
         );
         
-        if (response.statusCode == 200) {
+        // 202: kayıt oluşturuldu, sertifika PDF'i arka planda üretiliyor (durum_url ile takip edilir)
+        if (response.statusCode == 200 || response.statusCode == 202) {
           final result = json.decode(response.body);
-          print('Kalibrasyon kaydedildi! ID: ${result['id']}');
+          print('Kalibrasyon kaydedildi! ID: ${result['id']} (PDF işi: ${result['job_id']})');
         } else {
           print('Backend hatası: ${response.body}');
         }